@@ -0,0 +1,248 @@
+"""
+Array based representations of a collection of clusters, used by procedure_cover and max_cover
+instead of operating on the clusters' frozensets one at a time.
+
+The nodes of the collection are interned to dense integers 0, ..., n-1,
+and the clusters to dense integers 0, ..., m-1, and the collection is stored as CSR arrays of the clusters nodes,
+together with their transpose, the CSR arrays of the nodes clusters.
+Like ClusterIndex, a kernel layer only looks up the clusters of the nodes it added to the kernel,
+as bulk NumPy operations over all of these nodes at once.
+
+The representations differ in the node set of the kernel:
+    'bitset' - the node set is a row of packed bits, one bit per node
+    'mask' - the node set is a boolean mask, one byte per node
+"""
+
+from abc import ABC, abstractmethod
+import numpy as np
+from utilities.random_set import RandomSet
+
+
+def csr_rows(indptr, indices, rows):
+    """
+    :param indptr: CSR index pointers
+    :param indices: CSR indices
+    :param rows: array of rows numbers
+    :return: array of the indices of all rows, concatenated
+    """
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return indices[positions]
+
+
+class ClusterCollection(ABC):
+    """
+    A collection of clusters with its nodes and clusters interned to dense integers.
+    Subclasses implement empty, add, to_cluster and size over their own node set representation.
+
+    indptr, indices - CSR arrays of the nodes ids of every cluster
+    nodes_indptr, nodes_clusters - CSR arrays of the clusters ids of every node
+    """
+
+    def __init__(self, clusters):
+        """
+        :param clusters: a collection of clusters
+        """
+        self.clusters = list(clusters)
+        self.cluster_ids = {cluster: i for i, cluster in enumerate(self.clusters)}
+        self.node_ids = {}
+        for cluster in self.clusters:
+            for v in cluster:
+                self.node_ids.setdefault(v, len(self.node_ids))
+        self.nodes = list(self.node_ids)
+        sizes = [len(cluster) for cluster in self.clusters]
+        self.indptr = np.zeros(len(self.clusters) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.indptr[1:])
+        self.indices = np.fromiter((self.node_ids[v] for cluster in self.clusters for v in cluster),
+                                   dtype=np.int64, count=self.indptr[-1])
+        rows = np.repeat(np.arange(len(self.clusters)), sizes)
+        self.nodes_indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=len(self.nodes)), out=self.nodes_indptr[1:])
+        self.nodes_clusters = rows[np.argsort(self.indices, kind='stable')]
+
+    def __len__(self):
+        return len(self.clusters)
+
+    def ids(self, clusters):
+        """
+        :param clusters: clusters of the collection
+        :return: array of the clusters ids
+        """
+        return np.fromiter((self.cluster_ids[cluster] for cluster in clusters), dtype=np.int64, count=len(clusters))
+
+    @abstractmethod
+    def empty(self):
+        """
+        :return: an empty node set, in the collection's node set representation
+        """
+
+    @abstractmethod
+    def add(self, nodes, ids):
+        """
+        :param nodes: node set, in the collection's node set representation
+        :param ids: array of distinct nodes ids
+        :return: a new node set of nodes and ids, and the array of the ids which are not in nodes
+        """
+
+    @abstractmethod
+    def to_cluster(self, nodes):
+        """
+        :param nodes: node set, in the collection's node set representation
+        :return: the node set as a cluster, i.e. a frozenset of nodes
+        """
+
+    @abstractmethod
+    def size(self, nodes):
+        """
+        :param nodes: node set, in the collection's node set representation
+        :return: number of nodes in the node set
+        """
+
+    def engine(self, R, rng=None):
+        """
+        :param R: a collection of clusters, all of them in this collection
+        :param rng: numpy random Generator of the random picks
+        :return: a CollectionEngine of R, to be used by procedure_cover
+        """
+        return CollectionEngine(self, R, rng)
+
+
+class BitsetClusters(ClusterCollection):
+    """
+    Node sets are rows of packed bits, one bit for each node of the collection.
+    """
+
+    def empty(self):
+        return np.zeros((len(self.nodes) + 7) // 8, dtype=np.uint8)
+
+    def add(self, nodes, ids):
+        bits = np.uint8(128) >> (ids & 7).astype(np.uint8)
+        missing = (nodes[ids >> 3] & bits) == 0
+        nodes = nodes.copy()
+        np.bitwise_or.at(nodes, ids[missing] >> 3, bits[missing])
+        return nodes, ids[missing]
+
+    def to_cluster(self, nodes):
+        ids = np.flatnonzero(np.unpackbits(nodes, count=len(self.nodes)))
+        return frozenset(self.nodes[i] for i in ids.tolist())
+
+    def size(self, nodes):
+        return int(np.count_nonzero(np.unpackbits(nodes, count=len(self.nodes))))
+
+
+class MaskClusters(ClusterCollection):
+    """
+    Node sets are boolean masks, one byte for each node of the collection.
+    """
+
+    def empty(self):
+        return np.zeros(len(self.nodes), dtype=bool)
+
+    def add(self, nodes, ids):
+        ids = ids[~nodes[ids]]
+        nodes = nodes.copy()
+        nodes[ids] = True
+        return nodes, ids
+
+    def to_cluster(self, nodes):
+        return frozenset(self.nodes[i] for i in np.flatnonzero(nodes).tolist())
+
+    def size(self, nodes):
+        return int(np.count_nonzero(nodes))
+
+
+class CollectionEngine:
+    """
+    The collection of clusters U used by procedure_cover, over a ClusterCollection.
+    It has the same interface as ClusterIndex, but works with clusters ids and node set representations,
+    which are converted back to clusters only for the output.
+    """
+
+    def __init__(self, collection, R, rng=None):
+        """
+        :param collection: a ClusterCollection
+        :param R: a collection of clusters, all of them in collection
+        :param rng: numpy random Generator of the random picks
+        """
+        self.collection = collection
+        ids = collection.ids(R)
+        # random picks are made from a RandomSet of the clusters ids, ordered exactly as the clusters in ClusterIndex,
+        # so that both get the same results for the same random choices
+        self.clusters = RandomSet(ids.tolist(), rng)
+        self.alive = np.zeros(len(collection), dtype=bool)
+        self.alive[ids] = True
+        self.layer_tests = 0
+
+    def __bool__(self):
+        return bool(self.clusters)
+
+    def __len__(self):
+        return len(self.clusters)
+
+    def pick(self):
+        """
+        :return: the id of a random cluster in the collection
+        """
+        return self.clusters.pick()
+
+    def layers(self, S):
+        """
+        grows a kernel around cluster S, layer by layer, see ClusterIndex.layers.
+        the clusters of the nodes added to Y in a layer are looked up in the nodes clusters arrays of the collection,
+        so a layer costs as much as the clusters and nodes it adds, and not as the entire collection.
+
+        :param S: a cluster id
+        :return: generator of (y, Y, Z) for each layer, y and Z as sorted arrays of clusters ids
+        """
+        collection = self.collection
+        Y = collection.empty()
+        y, Z = np.empty(0, dtype=np.int64), np.array([S])
+        while True:
+            new_clusters = np.setdiff1d(Z, y, assume_unique=True)
+            y = Z
+            Y, new_nodes = collection.add(Y, np.unique(csr_rows(collection.indptr, collection.indices, new_clusters)))
+            touching = csr_rows(collection.nodes_indptr, collection.nodes_clusters, new_nodes)
+            self.layer_tests = len(touching)
+            touching = np.unique(touching)
+            Z = np.union1d(y, touching[self.alive[touching]])
+            yield y, Y, Z
+
+    def remove(self, ids):
+        """
+        :param ids: array of clusters ids to remove from the collection
+        :return: None
+        """
+        self.alive[ids] = False
+        self.clusters -= ids.tolist()
+
+    def layer_counts(self, Y, previous_Y):
+        """
+        :param Y: the node set of a layer
+        :param previous_Y: the node set of the previous layer, or None for the first layer
+        :return: number of nodes in Y, and number of intersection tests made for the layer,
+                 i.e. the clusters looked up for the nodes added to Y, including the clusters already removed
+        """
+        return self.collection.size(Y), self.layer_tests
+
+    def as_cluster(self, nodes):
+        return self.collection.to_cluster(nodes)
+
+    def as_clusters(self, ids):
+        return {self.collection.clusters[i] for i in ids.tolist()}
+
+
+BACKENDS = {'bitset': BitsetClusters,
+            'mask': MaskClusters}
+
+
+def make_collection(clusters, backend):
+    """
+    :param clusters: a collection of clusters
+    :param backend: name of the representation, one of BACKENDS
+    :return: ClusterCollection of clusters in the requested representation
+    """
+    if backend not in BACKENDS:
+        raise ValueError('unknown backend {}, expected one of {}'.format(backend, list(BACKENDS)))
+    return BACKENDS[backend](clusters)
+
@@ -0,0 +1,245 @@
+"""
+Persistent, content addressed cache of max_cover results.
+
+A result is the output T of max_cover (or of max_cover_sweep) together with its Rad and Deg in the graph g,
+keyed by a SHA-256 hash of the cover contents, the graph contents, k, the random seed of the run and ALGORITHM_VERSION,
+and by the number of Dijkstra runs Rad was bounded with, for an upper bound of Rad instead of its exact value,
+so the same cover run with the same k and seed is looked up no matter where it came from,
+and results of an older version of the algorithm are never used.
+
+Every result is a compressed .npz file in the cache directory, with the CSR arrays of every cover
+(see utilities.storage) and their metrics.
+Files are written to a temporary file and renamed into place, so concurrent workers only ever see complete files,
+and the least recently used files (by modification time, which a cache hit updates)
+are removed whenever the directory grows beyond its size limit.
+"""
+
+from hashlib import sha256
+import os
+import tempfile
+import time
+import zipfile
+import numpy as np
+from algorithm.max_cover import max_cover, max_cover_sweep, ALGORITHM_VERSION
+from utilities.graph_arrays import graph_arrays
+from utilities.util import get_collection_data
+
+# default size limit of a cache directory
+CACHE_MAX_BYTES = 2 ** 30
+
+
+def cover_arrays(cover):
+    """
+    :param cover: a collection of clusters of integer nodes
+    :return: canonical CSR arrays (indptr, indices) of cover, with its clusters and their nodes sorted,
+             so they are the same for any iteration order of cover
+    """
+    clusters = sorted(tuple(sorted(cluster)) for cluster in cover)
+    indptr = np.zeros(len(clusters) + 1, dtype=np.int64)
+    np.cumsum([len(cluster) for cluster in clusters], out=indptr[1:])
+    indices = np.fromiter((v for cluster in clusters for v in cluster), dtype=np.int64, count=indptr[-1])
+    return indptr, indices
+
+
+def arrays_cover(indptr, indices):
+    """
+    :param indptr: CSR index pointers
+    :param indices: CSR clusters nodes
+    :return: the cover of the CSR arrays, as a set of frozensets
+    """
+    nodes = indices.tolist()
+    bounds = indptr.tolist()
+    return {frozenset(nodes[start:end]) for start, end in zip(bounds, bounds[1:])}
+
+
+def cover_digest(cover):
+    """
+    :param cover: a collection of clusters of integer nodes, e.g. ClusterArrays of a stored cover
+    :return: hex SHA-256 digest of the contents of cover
+    """
+    digest = sha256()
+    for array in cover_arrays(cover):
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def graph_digest(g):
+    """
+    :param g: graph with integer nodes, or its GraphArrays
+    :return: hex SHA-256 digest of the nodes, edges and weights of g
+    """
+    arrays = graph_arrays(g)
+    digest = sha256()
+    for array in (np.asarray(list(arrays.nodes), dtype=np.int64), arrays.indptr, arrays.indices):
+        digest.update(np.asarray(array, dtype=np.int64).tobytes())
+    digest.update(np.asarray(arrays.weights, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def touch(path):
+    """
+    sets the modification time of path to the current time, from the precise clock,
+    as the file system clock of writes and of os.utime(path) is too coarse to order the cache files by their use
+    :param path: file path
+    :return: None
+    """
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+def cache_key(*parts):
+    """
+    :param parts: strings and numbers the result depends on
+    :return: hex SHA-256 digest of parts
+    """
+    return sha256(repr(parts).encode()).hexdigest()
+
+
+def draw_seed(rng=None):
+    """
+    :param rng: an integer seed, or None
+    :return: the seed of a max_cover run with rng, drawn from numpy's global random state for None,
+             exactly as utilities.random_set.as_generator does, so the run is the same as max_cover(S, k, rng=rng)
+    """
+    if rng is None:
+        return np.random.randint(2 ** 31)
+    if not isinstance(rng, (int, np.integer)):
+        raise TypeError('cached max_cover runs are keyed by an integer seed, not by {}'.format(type(rng).__name__))
+    return int(rng)
+
+
+class CoverCache:
+    """
+    A directory of cached max_cover results, safe to share between processes.
+    """
+
+    def __init__(self, path, max_bytes=CACHE_MAX_BYTES):
+        """
+        :param path: directory path, created if it does not exist
+        :param max_bytes: size limit of the directory, beyond which the least recently used results are removed
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def file_path(self, key):
+        return os.path.join(self.path, key + '.npz')
+
+    def load(self, key):
+        """
+        :param key: a cache key
+        :return: list of (cover, metrics) of the result cached under key, or None if it is not cached.
+                 metrics is an array of the cover Rad and Deg
+        """
+        path = self.file_path(key)
+        try:
+            with np.load(path) as entry:
+                metrics = entry['metrics']
+                covers = [arrays_cover(entry['indptr_{}'.format(i)], entry['indices_{}'.format(i)])
+                          for i in range(len(metrics))]
+            touch(path)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            # missing, being evicted by another process, or written by an incompatible version
+            return None
+        return list(zip(covers, metrics))
+
+    def save(self, key, results):
+        """
+        :param key: a cache key
+        :param results: list of (cover, metrics), see load
+        :return: None
+        """
+        arrays = {'metrics': np.array([metrics for _, metrics in results], dtype=np.float64).reshape(-1, 2)}
+        for i, (cover, _) in enumerate(results):
+            arrays['indptr_{}'.format(i)], arrays['indices_{}'.format(i)] = cover_arrays(cover)
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', dir=self.path)
+        try:
+            with os.fdopen(file_descriptor, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            touch(temporary_path)
+            os.replace(temporary_path, self.file_path(key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        removes the least recently used results, until the directory is within its size limit
+        :return: None
+        """
+        files = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in sorted(files):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            size -= file_size
+
+
+def cached_max_cover_data(cache, g, S, k, rng=None, digests=None, stats=None, approx=None):
+    """
+    max_cover(S, k, rng=rng), together with the Rad and Deg of its output in g (see get_collection_data),
+    loaded from cache if they were cached, otherwise calculated and cached
+
+    :param cache: CoverCache
+    :param g: graph, or its GraphArrays
+    :param S: a cover of g
+    :param k: integer constant
+    :param rng: integer seed of the run, or None to draw it from numpy's global random state (see draw_seed)
+    :param digests: optional (cover_digest(S), graph_digest(g)), when they were already calculated
+    :param stats: optional dictionary, the stats of get_collection_data are added to it,
+                  and 'cache hits' or 'cache misses' is counted
+    :param approx: optional number of Dijkstra runs to bound the radius with (see get_collection_data),
+                   the radius is then the upper bound, and it is cached separately from the exact radius
+    :return: coarsening cover T, its radius and degree
+    """
+    return cached_max_cover_sweep_data(cache, g, S, [k], rng, digests, stats, sweep=False, approx=approx)[k]
+
+
+def cached_max_cover_sweep_data(cache, g, S, ks, rng=None, digests=None, stats=None, sweep=True, approx=None):
+    """
+    max_cover_sweep(S, ks, rng=rng), together with the Rad and Deg of its outputs in g,
+    loaded from cache if they were cached, otherwise calculated and cached
+
+    :param cache: CoverCache
+    :param g: graph, or its GraphArrays
+    :param S: a cover of g
+    :param ks: integer constants
+    :param rng: integer seed of the run, or None, see cached_max_cover_data
+    :param digests: optional (cover_digest(S), graph_digest(g))
+    :param stats: optional dictionary, see cached_max_cover_data
+    :param sweep: run max_cover_sweep, otherwise ks must be a single k, and max_cover is run
+    :param approx: optional number of Dijkstra runs to bound the radii with, see cached_max_cover_data
+    :return: dictionary of k -> (T, radius, degree)
+    """
+    seed = draw_seed(rng)
+    ks = sorted(set(ks))
+    S_digest, g_digest = digests if digests is not None else (cover_digest(S), graph_digest(g))
+    parts = ('max_cover_sweep' if sweep else 'max_cover', S_digest, g_digest, ks, seed, ALGORITHM_VERSION)
+    # exact results keep their keys from before approx was added
+    key = cache_key(*parts, approx) if approx else cache_key(*parts)
+    results = cache.load(key)
+    if results is not None:
+        if stats is not None:
+            stats['cache hits'] = stats.get('cache hits', 0) + 1
+        return {k: (T, float(radius), int(degree)) for k, (T, (radius, degree)) in zip(ks, results)}
+    if stats is not None:
+        stats['cache misses'] = stats.get('cache misses', 0) + 1
+    covers = max_cover_sweep(S, ks, rng=seed) if sweep else {ks[0]: max_cover(S, ks[0], rng=seed)}
+    data = {}
+    for k, T in covers.items():
+        radius, degree = get_collection_data(g, T, cache=True, stats=stats, approx=approx)
+        data[k] = T, radius[1] if approx else radius, degree
+    cache.save(key, [(data[k][0], data[k][1:]) for k in ks])
+    return data
@@ -0,0 +1,64 @@
+"""
+Radii bounds of max_cover outputs, carried through the kernels growth of procedure_cover,
+recorded only when a ClusterRadii is passed as their radii argument.
+
+A kernel is grown around a cluster S, and every layer adds clusters that intersect the union Y of the previous layers.
+A node v of an added cluster S' is reached from a node w of S' in Y within S' itself, i.e. within 2*Rad(S'),
+so the eccentricity of S's center in the graph induced by Y grows by at most 2*Rad(S') in every layer:
+    Rad(Y) <= Rad(S) + sum over the layers of 2*max(Rad(S') | S' added in the layer)
+which is the (2k-1)*Rad(R) bound of procedure_cover, with the actual radii of the clusters it merged.
+The bound only needs the radii of the clusters of S, e.g. the intervals of its Rad calculation
+(see utilities.util.calculate_collection_radius), and a cluster of T which is a cluster of S keeps its exact radius.
+"""
+
+
+class ClusterRadii:
+    """
+    Bounds of the radii of the clusters of a cover S, and of the coarsening clusters constructed from them.
+
+    bounds - dictionary of cluster -> (lower, upper) bounds of its radius, of the clusters of S,
+             and of every cluster of T once it is constructed. a cluster of T which is not a cluster of S has
+             a lower bound of 0, and its upper bound is the radius bound of its kernel growth
+    centers - dictionary of cluster of T -> the cluster of S its kernel was grown around,
+              every node of the cluster of T is within the upper bound from that cluster's center
+    """
+
+    def __init__(self, bounds):
+        """
+        :param bounds: dictionary of cluster -> radius, or (lower, upper) bounds of its radius, of every cluster of S
+        """
+        self.bounds = {cluster: cluster_bounds if isinstance(cluster_bounds, tuple) else (cluster_bounds,) * 2
+                       for cluster, cluster_bounds in bounds.items()}
+        self.centers = {}
+
+    def upper(self, cluster):
+        return self.bounds[cluster][1]
+
+    def grow(self, upper, clusters):
+        """
+        :param upper: the radius bound of a kernel, or None before its first layer
+        :param clusters: the clusters added to the kernel by its current layer, starting with its initial cluster
+        :return: the radius bound of the kernel with the layer
+        """
+        if upper is None:
+            return self.upper(next(iter(clusters)))
+        return upper + 2 * max(self.upper(cluster) for cluster in clusters)
+
+    def add_cluster(self, Y, upper, S):
+        """
+        :param Y: a cluster of T
+        :param upper: the radius bound of its kernel
+        :param S: the cluster its kernel was grown around
+        :return: None
+        """
+        lower, known_upper = self.bounds.get(Y, (0, upper))
+        self.bounds[Y] = lower, min(upper, known_upper)
+        self.centers[Y] = S
+
+    def collection_bounds(self, collection):
+        """
+        :param collection: a collection of clusters with known bounds, e.g. T
+        :return: lower and upper bounds of the radius of collection, i.e. the largest lower and upper bounds
+        """
+        lowers, uppers = zip(*(self.bounds[cluster] for cluster in collection))
+        return max(lowers), max(uppers)
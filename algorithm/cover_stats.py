@@ -0,0 +1,86 @@
+"""
+Statistics of procedure_cover and max_cover runs, recorded only when a MaxCoverStats is passed as their stats argument,
+so runs without it take the exact same path they always do.
+"""
+
+from collections import Counter
+
+
+class MaxCoverStats:
+    """
+    Counters and timings of a max_cover run, or of procedure_cover runs.
+
+    phases - list of dictionaries, one for every procedure_cover run (i.e. every phase of max_cover):
+             'R' - number of clusters in R, 'threshold' - |R|^(1/k), the bound of the growth test,
+             'kernels' - number of kernels, 'covered' - number of clusters in DR,
+             'time' - seconds spent picking, growing and removing its kernels
+    kernels - list of dictionaries, one for every kernel:
+              'phase' - index of its phase, 'layers' - number of layers grown,
+              'y', 'Z' - number of clusters in its y and Z, 'union size' - number of nodes in its Y,
+              'intersection tests' - number of cluster intersection tests made while growing it,
+              'ratios' - len(Z) / (threshold*len(y)) of every layer, the growth test stops the kernel when it is <= 1,
+              so the ratios show how close every layer came to stopping it,
+              'time' - seconds spent picking, growing and removing it
+    times - Counter of stage -> seconds spent in it, over all kernels: 'pick', 'grow' and 'remove'
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.kernels = []
+        self.times = Counter()
+
+    def start_phase(self, R_size, threshold):
+        """
+        :param R_size: number of clusters in R
+        :param threshold: the growth test bound |R|^(1/k)
+        :return: None
+        """
+        self.phases.append({'R': R_size, 'threshold': threshold, 'kernels': 0, 'covered': 0, 'time': 0.0})
+
+    def add_kernel(self, ratios, y_size, Z_size, union_size, intersection_tests, pick_time, grow_time, remove_time):
+        """
+        records a kernel of the current phase
+        :param ratios: len(Z) / (threshold*len(y)) of every layer
+        :param y_size: number of clusters in y
+        :param Z_size: number of clusters in Z
+        :param union_size: number of nodes in Y
+        :param intersection_tests: number of cluster intersection tests
+        :param pick_time: seconds spent picking its cluster
+        :param grow_time: seconds spent growing its layers
+        :param remove_time: seconds spent removing Z from U
+        :return: None
+        """
+        kernel_time = pick_time + grow_time + remove_time
+        self.kernels.append({'phase': len(self.phases) - 1,
+                             'layers': len(ratios),
+                             'y': y_size,
+                             'Z': Z_size,
+                             'union size': union_size,
+                             'intersection tests': intersection_tests,
+                             'ratios': ratios,
+                             'time': kernel_time})
+        phase = self.phases[-1]
+        phase['kernels'] += 1
+        phase['covered'] += y_size
+        phase['time'] += kernel_time
+        self.times['pick'] += pick_time
+        self.times['grow'] += grow_time
+        self.times['remove'] += remove_time
+
+    def summary(self):
+        """
+        :return: dictionary of the totals of the run:
+                 'phases', 'kernels', 'layers', 'max layers' (of a single kernel),
+                 'intersection tests', 'union size' (of all kernels),
+                 'max stop ratio' (the ratio of the layer that stopped a kernel, closest to the bound),
+                 and the seconds spent in every stage
+        """
+        summary = {'phases': len(self.phases),
+                   'kernels': len(self.kernels),
+                   'layers': sum(kernel['layers'] for kernel in self.kernels),
+                   'max layers': max((kernel['layers'] for kernel in self.kernels), default=0),
+                   'intersection tests': sum(kernel['intersection tests'] for kernel in self.kernels),
+                   'union size': sum(kernel['union size'] for kernel in self.kernels),
+                   'max stop ratio': max((kernel['ratios'][-1] for kernel in self.kernels), default=0.0)}
+        summary.update(('{} time'.format(stage), seconds) for stage, seconds in self.times.items())
+        return summary
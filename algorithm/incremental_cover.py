@@ -0,0 +1,165 @@
+"""
+Maintenance of a max_cover output T, while clusters are added to, and removed from, the cover S.
+
+Every cluster t of T is constructed by max_cover for a set of clusters of S, its members,
+which are all subsets of t (see iter_max_cover), and Rad(t) <= (2k-1)*(the maximum radius of its members).
+So as long as every cluster of S is a member of a cluster of T, T coarsens S,
+and since the members are in S, Rad(T) <= (2k-1)Rad(S).
+
+An update re-covers only the clusters it affects, by running max_cover on them:
+    adding a cluster - the cluster is adopted by a cluster of T that contains it if there is one,
+                       otherwise it is re-covered together with the members of the clusters of T it intersects,
+                       which are replaced by the new clusters.
+    removing a cluster - the rest of the members of its cluster of T are re-covered, and replace it.
+Deg(T) <= 2k*|S|^(1/k) is checked after every update, and if it doesn't hold, T is constructed again for all of S.
+"""
+
+from collections import Counter
+import numpy as np
+from algorithm.max_cover import iter_max_cover
+from algorithm.validation import exceeds_bound
+from utilities.random_set import as_generator
+
+
+class MaxCoverState:
+    """
+    A cover S, and a coarsening cover T of it, constructed by max_cover, which are updated together.
+    """
+
+    def __init__(self, S, k, rng=None):
+        """
+        :param S: a cover of some graph g, any iterable of clusters
+        :param k: integer constant
+        :param rng: numpy random Generator, see max_cover
+        """
+        self.k = k
+        self.rng = as_generator(rng)
+        self.S = set(S)
+        self.rebuilds = 0
+        self.build()
+
+    def build(self):
+        """
+        constructs T for all of S
+        :return: None
+        """
+        self.members = {}
+        self.owners = {}
+        self.node_clusters = {}
+        self.degrees = Counter()
+        self.max_degree = 0
+        self.insert(self.S)
+
+    @property
+    def T(self):
+        """
+        :return: the current coarsening cover T
+        """
+        return set(self.members)
+
+    def degree_bound(self):
+        """
+        :return: 2k*|S|^(1/k), the bound on Deg(T)
+        """
+        return 2 * self.k * np.power(len(self.S), 1 / self.k)
+
+    def degree(self):
+        """
+        :return: Deg(T), i.e. the maximum number of clusters of T a node belongs to
+        """
+        while self.max_degree and not self.degrees[self.max_degree]:
+            self.max_degree -= 1
+        return self.max_degree
+
+    def add_t(self, t, s_clusters):
+        """
+        :param t: a cluster to add to T
+        :param s_clusters: the clusters of S it was constructed for
+        :return: None
+        """
+        for s in s_clusters:
+            self.owners[s] = t
+        if t in self.members:
+            self.members[t] |= s_clusters
+            return
+        self.members[t] = set(s_clusters)
+        for v in t:
+            v_clusters = self.node_clusters.setdefault(v, set())
+            if v_clusters:
+                self.degrees[len(v_clusters)] -= 1
+            v_clusters.add(t)
+            self.degrees[len(v_clusters)] += 1
+            self.max_degree = max(self.max_degree, len(v_clusters))
+
+    def remove_t(self, t):
+        """
+        :param t: a cluster of T
+        :return: the clusters of S it was constructed for
+        """
+        for v in t:
+            v_clusters = self.node_clusters[v]
+            self.degrees[len(v_clusters)] -= 1
+            v_clusters.discard(t)
+            if v_clusters:
+                self.degrees[len(v_clusters)] += 1
+            else:
+                del self.node_clusters[v]
+        return self.members.pop(t)
+
+    def insert(self, clusters):
+        """
+        constructs clusters of T for clusters of S, by max_cover, and adds them to T
+        :param clusters: a set of clusters of S, which are not members of any cluster of T
+        :return: None
+        """
+        for t, s_clusters in iter_max_cover(clusters, self.k, rng=self.rng):
+            self.add_t(t, s_clusters)
+
+    def check_degree(self):
+        """
+        constructs T again for all of S, if Deg(T) exceeds its bound, beyond its rounding errors
+        :return: None
+        """
+        if exceeds_bound(self.degree(), self.degree_bound()):
+            self.rebuilds += 1
+            self.build()
+
+    def add_cluster(self, s):
+        """
+        :param s: a cluster to add to S
+        :return: None
+        """
+        if s in self.S:
+            return
+        self.S.add(s)
+        nodes = iter(s)
+        containing = set(self.node_clusters.get(next(nodes), ())) if s else set()
+        for v in nodes:
+            if not containing:
+                break
+            containing &= self.node_clusters.get(v, set())
+        if containing:
+            t = min(containing, key=len)
+            self.owners[s] = t
+            self.members[t].add(s)
+        else:
+            intersecting = set()
+            for v in s:
+                intersecting |= self.node_clusters.get(v, set())
+            dirty = {s}
+            for t in intersecting:
+                dirty |= self.remove_t(t)
+            self.insert(dirty)
+        self.check_degree()
+
+    def remove_cluster(self, s):
+        """
+        :param s: a cluster of S
+        :return: None
+        """
+        self.S.remove(s)
+        t = self.owners.pop(s)
+        dirty = self.remove_t(t)
+        dirty.discard(s)
+        self.insert(dirty)
+        self.check_degree()
@@ -1,7 +1,210 @@
+from time import perf_counter
 import numpy as np
+from algorithm.backends import ClusterCollection, make_collection
+from algorithm.parallel_cover import iter_parallel_max_cover
+from algorithm.validation import validate_procedure_cover, validate_max_cover
+from utilities.random_set import RandomSet, as_generator
 
+# version of the max_cover output for the same input and random choices,
+# to be increased whenever a change makes the output different,
+# so cached outputs are not used (see algorithm.cover_cache)
+ALGORITHM_VERSION = 1
 
-def procedure_cover(R, k):
+
+class ClusterIndex:
+    """
+    The collection of clusters U used by procedure_cover,
+    together with an inverted index that maps each node to the clusters of U it belongs to.
+
+    Growing a kernel only needs the clusters that touch the nodes added to it in the last layer,
+    so the index avoids scanning the entire collection for every layer.
+    """
+
+    def __init__(self, clusters, rng=None):
+        """
+        :param clusters: a collection of clusters
+        :param rng: numpy random Generator of the random picks, see utilities.random_set.as_generator
+        """
+        self.clusters = RandomSet(clusters, rng)
+        self.node_clusters = {}
+        for cluster in self.clusters:
+            for v in cluster:
+                self.node_clusters.setdefault(v, set()).add(cluster)
+
+    def __bool__(self):
+        return bool(self.clusters)
+
+    def __len__(self):
+        return len(self.clusters)
+
+    def copy(self):
+        """
+        :return: an independent copy of the collection and its index
+        """
+        index = ClusterIndex.__new__(ClusterIndex)
+        index.clusters = self.clusters.copy()
+        index.node_clusters = {v: set.copy(v_clusters) for v, v_clusters in self.node_clusters.items()}
+        return index
+
+    def pick(self):
+        """
+        :return: a random cluster in the collection
+        """
+        return self.clusters.pick()
+
+    def touching(self, nodes):
+        """
+        :param nodes: a collection of nodes
+        :return: the set of clusters in the collection that contain at least one of nodes
+        """
+        clusters = set()
+        for v in nodes:
+            clusters |= self.node_clusters.get(v, ())
+        return clusters
+
+    def layers(self, S):
+        """
+        grows a kernel around cluster S, layer by layer.
+        each layer y is the previous Z, Y is the union of the clusters in y,
+        and Z is the set of clusters in the collection that intersect Y.
+
+        since Y only grows, the clusters that intersect it are the clusters of the previous Z,
+        and the clusters that touch the nodes which were added to Y in the current layer.
+
+        :param S: a cluster in the collection
+        :return: generator of (y, Y, Z) for each layer
+        """
+        Y = frozenset()
+        y, Z = set(), {S}
+        while True:
+            new_clusters = Z - y
+            y = Z
+            new_nodes = frozenset().union(*new_clusters) - Y
+            Y = Y | new_nodes
+            Z = y | self.touching(new_nodes)
+            yield y, Y, Z
+
+    def remove(self, clusters):
+        """
+        removes clusters from the collection and from the index
+        :param clusters: a collection of clusters
+        :return: None
+        """
+        self.clusters -= clusters
+        for cluster in clusters:
+            for v in cluster:
+                v_clusters = self.node_clusters[v]
+                v_clusters.discard(cluster)
+                if not v_clusters:
+                    del self.node_clusters[v]
+
+    def layer_counts(self, Y, previous_Y):
+        """
+        :param Y: the nodes of a layer
+        :param previous_Y: the nodes of the previous layer, or None for the first layer
+        :return: number of nodes in Y, and number of intersection tests made for the layer,
+                 i.e. the clusters looked up in the index for the nodes added to Y
+        """
+        new_nodes = Y if previous_Y is None else Y - previous_Y
+        return len(Y), sum(len(self.node_clusters.get(v, ())) for v in new_nodes)
+
+    def as_cluster(self, Y):
+        return Y
+
+    def as_clusters(self, y):
+        return y
+
+
+def cover_engine(R, backend='frozenset', rng=None):
+    """
+    :param R: a collection of clusters
+    :param backend: 'frozenset' for a ClusterIndex of R,
+                    name of an array based backend (see algorithm.backends),
+                    or a ClusterCollection that contains all clusters of R
+    :param rng: numpy random Generator of the random picks
+    :return: the collection U used by procedure_cover
+    """
+    if isinstance(backend, str):
+        if backend == 'frozenset':
+            return ClusterIndex(R, rng)
+        backend = make_collection(R, backend)
+    return backend.engine(R, rng)
+
+
+def iter_procedure_cover(R, k, backend='frozenset', rng=None, stats=None, radii=None):
+    """
+    runs procedure_cover(R, k), and yields every kernel as soon as it is constructed
+
+    :param R: a collection of clusters
+    :param k: integer constant
+    :param backend: representation of the clusters, see cover_engine
+    :param rng: numpy random Generator, see utilities.random_set.as_generator
+    :param stats: optional MaxCoverStats (see algorithm.cover_stats), the run is recorded in it as a phase
+    :param radii: optional ClusterRadii of the clusters of R (see algorithm.cover_radii),
+                  the radius bound of every cluster of DT is recorded in it
+    :return: generator of (Y, y) for each kernel, Y is a cluster of DT, and y is the set of clusters of DR it contains
+    """
+    U = cover_engine(R, backend, as_generator(rng))
+    threshold = np.power(len(R), 1 / k)
+    if stats is not None or radii is not None:
+        yield from iter_recorded_kernels(U, threshold, stats, radii)
+        return
+    while U:
+        S = U.pick()
+        for y, Y, Z in U.layers(S):
+            if len(Z) <= threshold * len(y):
+                break
+        U.remove(Z)
+        yield U.as_cluster(Y), U.as_clusters(y)
+
+
+def iter_recorded_kernels(U, threshold, stats, radii=None):
+    """
+    the kernels loop of iter_procedure_cover, which also records every kernel in stats, and its radius bound in radii
+    :param U: the collection used by procedure_cover, see cover_engine
+    :param threshold: |R|^(1/k), the growth test bound
+    :param stats: MaxCoverStats, or None
+    :param radii: ClusterRadii, or None
+    :return: generator of (Y, y) for each kernel, see iter_procedure_cover
+    """
+    if stats is not None:
+        stats.start_phase(len(U), threshold)
+    while U:
+        start = perf_counter()
+        S = U.pick()
+        picked = perf_counter()
+        ratios = []
+        intersection_tests = 0
+        previous_Y = None
+        upper = initial = None
+        previous_clusters = set()
+        for y, Y, Z in U.layers(S):
+            if stats is not None:
+                union_size, layer_tests = U.layer_counts(Y, previous_Y)
+                intersection_tests += layer_tests
+                previous_Y = Y
+                ratios.append(float(len(Z) / (threshold * len(y))))
+            if radii is not None:
+                clusters = U.as_clusters(y)
+                if initial is None:
+                    # the first layer is the cluster S alone
+                    initial = next(iter(clusters))
+                upper = radii.grow(upper, clusters - previous_clusters)
+                previous_clusters = clusters
+            if len(Z) <= threshold * len(y):
+                break
+        grown = perf_counter()
+        U.remove(Z)
+        if stats is not None:
+            stats.add_kernel(ratios, len(y), len(Z), union_size, intersection_tests,
+                             picked - start, grown - picked, perf_counter() - grown)
+        Y, y = U.as_cluster(Y), U.as_clusters(y)
+        if radii is not None:
+            radii.add_cluster(Y, upper, initial)
+        yield Y, y
+
+
+def procedure_cover(R, k, backend='frozenset', rng=None, stats=None, validate=False, radii=None):
     """
     Given a collection of clusters R, and integer k,
     the collections DR, DT, constructed by procedure_cover satisfy the following:
@@ -14,27 +217,24 @@ def procedure_cover(R, k):
 
     :param R: a collection of clusters
     :param k: integer constant
+    :param backend: representation of the clusters, see cover_engine
+    :param rng: numpy random Generator, see utilities.random_set.as_generator
+    :param stats: optional MaxCoverStats, see iter_procedure_cover
+    :param validate: check properties (1)-(3) of the output (see algorithm.validation.validate_procedure_cover),
+                     and raise CoverValidationError if any of them does not hold
+    :param radii: optional ClusterRadii, see iter_procedure_cover
     :return: collections DR, DT
     """
-    U = set.copy(R)
     DR, DT = set(), set()
-    while U:
-        S = np.random.choice(list(U))
-        Z = set()
-        Z.add(S)
-        while True:
-            y = Z
-            Y = frozenset.union(*list(y))
-            Z = {S for S in U if frozenset.intersection(S, Y)}
-            if len(Z) <= np.power((len(R)), (1 / k)) * len(y):
-                break
-        U -= Z
+    for Y, y in iter_procedure_cover(R, k, backend, rng, stats, radii):
         DT.add(Y)
         DR |= y
+    if validate:
+        validate_procedure_cover(R, DR, DT, k)
     return DR, DT
 
 
-def max_cover(S, k):
+def max_cover(S, k, backend='frozenset', rng=None, workers=1, stats=None, validate=False, radii=None):
     """
     Given a graph cover S, and integer k >= 1,
     max cover construct a coarsening cover T (*), that satisfies the following:
@@ -43,15 +243,149 @@ def max_cover(S, k):
 
     (*) T coarsens S if for every s in S, there exists t in T s.t. s is a subset of T
 
-    :param S: a cover of some graph g
+    T is collected from iter_max_cover(S, k), which yields its clusters as soon as they are constructed.
+
+    :param S: a cover of some graph g, any iterable of clusters, e.g. ClusterArrays of a stored cover
+              (see utilities.storage). S is read into memory as a set of frozensets, see iter_max_cover
     :param k: integer constant
+    :param backend: representation of the clusters,
+                    'frozenset' (default), or one of the array based backends 'bitset' and 'mask'
+                    (see algorithm.backends), which produce the same T for the same random choices,
+                    or a ClusterCollection that contains all clusters of S, e.g. to reuse it across runs
+    :param rng: numpy random Generator of the random choices, or a seed for one,
+                by default it is seeded from numpy's global random state (see utilities.random_set.as_generator)
+    :param workers: with more than 1, batches of kernels are grown at once on worker processes,
+                    over their own arrays of the clusters (see algorithm.parallel_cover),
+                    so backend must be 'frozenset'.
+                    T is then the same for any number of workers, but not the same as for a single one
+    :param stats: optional MaxCoverStats (see algorithm.cover_stats),
+                  the phases and kernels of the run are recorded in it.
+                  it is only recorded with a single worker, and without it the run has no recording overhead
+    :param validate: check that T coarsens S and property (2) (see algorithm.validation.validate_max_cover),
+                     and raise CoverValidationError if any of them does not hold
+    :param radii: optional ClusterRadii of the clusters of S (see algorithm.cover_radii),
+                  the radius bound of every cluster of T is recorded in it as T is constructed,
+                  so Rad(T) is bounded without calculating it. only supported with a single worker
     :return: coarsening cover T
     """
-    R = set.copy(S)
-    T = set()
+    if validate:
+        S = set(S)
+    if workers > 1:
+        if radii is not None:
+            raise ValueError('radii are only recorded with a single worker')
+        if stats is not None:
+            raise ValueError('stats are only recorded with a single worker')
+        if not isinstance(backend, str) or backend != 'frozenset':
+            raise ValueError('backend {} is only supported with a single worker'.format(backend))
+        T = {t for t, _ in iter_parallel_max_cover(S, k, workers, rng)}
+    else:
+        T = {t for t, _ in iter_max_cover(S, k, backend, rng, stats, radii)}
+    if validate:
+        validate_max_cover(S, T, k)
+    return T
+
+
+def iter_max_cover(S, k, backend='frozenset', rng=None, stats=None, radii=None):
+    """
+    runs max_cover(S, k), and yields every cluster of T as soon as procedure_cover constructs it,
+    so the clusters can be processed (e.g. their radii calculated, or saved) while the rest of T is constructed.
+    the clusters are yielded in the order, and with the random choices, max_cover constructs them.
+
+    the phases run over the frozensets of the clusters of S, which are all read into memory first,
+    so a stored cover is only streamed while it is read, and the memory of the run still grows with the size of S.
+
+    :param S: a cover of some graph g, any iterable of clusters, e.g. ClusterArrays of a stored cover
+              (see utilities.storage)
+    :param k: integer constant
+    :param backend: representation of the clusters, see max_cover
+    :param rng: numpy random Generator, see max_cover
+    :param stats: optional MaxCoverStats, see max_cover
+    :param radii: optional ClusterRadii, see max_cover
+    :return: generator of (t, s) for each cluster t of T, s is the set of clusters of S that t was constructed for,
+             i.e. every cluster of S is in exactly one s, and it is a subset of its t
+    """
+    R = set(S)
+    rng = as_generator(rng)
+    if not isinstance(backend, ClusterCollection) and backend != 'frozenset':
+        backend = make_collection(R, backend)
     while R:
-        DR, DT = procedure_cover(R, k)
-        T |= DT
+        DR = set()
+        for Y, y in iter_procedure_cover(R, k, backend, rng, stats, radii):
+            DR |= y
+            yield Y, y
         R -= DR
-    return T
 
+
+def procedure_cover_sweep(R, ks, rng=None):
+    """
+    runs procedure_cover(R, k) for every k in ks in a single computation.
+
+    runs of different k values make the same choices as long as they stop their kernels at the same layers,
+    so they share the random kernels and the layers grown around them.
+    when a kernel's growth test stops the runs of some k values at different layers,
+    the runs split, and each group of k values continues with its own copy of U.
+
+    :param R: a collection of clusters
+    :param ks: integer constants
+    :param rng: numpy random Generator, see utilities.random_set.as_generator
+    :return: list of (group, DR, DT), where group is a list of k values, whose procedure_cover output is DR, DT
+    """
+    results = []
+    runs = [(sorted(ks), ClusterIndex(R, as_generator(rng)), set(), set())]
+    while runs:
+        group, U, DR, DT = runs.pop()
+        if not U:
+            results.append((group, DR, DT))
+            continue
+        S = U.pick()
+        stops = []
+        for y, Y, Z in U.layers(S):
+            stopped = [k for k in group if len(Z) <= np.power((len(R)), (1 / k)) * len(y)]
+            if stopped:
+                stops.append((stopped, y, Y, Z))
+                group = group[len(stopped):]
+            if not group:
+                break
+        # smaller k values stop first, the last group of k values takes the current U, DR, DT
+        for i, (stopped, y, Y, Z) in enumerate(stops):
+            if i < len(stops) - 1:
+                V, DV, DW = U.copy(), set.copy(DR), set.copy(DT)
+            else:
+                V, DV, DW = U, DR, DT
+            V.remove(Z)
+            DW.add(Y)
+            DV |= y
+            runs.append((stopped, V, DV, DW))
+    return results
+
+
+def max_cover_sweep(S, ks, rng=None):
+    """
+    runs max_cover(S, k) for every k in ks in a single computation,
+    sharing the phases, kernels and layers between k values, as long as their runs make the same choices
+    (see procedure_cover_sweep).
+    the cover constructed for every k is a possible output of max_cover(S, k),
+    therefore it satisfies the same Rad and Deg guarantees.
+
+    :param S: a cover of some graph g, e.g. a set of clusters, or ClusterArrays of a stored cover
+    :param ks: integer constants
+    :param rng: numpy random Generator, see max_cover
+    :return: dictionary of k -> coarsening cover T
+    """
+    rng = as_generator(rng)
+    covers = {}
+    runs = [(sorted(set(ks)), set(S), set())]
+    while runs:
+        group, R, T = runs.pop()
+        if not R:
+            covers.update((k, set.copy(T)) for k in group)
+            continue
+        phase_results = procedure_cover_sweep(R, group, rng)
+        for i, (phase_group, DR, DT) in enumerate(phase_results):
+            if i < len(phase_results) - 1:
+                runs.append((phase_group, R - DR, T | DT))
+            else:
+                R -= DR
+                T |= DT
+                runs.append((phase_group, R, T))
+    return covers
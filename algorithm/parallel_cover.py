@@ -0,0 +1,213 @@
+"""
+Parallel max_cover, growing several kernels of procedure_cover at once on worker processes.
+
+Every batch of kernels is grown speculatively from a batch of random seed clusters,
+against the collection U as it is when the batch starts, which the workers read from shared memory.
+The kernels are then committed in the order of their seeds.
+A kernel is committed only if none of the clusters of its Z was removed from U by an earlier kernel of the batch,
+in which case it is exactly the kernel procedure_cover would have grown from its seed at that point.
+Otherwise its seed is retried first in the next batch.
+The first kernels of every phase are usually large enough to conflict with each other,
+so a phase starts with a batch of a single kernel, and every batch is twice the number of kernels committed before it.
+
+So the output is a possible output of max_cover, and satisfies the same properties,
+and since the batches don't depend on the number of workers, it is the same for any number of workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from algorithm.backends import BitsetClusters
+from utilities.random_set import RandomSet, as_generator
+from utilities.shared_arrays import SharedArrays, attach_arrays
+
+# maximum number of kernels grown speculatively together
+KERNELS_BATCH = 64
+
+# the collection arrays attached by a kernels worker process, see attach_collection
+_WORKER_COLLECTION = None
+
+
+def collection_arrays(collection):
+    """
+    :param collection: a ClusterCollection
+    :return: CSR arrays of the clusters nodes (clusters_indptr, clusters_nodes),
+             and CSR arrays of the nodes clusters (nodes_indptr, nodes_clusters)
+    """
+    return collection.indptr, collection.indices, collection.nodes_indptr, collection.nodes_clusters
+
+
+def csr_lists(indptr, indices):
+    """
+    :param indptr: CSR index pointers
+    :param indices: CSR indices
+    :return: list of the rows, each as a list of its indices
+    """
+    indices = indices.tolist()
+    bounds = indptr.tolist()
+    return [indices[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+class KernelGrower:
+    """
+    Grows kernels over the collection arrays, and the alive mask of U.
+    Like ClusterIndex, it keeps for every node the list of its clusters in U,
+    which is filtered by the alive mask whenever the node is visited, as U only shrinks within a phase.
+    """
+
+    def __init__(self, arrays, alive):
+        """
+        :param arrays: the collection arrays, see collection_arrays
+        :param alive: boolean array, True for every cluster in U
+        """
+        clusters_indptr, clusters_nodes, nodes_indptr, nodes_clusters = arrays
+        self.clusters_nodes = csr_lists(clusters_indptr, clusters_nodes)
+        self.nodes_clusters = csr_lists(nodes_indptr, nodes_clusters)
+        self.alive = alive
+        self.phase = None
+        self.node_clusters = {}
+
+    def node_alive_clusters(self, v):
+        """
+        :param v: a node id
+        :return: list of the clusters of v in U
+        """
+        alive = self.alive
+        v_clusters = self.node_clusters.get(v)
+        if v_clusters is None:
+            v_clusters = self.nodes_clusters[v]
+        v_clusters = self.node_clusters[v] = [c for c in v_clusters if alive[c]]
+        return v_clusters
+
+    def grow(self, seed, threshold, phase):
+        """
+        grows a kernel around the seed cluster, layer by layer, exactly as ClusterIndex.layers,
+        until the growth test of procedure_cover stops it
+
+        :param seed: a cluster id
+        :param threshold: |R|^(1/k), the growth test bound
+        :param phase: number of the max_cover phase, U is restored to R when a new phase starts
+        :return: sets Y of nodes ids, and y, Z of clusters ids
+        """
+        if phase != self.phase:
+            self.phase = phase
+            self.node_clusters = {}
+        Y, y, Z = set(), set(), {seed}
+        while True:
+            new_clusters = Z - y
+            y = Z
+            new_nodes = set()
+            for c in new_clusters:
+                new_nodes.update(self.clusters_nodes[c])
+            new_nodes -= Y
+            Y |= new_nodes
+            Z = set(y)
+            for v in new_nodes:
+                Z.update(self.node_alive_clusters(v))
+            if len(Z) <= threshold * len(y):
+                return Y, y, Z
+
+
+def attach_collection(spec):
+    """
+    initializer of a kernels worker process, attaches to the shared collection arrays and alive mask
+    :param spec: SharedArrays.spec of the collection arrays, followed by the alive mask
+    :return: None
+    """
+    global _WORKER_COLLECTION
+    memories, arrays = attach_arrays(spec)
+    # the memories are kept with the grower, so the alive mask buffer stays open
+    _WORKER_COLLECTION = KernelGrower(arrays[:-1], memoryview(arrays[-1])), memories
+
+
+def grow_kernels(threshold, phase, seeds):
+    """
+    kernels worker task, grows a kernel around every seed over the attached collection
+    :param threshold: the growth test bound
+    :param phase: number of the max_cover phase
+    :param seeds: list of clusters ids
+    :return: list of the kernels (Y, y, Z)
+    """
+    grower, _ = _WORKER_COLLECTION
+    return [grower.grow(seed, threshold, phase) for seed in seeds]
+
+
+def pick_seeds(U, retries, batch):
+    """
+    :param U: RandomSet of the clusters ids in U
+    :param retries: seeds of kernels which were not committed in the previous batch
+    :param batch: number of seeds
+    :return: list of different seeds, the retries that are still in U first, and then random clusters of U
+    """
+    seeds = [seed for seed in retries if seed in U]
+    chosen = set(seeds)
+    if len(U) <= batch:
+        return seeds + [seed for seed in U if seed not in chosen]
+    while len(seeds) < batch:
+        seed = U.pick()
+        if seed not in chosen:
+            chosen.add(seed)
+            seeds.append(seed)
+    return seeds
+
+
+def iter_parallel_max_cover(S, k, workers=1, rng=None, batch=KERNELS_BATCH):
+    """
+    runs max_cover(S, k), growing a batch of kernels at once on worker processes (see module documentation),
+    and yields every cluster of T as soon as its kernel is committed
+
+    :param S: a cover of some graph g, any iterable of clusters
+    :param k: integer constant
+    :param workers: number of worker processes, with 1 the kernels are grown in this process
+    :param rng: numpy random Generator, see max_cover
+    :param batch: maximum number of kernels grown together
+    :return: generator of (t, s) for each cluster t of T, see iter_max_cover
+    """
+    # only the arrays of the collection are used, which are the same for every representation
+    collection = BitsetClusters(set(S))
+    rng = as_generator(rng)
+    arrays = collection_arrays(collection)
+    in_R = np.ones(len(collection), dtype=bool)
+    with SharedArrays(list(arrays) + [np.zeros(len(collection), dtype=bool)]) as shared:
+        alive = shared.arrays[-1]
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=attach_collection,
+                                           initargs=(shared.spec,))
+        else:
+            grower = KernelGrower(arrays, memoryview(alive))
+        try:
+            phase = 0
+            while in_R.any():
+                phase += 1
+                threshold = np.power(np.count_nonzero(in_R), 1 / k)
+                alive[:] = in_R
+                U = RandomSet(np.flatnonzero(in_R).tolist(), rng)
+                retries = []
+                batch_size = 1
+                while U:
+                    seeds = pick_seeds(U, retries, batch_size)
+                    if executor is None:
+                        kernels = [grower.grow(seed, threshold, phase) for seed in seeds]
+                    else:
+                        chunks = [chunk.tolist() for chunk in np.array_split(seeds, workers) if len(chunk)]
+                        kernels = [kernel for chunk_kernels in
+                                   executor.map(partial(grow_kernels, threshold, phase), chunks)
+                                   for kernel in chunk_kernels]
+                    retries = []
+                    for seed, (Y, y, Z) in zip(seeds, kernels):
+                        Z = np.fromiter(Z, dtype=np.int64, count=len(Z))
+                        if not alive[Z].all():
+                            retries.append(seed)
+                            continue
+                        alive[Z] = False
+                        U -= Z.tolist()
+                        in_R[np.fromiter(y, dtype=np.int64, count=len(y))] = False
+                        yield frozenset(collection.nodes[v] for v in Y), {collection.clusters[c] for c in y}
+                    batch_size = min(batch, max(1, 2 * (len(seeds) - len(retries))))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            else:
+                grower.alive.release()
+            del alive
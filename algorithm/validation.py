@@ -0,0 +1,191 @@
+"""
+Validation of procedure_cover and max_cover outputs, cheap enough to run after every call.
+
+Every check indexes the clusters by their nodes in a single pass (a dictionary of node -> its clusters, or its owner),
+so instead of comparing every pair of clusters, a cluster is only compared with the clusters that share its nodes:
+    coarsening - a cluster of R is only compared with the clusters of T that contain one of its nodes
+    disjointness - a node owned by two clusters of DT is found as soon as the second one is indexed
+    Deg - the degree of every node is the number of its clusters in the index
+so they all take time linear in the total size of the clusters, times the degree of T for coarsening.
+The Rad bounds need the radii of the clusters, and are only checked when the graph is given.
+
+A violated property raises CoverValidationError, with the first clusters found to violate it.
+"""
+
+from collections import defaultdict
+import numpy as np
+from utilities.util import calculate_collection_radius
+
+
+class CoverValidationError(ValueError):
+    """
+    A property of a procedure_cover or max_cover output that does not hold.
+    """
+
+    def __init__(self, message, cover_property, clusters):
+        """
+        :param message: description of the violation
+        :param cover_property: name of the violated property, e.g. 'coarsening'
+        :param clusters: the violating clusters
+        """
+        super().__init__(message)
+        self.cover_property = cover_property
+        self.clusters = clusters
+
+
+def nodes_clusters(collection):
+    """
+    :param collection: a collection of clusters
+    :return: dictionary of node -> list of the clusters of collection it belongs to
+    """
+    node_clusters = defaultdict(list)
+    for cluster in collection:
+        for v in cluster:
+            node_clusters[v].append(cluster)
+    return node_clusters
+
+
+def find_uncovered(r, t, node_clusters=None):
+    """
+    :param r: a collection of clusters
+    :param t: a collection of clusters
+    :param node_clusters: nodes_clusters(t), if it was already calculated
+    :return: the first cluster of r that is not a subset of any cluster of t, or None if t coarsens r
+    """
+    if node_clusters is None:
+        node_clusters = nodes_clusters(t)
+    for cluster in r:
+        # a cluster of t that contains cluster contains any of its nodes, so the candidates of any node will do
+        for v in cluster:
+            if not any(cluster <= candidate for candidate in node_clusters.get(v, ())):
+                return cluster
+            break
+    return None
+
+
+def find_intersecting(collection):
+    """
+    :param collection: a collection of clusters
+    :return: the first pair of clusters of collection that share a node, or None if they are all disjoint
+    """
+    owners = {}
+    for i, cluster in enumerate(collection):
+        for v in cluster:
+            owner, owner_cluster = owners.setdefault(v, (i, cluster))
+            if owner != i:
+                return owner_cluster, cluster
+    return None
+
+
+def exceeds_bound(value, bound):
+    """
+    :param value: a degree, or any other value bounded by bound
+    :param bound: an upper bound, e.g. 2k*|S|^(1/k), which is only calculated up to rounding errors
+    :return: True if value is above bound, and not within rounding errors of it
+    """
+    return value > bound and not np.isclose(value, bound)
+
+
+def find_degree_violation(collection, bound, node_clusters=None):
+    """
+    :param collection: a collection of clusters
+    :param bound: maximum degree of a node, a degree within rounding errors of it is not above it
+    :param node_clusters: nodes_clusters(collection), if it was already calculated
+    :return: the clusters of the first node whose degree in collection exceeds bound, or None if there is no such node
+    """
+    if node_clusters is None:
+        node_clusters = nodes_clusters(collection)
+    for v_clusters in node_clusters.values():
+        if exceeds_bound(len(v_clusters), bound):
+            return v_clusters
+    return None
+
+
+def find_wide_cluster(g, collection, bound):
+    """
+    :param g: graph, or its GraphArrays
+    :param collection: a collection of clusters in g
+    :param bound: maximum radius of a cluster
+    :return: the first cluster of collection whose radius in g exceeds bound, or None if there is no such cluster
+    """
+    for cluster in collection:
+        if calculate_collection_radius(g, (cluster,), method='bounded', cache=True) > bound:
+            return cluster
+    return None
+
+
+def check_radius_bound(g, covered, coarsening, k):
+    """
+    :param g: graph, or its GraphArrays
+    :param covered: R or S
+    :param coarsening: DT or T
+    :param k: integer constant
+    :return: None, raises CoverValidationError if Rad(coarsening) > (2k-1)*Rad(covered)
+    """
+    bound = (2 * k - 1) * calculate_collection_radius(g, covered, method='bounded', cache=True)
+    wide_cluster = find_wide_cluster(g, coarsening, bound)
+    if wide_cluster is not None:
+        raise CoverValidationError('a cluster has a radius larger than (2k-1)*Rad = {}'.format(bound),
+                                   'radius', [wide_cluster])
+
+
+def validate_procedure_cover(R, DR, DT, k, g=None):
+    """
+    checks the properties of procedure_cover(R, k) output (see procedure_cover):
+        (0) DR is a subset of R
+        (1) DT coarsens DR
+        (2) the clusters of DT are disjoint
+        (3) |DR| >= |R|^(1-1/k)
+        (4) Rad(DT) <= (2k-1)*Rad(R), only if g is given
+
+    :param R: a collection of clusters
+    :param DR: collection DR of procedure_cover output
+    :param DT: collection DT of procedure_cover output
+    :param k: integer constant
+    :param g: optional graph, or its GraphArrays, of the clusters
+    :return: None, raises CoverValidationError with the violating clusters if a property does not hold
+    """
+    R = set(R)
+    outside = [cluster for cluster in DR if cluster not in R]
+    if outside:
+        raise CoverValidationError('DR has clusters which are not in R', 'subset', outside[:1])
+    uncovered = find_uncovered(DR, DT)
+    if uncovered is not None:
+        raise CoverValidationError('DT does not coarsen DR', 'coarsening', [uncovered])
+    intersecting = find_intersecting(DT)
+    if intersecting is not None:
+        raise CoverValidationError('clusters of DT are not disjoint', 'disjointness', list(intersecting))
+    # |DR| may be exactly on the bound, which is then only rounded above it, e.g. 8^(2/3) = 4.000000000000001
+    bound = np.power(len(R), 1 - 1 / k)
+    if len(DR) < bound and not np.isclose(len(DR), bound):
+        raise CoverValidationError('|DR| = {} < |R|^(1-1/k) = {}'.format(len(DR), bound), 'DR size', [])
+    if g is not None:
+        check_radius_bound(g, R, DT, k)
+
+
+def validate_max_cover(S, T, k, g=None):
+    """
+    checks the properties of max_cover(S, k) output (see max_cover):
+        (0) T coarsens S
+        (1) Rad(T) <= (2k-1)Rad(S), only if g is given
+        (2) Deg(T) <= 2k*|S|^(1/k)
+
+    :param S: a cover
+    :param T: max_cover output
+    :param k: integer constant
+    :param g: optional graph, or its GraphArrays, of the clusters
+    :return: None, raises CoverValidationError with the violating clusters if a property does not hold
+    """
+    S = S if isinstance(S, (set, frozenset)) else set(S)
+    node_clusters = nodes_clusters(T)
+    uncovered = find_uncovered(S, T, node_clusters)
+    if uncovered is not None:
+        raise CoverValidationError('T does not coarsen S', 'coarsening', [uncovered])
+    # a degree may be exactly on the bound, which is then only rounded below it, e.g. 6*64^(1/3) = 23.999999999999996
+    bound = 2 * k * np.power(len(S), 1 / k)
+    violation = find_degree_violation(T, bound, node_clusters)
+    if violation is not None:
+        raise CoverValidationError('a node belongs to more than 2k*|S|^(1/k) = {} clusters of T'.format(bound),
+                                   'degree', violation)
+    if g is not None:
+        check_radius_bound(g, S, T, k)
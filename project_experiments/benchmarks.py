@@ -0,0 +1,320 @@
+"""
+Performance benchmarks of max_cover, and of the utilities its inputs and outputs are generated and measured with.
+
+Every benchmark times a single function over a grid of its parameters:
+    n - number of nodes, p - edge probability, cover_size, cluster_size - maximum cluster size, and k.
+The grid is swept one parameter at a time around BASE_PARAMS, so the time of every benchmark
+can be fitted to an empirical scaling exponent in each of its parameters, i.e. time ~ param^exponent.
+The inputs are generated from a fixed seed, and the global random state is seeded again before every run,
+so every run of a grid point does exactly the same work.
+
+For every grid point the best wall time of a few runs is recorded, together with the peak memory
+allocated by a single run (traced separately, as tracing slows the run), and the throughput in units per second,
+e.g. clusters of the input cover for max_cover.
+
+Usage:
+    python -m project_experiments.benchmarks --output baseline.json
+    python -m project_experiments.benchmarks --compare baseline.json
+the second run fails if any grid point is slower, or uses more memory, than in baseline.json beyond the tolerance.
+
+The array based backends of max_cover only pay off on large covers, which the 'large' grid is swept around:
+    python -m project_experiments.benchmarks --type large --benchmarks max_cover max_cover_bitset max_cover_mask
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from functools import partial
+import numpy as np
+from utilities.util import (generate_connected_graph,
+                            generate_weighted_connected_graph,
+                            generate_cover,
+                            calculate_collection_radius,
+                            calculate_collection_degree)
+from algorithm.max_cover import procedure_cover, max_cover
+
+BENCHMARK_SEED = 0
+REPEATS = 3
+
+# the grid point every parameter is swept around
+BASE_PARAMS = OrderedDict([('n', 200),
+                           ('p', 0.1),
+                           ('cover_size', 50),
+                           ('cluster_size', 20),
+                           ('k', 4)])
+
+# the values every parameter is swept over, they all include the base value
+PARAMS_GRIDS = {'normal': {'n': [100, 200, 400, 800],
+                           'p': [0.05, 0.1, 0.2, 0.4],
+                           'cover_size': [25, 50, 100, 200],
+                           'cluster_size': [10, 20, 40, 80],
+                           'k': [2, 4, 8]},
+                'small': {'n': [100, 200, 400],
+                          'p': [0.05, 0.1, 0.2],
+                          'cover_size': [25, 50, 100],
+                          'cluster_size': [10, 20, 40],
+                          'k': [2, 4]},
+                'large': {'n': [2500, 5000, 10000],
+                          'p': [0.0005, 0.001, 0.002],
+                          'cover_size': [1000, 5000, 20000],
+                          'cluster_size': [20, 50, 100],
+                          'k': [2, 3, 4]}}
+
+# the grid point every parameter of a grid is swept around, if it is not BASE_PARAMS.
+# the 'large' grid is a sparse graph with thousands of clusters, where kernels are grown over many layers
+GRIDS_BASE_PARAMS = {'large': OrderedDict([('n', 5000),
+                                           ('p', 0.001),
+                                           ('cover_size', 5000),
+                                           ('cluster_size', 50),
+                                           ('k', 3)])}
+
+# allowed relative increase of a time or a peak memory over the baseline, before it is flagged as a regression
+TOLERANCE = 0.25
+# times below this number of seconds are too noisy to be compared
+MIN_COMPARED_TIME = 1e-3
+
+
+def benchmark_cover(n, p, cover_size, cluster_size):
+    """
+    :return: the weighted graph and the cover the benchmarks of the grid point are run on
+    """
+    np.random.seed(BENCHMARK_SEED)
+    g = generate_weighted_connected_graph(n, p)
+    return g, generate_cover(g, cover_size, max_cluster_size=cluster_size)
+
+
+def generate_connected_graph_benchmark(n, p):
+    return partial(generate_connected_graph, n, p), n
+
+
+def generate_cover_benchmark(n, p, cover_size, cluster_size):
+    np.random.seed(BENCHMARK_SEED)
+    g = generate_weighted_connected_graph(n, p)
+    return partial(generate_cover, g, cover_size, max_cluster_size=cluster_size), cover_size
+
+
+def collection_radius_benchmark(n, p, cover_size, cluster_size):
+    g, cover = benchmark_cover(n, p, cover_size, cluster_size)
+    return partial(calculate_collection_radius, g, cover), len(cover)
+
+
+def collection_degree_benchmark(n, p, cover_size, cluster_size):
+    _, cover = benchmark_cover(n, p, cover_size, cluster_size)
+    return partial(calculate_collection_degree, cover), sum(len(cluster) for cluster in cover)
+
+
+def procedure_cover_benchmark(n, p, cover_size, cluster_size, k):
+    _, cover = benchmark_cover(n, p, cover_size, cluster_size)
+    return partial(procedure_cover, cover, k), len(cover)
+
+
+def max_cover_benchmark(n, p, cover_size, cluster_size, k, backend='frozenset'):
+    _, cover = benchmark_cover(n, p, cover_size, cluster_size)
+    return partial(max_cover, cover, k, backend), len(cover)
+
+
+# benchmark name -> (its parameters, function of the parameters that returns the timed function and its units)
+BENCHMARKS = OrderedDict([
+    ('generate_connected_graph', (('n', 'p'), generate_connected_graph_benchmark)),
+    ('generate_cover', (('n', 'p', 'cover_size', 'cluster_size'), generate_cover_benchmark)),
+    ('calculate_collection_radius', (('n', 'p', 'cover_size', 'cluster_size'), collection_radius_benchmark)),
+    ('calculate_collection_degree', (('n', 'p', 'cover_size', 'cluster_size'), collection_degree_benchmark)),
+    ('procedure_cover', (('n', 'p', 'cover_size', 'cluster_size', 'k'), procedure_cover_benchmark)),
+    ('max_cover', (('n', 'p', 'cover_size', 'cluster_size', 'k'), max_cover_benchmark)),
+    ('max_cover_bitset', (('n', 'p', 'cover_size', 'cluster_size', 'k'),
+                          partial(max_cover_benchmark, backend='bitset'))),
+    ('max_cover_mask', (('n', 'p', 'cover_size', 'cluster_size', 'k'),
+                        partial(max_cover_benchmark, backend='mask'))),
+])
+
+
+def measure(function, repeats=REPEATS):
+    """
+    :param function: function without arguments
+    :param repeats: number of timed runs
+    :return: the best wall time of the runs in seconds, and the peak memory allocated by a run in bytes
+    """
+    times = []
+    for _ in range(repeats):
+        np.random.seed(BENCHMARK_SEED)
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    np.random.seed(BENCHMARK_SEED)
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak_memory
+
+
+def grid_points(params_names, grid, base_params=BASE_PARAMS):
+    """
+    :param params_names: the parameters of a benchmark
+    :param grid: dictionary of parameter -> values
+    :param base_params: dictionary of parameter -> base value
+    :return: list of the grid points, each a dictionary of parameter -> value,
+             the base point and then every parameter swept over its values, with the rest at their base values
+    """
+    base_point = OrderedDict((name, base_params[name]) for name in params_names)
+    points = [base_point]
+    for name in params_names:
+        for value in grid[name]:
+            point = OrderedDict(base_point)
+            point[name] = value
+            if point not in points:
+                points.append(point)
+    return points
+
+
+def run_benchmarks(names=None, grid=None, base_params=BASE_PARAMS, repeats=REPEATS, verbose=False):
+    """
+    :param names: names of benchmarks to run, all of BENCHMARKS by default
+    :param grid: dictionary of parameter -> values, PARAMS_GRIDS['normal'] by default
+    :param base_params: dictionary of parameter -> base value
+    :param repeats: number of timed runs of every grid point
+    :param verbose: print every result as soon as it is measured
+    :return: list of results, dictionaries of the benchmark name, its params,
+             time in seconds, peak_memory in bytes and throughput in units per second
+    """
+    grid = PARAMS_GRIDS['normal'] if grid is None else grid
+    results = []
+    for name in names or BENCHMARKS:
+        params_names, benchmark = BENCHMARKS[name]
+        for params in grid_points(params_names, grid, base_params):
+            function, units = benchmark(**params)
+            run_time, peak_memory = measure(function, repeats)
+            result = OrderedDict([('benchmark', name),
+                                  ('params', params),
+                                  ('time', run_time),
+                                  ('peak_memory', peak_memory),
+                                  ('throughput', units / run_time if run_time else float('inf'))])
+            results.append(result)
+            if verbose:
+                print(format_result(result))
+    return results
+
+
+def scaling_exponents(results, base_params=BASE_PARAMS):
+    """
+    fits time ~ param^exponent, for every parameter of every benchmark,
+    by least squares over log(time) and log(param) of the points where the rest of the parameters are at their base
+    :param results: results of run_benchmarks
+    :param base_params: dictionary of parameter -> base value
+    :return: dictionary of benchmark name -> dictionary of parameter -> exponent,
+             for parameters with at least two different values
+    """
+    exponents = OrderedDict()
+    for name in OrderedDict.fromkeys(result['benchmark'] for result in results):
+        benchmark_results = [result for result in results if result['benchmark'] == name]
+        exponents[name] = OrderedDict()
+        for param in benchmark_results[0]['params']:
+            sweep = [(result['params'][param], result['time']) for result in benchmark_results
+                     if all(value == base_params[other] for other, value in result['params'].items() if other != param)]
+            values, times = np.array(sweep, dtype=float).T
+            if len(np.unique(values)) > 1 and times.all():
+                exponents[name][param] = float(np.polyfit(np.log(values), np.log(times), 1)[0])
+    return exponents
+
+
+def result_key(result):
+    return result['benchmark'], tuple(sorted(result['params'].items()))
+
+
+def compare_results(results, baseline, tolerance=TOLERANCE):
+    """
+    :param results: results of run_benchmarks
+    :param baseline: results of a previous run_benchmarks, e.g. loaded from a saved report
+    :param tolerance: allowed relative increase over the baseline
+    :return: list of regressions, dictionaries of the benchmark name, its params, the metric ('time' or 'peak_memory'),
+             its value and baseline value, and their ratio.
+             grid points that are not in baseline, and times below MIN_COMPARED_TIME, are not compared
+    """
+    baseline_results = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        baseline_result = baseline_results.get(result_key(result))
+        if baseline_result is None:
+            continue
+        for metric in ('time', 'peak_memory'):
+            value, baseline_value = result[metric], baseline_result[metric]
+            if metric == 'time' and max(value, baseline_value) < MIN_COMPARED_TIME:
+                continue
+            if value > baseline_value * (1 + tolerance):
+                regressions.append(OrderedDict([('benchmark', result['benchmark']),
+                                                ('params', result['params']),
+                                                ('metric', metric),
+                                                ('value', value),
+                                                ('baseline', baseline_value),
+                                                ('ratio', value / baseline_value if baseline_value else float('inf'))]))
+    return regressions
+
+
+def benchmarks_report(results, base_params=BASE_PARAMS, repeats=REPEATS):
+    """
+    :param results: results of run_benchmarks
+    :param base_params: the base params they were run with
+    :param repeats: the number of runs they were timed with
+    :return: JSON serializable report of the results, their scaling exponents and the environment they were measured in
+    """
+    return OrderedDict([('environment', OrderedDict([('python', platform.python_version()),
+                                                     ('numpy', np.__version__),
+                                                     ('platform', platform.platform()),
+                                                     ('processor', platform.processor())])),
+                        ('seed', BENCHMARK_SEED),
+                        ('repeats', repeats),
+                        ('base_params', base_params),
+                        ('results', results),
+                        ('exponents', scaling_exponents(results, base_params))])
+
+
+def format_result(result):
+    params = ', '.join('{}={}'.format(name, value) for name, value in result['params'].items())
+    return '{:<28} {:<55} {:>10.4f}s {:>10.1f}KB {:>12.1f}/s'.format(
+        result['benchmark'], params, result['time'], result['peak_memory'] / 1024, result['throughput'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sparse Partitions performance benchmarks')
+    parser.add_argument('--type', choices=sorted(PARAMS_GRIDS), default='normal', help='parameters grid')
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), help='benchmarks to run, all by default')
+    parser.add_argument('--repeats', type=int, default=REPEATS, help='timed runs of every grid point')
+    parser.add_argument('--output', help='path of the JSON report')
+    parser.add_argument('--compare', help='path of a baseline JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='allowed relative increase over the baseline')
+    args = parser.parse_args(argv)
+
+    base_params = GRIDS_BASE_PARAMS.get(args.type, BASE_PARAMS)
+    results = run_benchmarks(args.benchmarks, PARAMS_GRIDS[args.type], base_params, args.repeats, verbose=True)
+    report = benchmarks_report(results, base_params, args.repeats)
+    print('\nScaling exponents:')
+    for name, exponents in report['exponents'].items():
+        print('{:<28} {}'.format(name, ', '.join('{}: {:.2f}'.format(param, exponent)
+                                                 for param, exponent in exponents.items())))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline['results'], args.tolerance)
+        print('\n{} regressions against {}'.format(len(regressions), args.compare))
+        for regression in regressions:
+            print('{:<28} {} {}: {:.4g} -> {:.4g} (x{:.2f})'.format(
+                regression['benchmark'], dict(regression['params']), regression['metric'],
+                regression['baseline'], regression['value'], regression['ratio']))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
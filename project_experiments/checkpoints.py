@@ -0,0 +1,98 @@
+"""
+On-disk checkpoints of experiment tasks, so an interrupted experiment resumes from the tasks it has not completed yet.
+
+The checkpoints are kept in a sqlite database, with a row for the output of every completed task,
+keyed by the experiment name, its seed and the task.
+The seed of every experiment is kept as well, so an experiment run again without a seed
+resumes the run of the seed it was last run with, instead of starting over with a new random seed.
+"""
+
+import pickle
+import sqlite3
+import numpy as np
+
+SCHEMA = ('CREATE TABLE IF NOT EXISTS seeds (experiment TEXT PRIMARY KEY, seed TEXT NOT NULL)',
+          'CREATE TABLE IF NOT EXISTS tasks (experiment TEXT NOT NULL, seed TEXT NOT NULL, task TEXT NOT NULL, '
+          'output BLOB NOT NULL, PRIMARY KEY (experiment, seed, task))')
+
+
+class CheckpointStore:
+    """
+    A sqlite database of the completed experiments tasks.
+    Every task output is committed as soon as it is saved, so it survives the process being killed.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: path of the database file, created if it does not exist
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def experiment(self, name, seed=None):
+        """
+        :param name: name of the experiment, including every parameter its tasks outputs depend on
+        :param seed: the experiment seed, or None to resume the seed it was last run with,
+                     or a new random seed if it was never run
+        :return: ExperimentCheckpoints of the experiment with the seed
+        """
+        if seed is None:
+            row = self.connection.execute('SELECT seed FROM seeds WHERE experiment = ?', (name,)).fetchone()
+            seed = int(row[0]) if row is not None else None
+        seed = np.random.SeedSequence(seed).entropy
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO seeds VALUES (?, ?)', (name, str(seed)))
+        return ExperimentCheckpoints(self, name, seed)
+
+    def load(self, name, seed, task):
+        row = self.connection.execute('SELECT output FROM tasks WHERE experiment = ? AND seed = ? AND task = ?',
+                                      (name, str(seed), repr(task))).fetchone()
+        return pickle.loads(row[0]) if row is not None else None
+
+    def save(self, name, seed, task, output):
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?)',
+                                    (name, str(seed), repr(task), pickle.dumps(output)))
+
+
+class ExperimentCheckpoints:
+    """
+    The checkpoints of a single experiment run, see run_experiment_tasks.
+    """
+
+    def __init__(self, store, name, seed):
+        """
+        :param store: CheckpointStore
+        :param name: name of the experiment
+        :param seed: the experiment seed entropy
+        """
+        self.store = store
+        self.name = name
+        self.seed = seed
+
+    def load(self, task):
+        """
+        :param task: a task of the experiment, tuple of numbers
+        :return: the saved output of the task, or None if it was not completed
+        """
+        return self.store.load(self.name, self.seed, task)
+
+    def save(self, task, output):
+        """
+        :param task: a task of the experiment
+        :param output: its output
+        :return: None
+        """
+        self.store.save(self.name, self.seed, task, output)
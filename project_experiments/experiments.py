@@ -1,10 +1,27 @@
 from utilities.util import (generate_weighted_connected_graph,
                             generate_cover,
-                            get_collection_data)
-from algorithm.max_cover import max_cover
+                            get_collection_data,
+                            get_collections_data,
+                            networkx_graph)
+from utilities.covers import generate_large_cover
+from utilities.storage import stored_graph, stored_cover
+from utilities.graph_arrays import graph_arrays
+from algorithm.max_cover import max_cover, max_cover_sweep
+from algorithm.cover_stats import MaxCoverStats
+from algorithm.cover_radii import ClusterRadii
+from algorithm.cover_cache import (CoverCache,
+                                   cached_max_cover_data,
+                                   cached_max_cover_sweep_data,
+                                   cover_digest,
+                                   graph_digest)
 from matplotlib import pyplot as plt
 import numpy as np
-from collections import OrderedDict
+import os
+from collections import OrderedDict, Counter
+from contextlib import contextmanager
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 RESULTS_PARAMS = OrderedDict([('Rad(S)', 0),
                               ('Rad(T)', 1),
@@ -20,112 +37,471 @@ EXPERIMENTS_PARAMS = {'sampled graphs': {'normal': 5, 'small': 2},
                       'probability step': {'normal': 0.05, 'small': 0.2},
                       'k limit': {'normal': 40, 'small': 15}}
 
-DEBUG = False
+COVER_TYPES = [(5, 30, 0),
+               (10, 20, 0),
+               (20, 10, 30),
+               (30, 5, 20),
+               (40, 5, 15),
+               (50, 0, 10)]
 
+# directory of the max_cover results cache in the experiments data directory, see algorithm.cover_cache
+MAX_COVER_CACHE_DIR = 'max_cover_cache'
 
-def plot_experiment_results(results, x_axis, x_label, title=''):
+DEBUG = False
+# print where the time of every experiment went, see report_stats
+REPORT_STATS = True
+
+
+def plot_experiment_results(results, x_axis, x_label, title='', output_dir=None):
+    """
+    plots every PLOT_GRAPH_INDEX results params together
+    :param results: results array
+    :param x_axis: the x value of every row of results
+    :param x_label: x axis label
+    :param title: plots title
+    :param output_dir: directory the plots are saved to, as <title>_<params>.png, instead of being shown
+    :return: None
+    """
+    fields = []
     for field, index in RESULTS_PARAMS.items():
         plt.plot(x_axis, results[:, index], label=field)
+        fields.append(field)
 
         if (index + 1) % PLOT_GRAPH_INDEX == 0:
             plt.xlabel(x_label)
             plt.legend()
             plt.title(title)
-            plt.show()
+            if output_dir is None:
+                plt.show()
+            else:
+                name = '_'.join([title] + fields).replace(' ', '_').replace('(', '').replace(')', '')
+                plt.savefig(os.path.join(output_dir, name + '.png'))
+                plt.close()
+            fields = []
+
+
+def save_experiment_results(results, x_axis, title, output_dir=None):
+    """
+    saves the results of an experiment as <title>.npz, with the arrays results, x_axis and params (the results columns)
+    :param results: results array
+    :param x_axis: the x value of every row of results
+    :param title: experiment title
+    :param output_dir: directory the results are saved to, nothing is saved if it is None
+    :return: None
+    """
+    if output_dir is not None:
+        np.savez(os.path.join(output_dir, title.replace(' ', '_') + '.npz'),
+                 results=results, x_axis=np.asarray(x_axis), params=np.array(list(RESULTS_PARAMS)))
+
+
+def experiment_checkpoints(checkpoints, name, seed, data_dir=None):
+    """
+    :param checkpoints: CheckpointStore of the experiments tasks (see project_experiments.checkpoints), or None
+    :param name: name of the experiment, including every parameter its tasks outputs depend on
+    :param seed: the experiment seed, or None
+    :param data_dir: directory of the experiments inputs, or None.
+                     the inputs are stored by the seed entropy (see data_path), so without checkpoints,
+                     a seed is required for a run to find the inputs stored by a previous run
+    :return: the experiment seed entropy, and its ExperimentCheckpoints, or None if checkpoints is None.
+             with checkpoints, a None seed resumes the seed the experiment was last run with
+    """
+    if checkpoints is None:
+        if seed is None and data_dir is not None:
+            raise ValueError('a seed is required to store the experiment inputs in {} without checkpoints'
+                             .format(data_dir))
+        return np.random.SeedSequence(seed).entropy, None
+    experiment = checkpoints.experiment(name, seed)
+    return experiment.seed, experiment
+
+
+def seed_random_state(seed, *indices):
+    """
+    seeds numpy's random state for a single experiment task,
+    so every task draws the same graphs and covers regardless of the process that runs it.
+    :param seed: experiment seed
+    :param indices: the task indices, e.g. graph index and cover index
+    :return: None
+    """
+    np.random.seed(np.random.SeedSequence([seed, *indices]).generate_state(1)[0])
+
+
+def data_path(data_dir, *names):
+    """
+    :param data_dir: directory of the experiments inputs, or None
+    :param names: the parameters the input is generated by, including the experiment seed entropy,
+                  which is stable for a given seed or checkpoints store (see experiment_checkpoints)
+    :return: path of the input in data_dir (see utilities.storage), or None if data_dir is None
+    """
+    if data_dir is None:
+        return None
+    return os.path.join(data_dir, '_'.join(str(name) for name in names))
+
+
+@contextmanager
+def timed(stats, stage):
+    """
+    adds the seconds spent in the context to stats['<stage> time']
+    :param stats: Counter of the task stats
+    :param stage: name of the stage
+    """
+    start = perf_counter()
+    yield
+    stats['{} time'.format(stage)] += perf_counter() - start
+
+
+def add_max_cover_stats(stats, cover_stats):
+    """
+    :param stats: Counter of the task stats
+    :param cover_stats: MaxCoverStats of a max_cover run
+    :return: None
+    """
+    stats['max_cover phases'] += len(cover_stats.phases)
+    stats['max_cover kernels'] += len(cover_stats.kernels)
+    for stage, seconds in cover_stats.times.items():
+        stats['max_cover {} time'.format(stage)] += seconds
+
+
+def report_stats(title, stats):
+    """
+    prints the stats of an experiment, the times first, from the longest
+    :param title: the experiment title
+    :param stats: Counter of the stats of all its tasks
+    :return: None
+    """
+    if not REPORT_STATS:
+        return
+    print('{} stats:'.format(title))
+    times = sorted((name for name in stats if name.endswith('time')), key=stats.get, reverse=True)
+    for name in times + sorted(name for name in stats if not name.endswith('time')):
+        print('    {}: {:.3f}'.format(name, stats[name]) if name in times else '    {}: {}'.format(name, stats[name]))
+
+
+def max_cover_cache(data_dir):
+    """
+    :param data_dir: directory of the experiments inputs, or None
+    :return: CoverCache of the max_cover results of the inputs in data_dir, or None if data_dir is None
+    """
+    if data_dir is None:
+        return None
+    return CoverCache(os.path.join(data_dir, MAX_COVER_CACHE_DIR))
+
+
+def collection_data(g, collection, stats, approx=None, intervals=None, bounds=None):
+    """
+    :param g: graph, or its GraphArrays
+    :param collection: a collection of clusters in g
+    :param stats: Counter of the task stats
+    :param approx: optional number of Dijkstra runs to bound the clusters radii with, see get_collection_data
+    :param intervals: optional dictionary, the bounds of every cluster's radius are stored in it
+    :param bounds: optional known bounds of the clusters radii, see get_collection_data
+    :return: Rad and Deg of collection, with approx Rad is its upper bound,
+             which is the radius of collection with a (possibly less central) node of every cluster as its center
+    """
+    collection_radius, collection_degree = get_collection_data(g, collection, cache=True, stats=stats, approx=approx,
+                                                               intervals=intervals, bounds=bounds)
+    if approx:
+        collection_radius = collection_radius[1]
+    return collection_radius, collection_degree
+
+
+def collections_data(g, collections, stats, approx=None, bounds=None):
+    """
+    :param g: graph, or its GraphArrays
+    :param collections: list of collections of clusters in g
+    :param stats: Counter of the task stats
+    :param approx: optional number of Dijkstra runs to bound the clusters radii with, see collection_data
+    :param bounds: optional known bounds of the clusters radii, see get_collection_data
+    :return: list of Rad and Deg of every collection, see collection_data
+    """
+    data = get_collections_data(g, collections, cache=True, stats=stats, approx=approx, bounds=bounds)
+    return [(collection_radius[1] if approx else collection_radius, collection_degree)
+            for collection_radius, collection_degree in data]
+
+
+def coarsenings_data(g, cover, ks, cache, stats, approx=None, intervals=None):
+    """
+    runs max_cover(cover, k) for every k in ks, drawing their seeds from numpy's global random state,
+    and evaluates all of their coarsening covers at once (see get_collections_data)
+    :param g: graph, or its GraphArrays
+    :param cover: a cover of g
+    :param ks: integer constants
+    :param cache: None, or (CoverCache, digests of cover and g) to look the results up in, see cached_max_cover_data.
+                  the cached Rad is bounded with approx as well, but without the bounds of intervals
+    :param stats: Counter of the task stats
+    :param approx: optional number of Dijkstra runs to bound Rad with, see collection_data
+    :param intervals: optional bounds of the radii of the clusters of cover, stored by collection_data.
+                      max_cover then bounds the radii of the clusters it constructs (see algorithm.cover_radii),
+                      and only the clusters whose bounds compete for Rad are calculated
+    :return: list of Rad and Deg of the coarsening cover of every k
+    """
+    if cache is not None:
+        cover_cache, digests = cache
+        return [cached_max_cover_data(cover_cache, g, cover, k, digests=digests, stats=stats, approx=approx)[1:]
+                for k in ks]
+    # the bounds of a cluster hold whichever run constructed it, so all runs share them
+    cover_radii = ClusterRadii(intervals) if intervals is not None else None
+    coarsening_covers = []
+    for k in ks:
+        cover_stats = MaxCoverStats()
+        coarsening_covers.append(max_cover(cover, k, stats=cover_stats, radii=cover_radii))
+        add_max_cover_stats(stats, cover_stats)
+    return collections_data(g, coarsening_covers, stats, approx,
+                            bounds=cover_radii.bounds if cover_radii is not None else None)
+
+
+def run_experiment_tasks(task_function, tasks, results, workers=1, stats=None, checkpoints=None):
+    """
+    runs task_function on every task, and adds each of its outputs (rows, values, task_stats) to results[rows].
+    with more than one worker, the tasks are spread across a pool of processes.
+    the outputs are added in the order of tasks, as soon as they are ready,
+    so the results are the same for any number of workers.
+    :param task_function: function of a single task, returns (rows, values, task_stats)
+    :param tasks: list of tasks
+    :param results: results array
+    :param workers: number of worker processes
+    :param stats: optional Counter, the stats of every task (e.g. the seconds spent in each of its stages)
+                  are added to it
+    :param checkpoints: optional ExperimentCheckpoints, the output of every task is saved in it as soon as it is added,
+                        and tasks whose output was already saved are not run again.
+                        the saved outputs are added in the order of tasks as well, so resuming gives the same results
+    :return: None
+    """
+    saved = [checkpoints.load(task) if checkpoints is not None else None for task in tasks]
+    pending = [task for task, output in zip(tasks, saved) if output is None]
+
+    def add_outputs(outputs):
+        for task, output in zip(tasks, saved):
+            if output is None:
+                output = next(outputs)
+                if checkpoints is not None:
+                    checkpoints.save(task, output)
+            rows, values, task_stats = output
+            results[rows] += values
+            if stats is not None:
+                stats.update(task_stats)
+
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            add_outputs(executor.map(task_function, pending))
+    else:
+        add_outputs(map(task_function, pending))
+
+
+def k_integer_task(experiment_type, seed, data_dir, task):
+    graph_index, cover_index = task
+    k_limit = EXPERIMENTS_PARAMS['k limit'][experiment_type]
 
+    cover_size = 20
+    max_cluster_size = 15
 
-def k_integer_experiment(experiment_type='normal'):
+    values = np.zeros((k_limit, NUM_OF_RESULTS_PARAMS))
+    stats = Counter()
+
+    seed_random_state(seed, graph_index)
+    with timed(stats, 'graph'):
+        # g is converted to its CSR arrays right away, exactly like a stored graph is loaded, so its cover is
+        # generated over the same adjacency order (see utilities.util.networkx_graph) with and without data_dir.
+        # g is also measured many times, so it is converted once, which also keeps its radius cache
+        g = graph_arrays(stored_graph(data_path(data_dir, 'graph', NUM_OF_NODES, 0.5, seed, graph_index),
+                                      lambda: generate_weighted_connected_graph(NUM_OF_NODES)))
+
+    seed_random_state(seed, graph_index, cover_index)
+    with timed(stats, 'cover'):
+        # likewise, the cover is kept as the list of its clusters, in the order a stored cover is loaded in,
+        # since max_cover reads them into a set, whose order would otherwise depend on the history of the cover's set
+        cover = stored_cover(data_path(data_dir, 'cover', NUM_OF_NODES, 0.5, seed, graph_index, cover_index,
+                                       cover_size, 0, max_cluster_size),
+                             lambda: list(generate_cover(networkx_graph(g), cover_size,
+                                                         max_cluster_size=max_cluster_size)))
+
+    # max cover draws from its own random state, so it is the same whether g and cover were generated or loaded
+    seed_random_state(seed, graph_index, cover_index, 0)
+    cache = max_cover_cache(data_dir)
+    if cache is not None:
+        cover_radius, cover_degree = get_collection_data(g, cover, cache=True, stats=stats)
+        coarsenings = cached_max_cover_sweep_data(cache, g, cover, range(1, k_limit + 1), stats=stats)
+    else:
+        with timed(stats, 'max_cover'):
+            coarsening_covers = max_cover_sweep(cover, range(1, k_limit + 1))
+        # the cover and all of its coarsening covers are evaluated at once
+        ks = sorted(coarsening_covers)
+        (cover_radius, cover_degree), *data = get_collections_data(
+            g, [cover] + [coarsening_covers[k] for k in ks], cache=True, stats=stats)
+        coarsenings = {k: (coarsening_covers[k],) + k_data for k, k_data in zip(ks, data)}
+    for k, (_, coarsening_radius, coarsening_degree) in coarsenings.items():
+        values[k - 1] = cover_radius, coarsening_radius, cover_degree, coarsening_degree
+
+    return slice(None), values, stats
+
+
+def k_integer_experiment(experiment_type='normal', workers=1, seed=None, data_dir=None, output_dir=None,
+                         checkpoints=None):
     sampled_graphs = EXPERIMENTS_PARAMS['sampled graphs'][experiment_type]
     sampled_covers = EXPERIMENTS_PARAMS['sampled covers'][experiment_type]
     k_limit = EXPERIMENTS_PARAMS['k limit'][experiment_type]
-
-    cover_size = 20
-    max_cluster_size = 15
+    seed, checkpoints = experiment_checkpoints(checkpoints, 'k_integer_' + experiment_type, seed, data_dir)
 
     results = np.zeros((k_limit, NUM_OF_RESULTS_PARAMS))
+    stats = Counter()
 
-    for _ in range(sampled_graphs):
-        g = generate_weighted_connected_graph(NUM_OF_NODES)
+    tasks = [(graph_index, cover_index) for graph_index in range(sampled_graphs)
+             for cover_index in range(sampled_covers)]
+    run_experiment_tasks(partial(k_integer_task, experiment_type, seed, data_dir), tasks, results, workers, stats,
+                         checkpoints)
+    report_stats('K Integer Experiment', stats)
 
-        for _ in range(sampled_covers):
+    results /= (sampled_graphs * sampled_covers)
 
-            cover = generate_cover(g, cover_size, max_cluster_size=max_cluster_size)
-            cover_radius, cover_degree = get_collection_data(g, cover)
+    x_axis = [k for k in range(1, k_limit + 1)]
+    save_experiment_results(results, x_axis, 'K Integer Experiment', output_dir)
+    plot_experiment_results(results, x_axis, 'k', title='K Integer Experiment', output_dir=output_dir)
+    return results
 
-            for k in range(1, k_limit + 1):
-                coarsening_cover = max_cover(cover, k)
-                coarsening_radius, coarsening_degree = get_collection_data(g, coarsening_cover)
 
-                results[k - 1] += cover_radius, coarsening_radius, cover_degree, coarsening_degree
+def cover_size_task(experiment_type, seed, data_dir, task):
+    graph_index, i = task
+    k_integers = EXPERIMENTS_PARAMS['k integers'][experiment_type]
+    cover_size, min_cluster_size, max_cluster_size = COVER_TYPES[i]
 
-    results /= (sampled_graphs * sampled_covers)
+    values = np.zeros(NUM_OF_RESULTS_PARAMS)
+    stats = Counter()
 
-    x_axis = [k for k in range(1, k_limit + 1)]
-    plot_experiment_results(results, x_axis, 'k', title='K Integer Experiment')
+    seed_random_state(seed, graph_index)
+    with timed(stats, 'graph'):
+        # see k_integer_task
+        g = graph_arrays(stored_graph(data_path(data_dir, 'graph', NUM_OF_NODES, 0.5, seed, graph_index),
+                                      lambda: generate_weighted_connected_graph(NUM_OF_NODES, p=0.5)))
 
+    seed_random_state(seed, graph_index, i)
+    with timed(stats, 'cover'):
+        # see k_integer_task
+        cover = stored_cover(data_path(data_dir, 'cover', NUM_OF_NODES, 0.5, seed, graph_index, i,
+                                       cover_size, min_cluster_size, max_cluster_size),
+                             lambda: list(generate_cover(networkx_graph(g), cover_size,
+                                                         min_cluster_size=min_cluster_size,
+                                                         max_cluster_size=max_cluster_size)))
 
-def cover_size_experiment(experiment_type='normal'):
-    sampled_graphs = EXPERIMENTS_PARAMS['sampled graphs'][experiment_type]
-    k_integers = EXPERIMENTS_PARAMS['k integers'][experiment_type]
+    intervals = {}
+    cover_radius, cover_degree = collection_data(g, cover, stats, intervals=intervals)
 
-    cover_types = [(5, 30, 0),
-                   (10, 20, 0),
-                   (20, 10, 30),
-                   (30, 5, 20),
-                   (40, 5, 15),
-                   (50, 0, 10)]
+    seed_random_state(seed, graph_index, i, 0)
 
-    results = np.zeros((len(cover_types), NUM_OF_RESULTS_PARAMS))
+    cache = max_cover_cache(data_dir)
+    if cache is not None:
+        cache = cache, (cover_digest(cover), graph_digest(g))
+    for coarsening_radius, coarsening_degree in coarsenings_data(g, cover, k_integers, cache, stats,
+                                                                 intervals=intervals):
+        values += cover_radius, coarsening_radius, cover_degree, coarsening_degree
 
-    for _ in range(sampled_graphs):
-        g = generate_weighted_connected_graph(NUM_OF_NODES, p=0.5)
-        for i, (cover_size, min_cluster_size, max_cluster_size) in enumerate(cover_types):
-            cover = generate_cover(g, cover_size, min_cluster_size=min_cluster_size, max_cluster_size=max_cluster_size)
+    return i, values, stats
 
-            cover_radius, cover_degree = get_collection_data(g, cover)
 
-            for k in k_integers:
-                coarsening_cover = max_cover(cover, k)
-                coarsening_radius, coarsening_degree = get_collection_data(g, coarsening_cover)
+def cover_size_experiment(experiment_type='normal', workers=1, seed=None, data_dir=None, output_dir=None,
+                          checkpoints=None):
+    sampled_graphs = EXPERIMENTS_PARAMS['sampled graphs'][experiment_type]
+    k_integers = EXPERIMENTS_PARAMS['k integers'][experiment_type]
+    seed, checkpoints = experiment_checkpoints(checkpoints, 'cover_size_' + experiment_type, seed, data_dir)
 
-                results[i] += cover_radius, coarsening_radius, cover_degree, coarsening_degree
+    results = np.zeros((len(COVER_TYPES), NUM_OF_RESULTS_PARAMS))
+    stats = Counter()
+
+    tasks = [(graph_index, i) for graph_index in range(sampled_graphs) for i in range(len(COVER_TYPES))]
+    run_experiment_tasks(partial(cover_size_task, experiment_type, seed, data_dir), tasks, results, workers, stats,
+                         checkpoints)
+    report_stats('Cover Size Experiment', stats)
 
     results /= (sampled_graphs * len(k_integers))
 
-    x_axis = [cover_type[0] for cover_type in cover_types]
-    plot_experiment_results(results, x_axis, 'cover size', title='Cover Size Experiment')
+    x_axis = [cover_type[0] for cover_type in COVER_TYPES]
+    save_experiment_results(results, x_axis, 'Cover Size Experiment', output_dir)
+    plot_experiment_results(results, x_axis, 'cover size', title='Cover Size Experiment', output_dir=output_dir)
+    return results
 
 
-def graph_density_experiment(experiment_type='normal'):
-    sampled_graphs = EXPERIMENTS_PARAMS['sampled graphs'][experiment_type]
-    sampled_covers = EXPERIMENTS_PARAMS['sampled covers'][experiment_type]
+def graph_density_task(experiment_type, seed, num_of_nodes, data_dir, task, approx=None, large=False):
+    i, p, graph_index, cover_index = task
     k_integers = EXPERIMENTS_PARAMS['k integers'][experiment_type]
-    probability_step = EXPERIMENTS_PARAMS['probability step'][experiment_type]
 
     cover_size = 20
     max_cluster_size = 15
 
+    values = np.zeros(NUM_OF_RESULTS_PARAMS)
+    stats = Counter()
+
+    # large graphs are generated directly as CSR arrays, with the requested p, so they scale to millions of nodes
+    prefix = 'large_' if large else ''
+    seed_random_state(seed, i, graph_index)
+    with timed(stats, 'graph'):
+        # see k_integer_task
+        g = graph_arrays(stored_graph(data_path(data_dir, prefix + 'graph', num_of_nodes, p, seed, i, graph_index),
+                                      lambda: generate_weighted_connected_graph(num_of_nodes, p=p, as_arrays=large)))
+
+    with timed(stats, 'cover'):
+        path = data_path(data_dir, prefix + 'cover', num_of_nodes, p, seed, i, graph_index, cover_index,
+                         cover_size, 0, max_cluster_size)
+        if large:
+            cover_seed = np.random.SeedSequence([seed, i, graph_index, cover_index])
+            cover = stored_cover(path, lambda: generate_large_cover(g, cover_size, max_cluster_size=max_cluster_size,
+                                                                    seed=cover_seed))
+        else:
+            seed_random_state(seed, i, graph_index, cover_index)
+            # see k_integer_task
+            cover = stored_cover(path, lambda: list(generate_cover(networkx_graph(g), cover_size,
+                                                                   max_cluster_size=max_cluster_size)))
+    intervals = {}
+    cover_radius, cover_degree = collection_data(g, cover, stats, approx, intervals)
+
+    seed_random_state(seed, i, graph_index, cover_index, 0)
+
+    cache = max_cover_cache(data_dir)
+    if cache is not None:
+        cache = cache, (cover_digest(cover), graph_digest(g))
+    for coarsening_radius, coarsening_degree in coarsenings_data(g, cover, k_integers, cache, stats, approx,
+                                                                 intervals):
+        values += cover_radius, coarsening_radius, cover_degree, coarsening_degree
+
+    return i, values, stats
+
+
+def graph_density_experiment(experiment_type='normal', workers=1, seed=None, num_of_nodes=NUM_OF_NODES,
+                             data_dir=None, output_dir=None, checkpoints=None, approx=None, large=False):
+    """
+    :param approx: optional number of Dijkstra runs to bound the clusters radii with, instead of calculating them
+                   exactly, which dominates the experiment on large graphs. the upper bounds are plotted,
+                   see collection_data
+    :param large: generate the graphs as CSR arrays, and their covers with generate_large_cover
+                  (see utilities.covers), so the experiment scales to a large num_of_nodes.
+                  generate_large_cover draws other covers than generate_cover, which the rest of the experiments use,
+                  e.g. with fewer and less overlapping clusters, so its results are not comparable to theirs
+    """
+    sampled_graphs = EXPERIMENTS_PARAMS['sampled graphs'][experiment_type]
+    sampled_covers = EXPERIMENTS_PARAMS['sampled covers'][experiment_type]
+    k_integers = EXPERIMENTS_PARAMS['k integers'][experiment_type]
+    probability_step = EXPERIMENTS_PARAMS['probability step'][experiment_type]
+    name = 'graph_density_{}_{}'.format(experiment_type, num_of_nodes)
+    if approx:
+        name += '_approx_{}'.format(approx)
+    if large:
+        name += '_large'
+    seed, checkpoints = experiment_checkpoints(checkpoints, name, seed, data_dir)
+
     probabilities = [0.01 + probability_step * i for i in range(int(1 / probability_step))]
     if DEBUG:
         print(probabilities)
 
     results = np.zeros((len(probabilities), NUM_OF_RESULTS_PARAMS))
+    stats = Counter()
 
-    for i, p in enumerate(probabilities):
-
-        for _ in range(sampled_graphs):
-            g = generate_weighted_connected_graph(NUM_OF_NODES, p=p)
-            for _ in range(sampled_covers):
-
-                cover = generate_cover(g, cover_size, max_cluster_size=max_cluster_size)
-                cover_radius, cover_degree = get_collection_data(g, cover)
-
-                for k in k_integers:
-                    coarsening_cover = max_cover(cover, k)
-                    coarsening_radius, coarsening_degree = get_collection_data(g, coarsening_cover)
-
-                    results[i] += cover_radius, coarsening_radius, cover_degree, coarsening_degree
+    tasks = [(i, p, graph_index, cover_index) for i, p in enumerate(probabilities)
+             for graph_index in range(sampled_graphs) for cover_index in range(sampled_covers)]
+    run_experiment_tasks(partial(graph_density_task, experiment_type, seed, num_of_nodes, data_dir, approx=approx,
+                                 large=large),
+                         tasks, results, workers, stats, checkpoints)
+    report_stats('Graph Density Experiment', stats)
 
-        results[i] /= (sampled_graphs * sampled_covers * len(k_integers))
+    results /= (sampled_graphs * sampled_covers * len(k_integers))
 
-    plot_experiment_results(results, probabilities, 'edge probability', title='Graph Density Experiment')
+    save_experiment_results(results, probabilities, 'Graph Density Experiment', output_dir)
+    plot_experiment_results(results, probabilities, 'edge probability', title='Graph Density Experiment',
+                            output_dir=output_dir)
+    return results
@@ -1,22 +1,47 @@
+import argparse
+import os
+import sys
+from matplotlib import pyplot as plt
 from project_experiments.experiments import (graph_density_experiment,
                                              cover_size_experiment,
-                                             k_integer_experiment)
+                                             k_integer_experiment,
+                                             NUM_OF_NODES)
+from project_experiments.checkpoints import CheckpointStore
 
 EXPERIMENTS_TYPES = {'1': 'normal', '2': 'small'}
 
+EXPERIMENTS = {'graph_density': ('Graph Density Experiment', graph_density_experiment),
+               'cover_size': ('Cover Size Experiment', cover_size_experiment),
+               'k_integer': ('K Integer Experiment', k_integer_experiment)}
 
-def run_experiments(experiments_type):
-    print('Running Graph Density Experiment...')
-    graph_density_experiment(experiments_type)
-    print('Finished!\n')
+# name of the checkpoints database in the output directory, see project_experiments.checkpoints
+CHECKPOINTS_FILE = 'checkpoints.sqlite'
 
-    print('Running Cover Size Experiment...')
-    cover_size_experiment(experiments_type)
-    print('Finished!\n')
 
-    print('Running K Integer Experiment...')
-    k_integer_experiment(experiments_type)
-    print('Finished!\n')
+def run_experiments(experiments_type, workers=1, data_dir=None, output_dir=None, checkpoints=None, seed=None,
+                    experiments=tuple(EXPERIMENTS), num_of_nodes=NUM_OF_NODES, approx=None,
+                    large=False):
+    """
+    :param experiments_type: 'normal' or 'small'
+    :param workers: number of worker processes
+    :param data_dir: directory the experiments inputs are stored in, see project_experiments.experiments.data_path
+    :param output_dir: directory the plots and results are saved to, instead of showing the plots
+    :param checkpoints: optional CheckpointStore, the experiments resume from the tasks it saved
+    :param seed: the experiments seed, see project_experiments.experiments.experiment_checkpoints
+    :param experiments: names of the experiments to run, keys of EXPERIMENTS
+    :param num_of_nodes: number of nodes of the graph density experiment graphs
+    :param approx: number of Dijkstra runs to bound the graph density experiment radii with, or None for exact radii
+    :param large: generate the graph density experiment graphs and covers for a large num_of_nodes,
+                  see project_experiments.experiments.graph_density_experiment
+    :return: None
+    """
+    for name in experiments:
+        title, experiment = EXPERIMENTS[name]
+        kwargs = {'num_of_nodes': num_of_nodes, 'approx': approx, 'large': large} if name == 'graph_density' else {}
+        print('Running {}...'.format(title))
+        experiment(experiments_type, workers, seed=seed, data_dir=data_dir, output_dir=output_dir,
+                   checkpoints=checkpoints, **kwargs)
+        print('Finished!\n')
 
 
 def main():
@@ -28,12 +53,59 @@ def main():
                                '3 - Quit program\n']))
         if opt in EXPERIMENTS_TYPES:
             experiment_type = EXPERIMENTS_TYPES[opt]
-            run_experiments(experiment_type)
+            run_experiments(experiment_type, workers=os.cpu_count())
             break
 
         elif opt == '3':
             return
 
 
+def cli(argv=None):
+    """
+    runs the experiments without any interaction, e.g. on batch nodes.
+    the plots and results are saved to the output directory, and every completed task is checkpointed there,
+    so running the same command again after an interruption resumes the experiments where they stopped.
+    :param argv: command line arguments, sys.argv by default
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Sparse Partitions Mini-Project experiments')
+    parser.add_argument('--type', choices=sorted(set(EXPERIMENTS_TYPES.values())), default='normal',
+                        help='experiments scale')
+    parser.add_argument('--experiments', nargs='+', choices=list(EXPERIMENTS), default=list(EXPERIMENTS),
+                        help='experiments to run, all by default')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    parser.add_argument('--seed', type=int, help='experiments seed, by default the seed of the interrupted run, if any')
+    parser.add_argument('--num-of-nodes', type=int, default=NUM_OF_NODES,
+                        help='number of nodes of the graph density experiment graphs')
+    parser.add_argument('--approx', type=int, metavar='RUNS',
+                        help='bound the graph density experiment radii with RUNS Dijkstra runs per cluster, '
+                             'instead of calculating them exactly')
+    parser.add_argument('--large', action='store_true',
+                        help='generate the graph density experiment graphs as CSR arrays and their covers with '
+                             'generate_large_cover, which scales to millions of nodes but draws other covers')
+    parser.add_argument('--data-dir', help='directory to store the generated graphs and covers in, '
+                                           'requires --seed with --no-checkpoints')
+    parser.add_argument('--output-dir', default='experiments_output',
+                        help='directory of the plots, the results and the checkpoints')
+    parser.add_argument('--no-checkpoints', action='store_true', help='run every task, without checkpoints')
+    args = parser.parse_args(argv)
+
+    # plots are rendered to files only, so no display is needed
+    plt.switch_backend('Agg')
+    os.makedirs(args.output_dir, exist_ok=True)
+    checkpoints = None if args.no_checkpoints else CheckpointStore(os.path.join(args.output_dir, CHECKPOINTS_FILE))
+    try:
+        run_experiments(args.type, args.workers, data_dir=args.data_dir, output_dir=args.output_dir,
+                        checkpoints=checkpoints, seed=args.seed, experiments=args.experiments,
+                        num_of_nodes=args.num_of_nodes, approx=args.approx, large=args.large)
+    finally:
+        if checkpoints is not None:
+            checkpoints.close()
+
+
 if __name__ == '__main__':
-    main()
+    # the interactive menu is shown only when run from a terminal without arguments
+    if len(sys.argv) > 1 or not sys.stdin.isatty():
+        cli()
+    else:
+        main()
@@ -0,0 +1,81 @@
+from project_experiments.benchmarks import (run_benchmarks,
+                                            scaling_exponents,
+                                            compare_results,
+                                            benchmarks_report,
+                                            grid_points,
+                                            BENCHMARKS,
+                                            BASE_PARAMS)
+import json
+import numpy as np
+
+TINY_GRID = {'n': [50, 100], 'p': [0.1], 'cover_size': [10], 'cluster_size': [10], 'k': [2, 4]}
+TINY_BASE_PARAMS = {'n': 50, 'p': 0.1, 'cover_size': 10, 'cluster_size': 10, 'k': 2}
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert every result of a benchmark run is complete, and every grid point of every benchmark was run
+def check_benchmark_results(results, grid, base_params):
+    for name, (params_names, _) in BENCHMARKS.items():
+        benchmark_results = [result for result in results if result['benchmark'] == name]
+        assert [result['params'] for result in benchmark_results] == grid_points(params_names, grid, base_params)
+        for result in benchmark_results:
+            assert result['time'] > 0
+            assert result['peak_memory'] > 0
+            assert result['throughput'] > 0
+
+
+# results of a benchmark with time = c * n^exponent
+def synthetic_results(exponent, c=1e-3):
+    return [{'benchmark': 'b', 'params': {'n': n, 'k': BASE_PARAMS['k']}, 'time': c * n ** exponent,
+             'peak_memory': n, 'throughput': 1 / (c * n ** exponent)} for n in (100, 200, 400, 800)]
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_grid_points():
+    points = grid_points(('n', 'k'), {'n': [100, 200, 400], 'k': [2, 4]}, BASE_PARAMS)
+    assert points[0] == {'n': BASE_PARAMS['n'], 'k': BASE_PARAMS['k']}
+    assert len(points) == len({tuple(point.items()) for point in points})
+    assert {point['n'] for point in points} == {100, 200, 400}
+    assert {point['k'] for point in points} == {2, 4}
+    for point in points:
+        assert point['n'] == BASE_PARAMS['n'] or point['k'] == BASE_PARAMS['k']
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(grid=TINY_GRID, base_params=TINY_BASE_PARAMS, repeats=1)
+    check_benchmark_results(results, TINY_GRID, TINY_BASE_PARAMS)
+    report = json.loads(json.dumps(benchmarks_report(results, TINY_BASE_PARAMS, repeats=1)))
+    assert set(report['exponents']['max_cover']) == {'n', 'k'}
+    # a baseline saved with half the memory of max_cover flags exactly its grid points
+    baseline = report['results']
+    for result in baseline:
+        if result['benchmark'] == 'max_cover':
+            result['peak_memory'] /= 2
+    regressions = compare_results(results, baseline, tolerance=0.5)
+    assert [(regression['benchmark'], regression['metric']) for regression in regressions] == \
+           [('max_cover', 'peak_memory')] * len(grid_points(BENCHMARKS['max_cover'][0], TINY_GRID, TINY_BASE_PARAMS))
+
+
+def test_scaling_exponents():
+    for exponent in (0.5, 1, 2):
+        exponents = scaling_exponents(synthetic_results(exponent))
+        assert list(exponents['b']) == ['n']
+        assert np.isclose(exponents['b']['n'], exponent)
+
+
+def test_compare_results():
+    baseline = synthetic_results(1)
+    results = synthetic_results(1.1)
+    regressions = compare_results(results, baseline, tolerance=0.9)
+    # n^1.1 is more than 90% slower than n only from n = 800 on
+    assert [(regression['params']['n'], regression['metric']) for regression in regressions] == [(800, 'time')]
+    assert regressions[0]['ratio'] > 1.9
+    assert not compare_results(baseline, results, tolerance=0)
@@ -0,0 +1,62 @@
+from project_experiments.checkpoints import CheckpointStore
+from project_experiments.experiments import run_experiment_tasks, k_integer_task, EXPERIMENTS_PARAMS
+from functools import partial
+import os
+import numpy as np
+import pytest
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# a task function that fails on every task, so only saved outputs can be added
+def failing_task(task):
+    raise AssertionError('task {} was run again'.format(task))
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_checkpoint_store(tmp_path):
+    path = os.path.join(tmp_path, 'checkpoints.sqlite')
+    with CheckpointStore(path) as store:
+        experiment = store.experiment('experiment')
+        assert experiment.load((0, 1)) is None
+        experiment.save((0, 1), (1, np.arange(3), {'time': 1.0}))
+        seed = experiment.seed
+        assert store.experiment('other experiment').seed != seed
+    with CheckpointStore(path) as store:
+        # without a seed, the seed of the last run is resumed
+        experiment = store.experiment('experiment')
+        assert experiment.seed == seed
+        rows, values, stats = experiment.load((0, 1))
+        assert rows == 1 and np.array_equal(values, np.arange(3)) and stats == {'time': 1.0}
+        assert experiment.load((1, 0)) is None
+        assert store.experiment('experiment', seed + 1).load((0, 1)) is None
+
+
+def test_run_experiment_tasks_resume(tmp_path):
+    tasks = [(graph_index, cover_index) for graph_index in range(2) for cover_index in range(2)]
+    k_limit = EXPERIMENTS_PARAMS['k limit']['small']
+    task_function = partial(k_integer_task, 'small', 1, None)
+    expected = np.zeros((k_limit, 4))
+    run_experiment_tasks(task_function, tasks, expected)
+
+    with CheckpointStore(os.path.join(tmp_path, 'checkpoints.sqlite')) as store:
+        experiment = store.experiment('k_integer', 1)
+        # an interrupted run, which completed only the first tasks
+        results = np.zeros((k_limit, 4))
+        run_experiment_tasks(task_function, tasks[:2], results, checkpoints=experiment)
+        results = np.zeros((k_limit, 4))
+        run_experiment_tasks(task_function, tasks, results, workers=2, checkpoints=experiment)
+        assert np.array_equal(results, expected)
+
+        results = np.zeros((k_limit, 4))
+        run_experiment_tasks(failing_task, tasks, results, checkpoints=experiment)
+        assert np.array_equal(results, expected)
+        with pytest.raises(AssertionError):
+            run_experiment_tasks(failing_task, tasks + [(2, 0)], results, checkpoints=experiment)
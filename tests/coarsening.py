@@ -0,0 +1,30 @@
+"""
+Coarsening check shared by the tests, for collections too large to check cluster by cluster.
+"""
+
+from algorithm.backends import MaskClusters
+import numpy as np
+import scipy.sparse as sp
+
+
+def coarsens(r, t):
+    """
+    checks if t coarsens r, i.e. for every cluster in r, there exists a cluster in t that contains it.
+    the check is a single sparse product of r and t incidence matrices,
+    counting for every pair of clusters the number of nodes they share.
+
+    :param r: a collection of clusters
+    :param t: a collection of clusters
+    :return: True if t coarsens r, otherwise False
+    """
+    collection = MaskClusters(list(r) + list(t))
+    data = np.ones(len(collection.indices), dtype=np.int32)
+    matrix = sp.csr_matrix((data, collection.indices, collection.indptr),
+                           shape=(len(collection), len(collection.nodes)))
+    r_matrix, t_matrix = matrix[:len(r)], matrix[len(r):]
+    shared = (r_matrix @ t_matrix.T).tocsr()
+    sizes = np.diff(r_matrix.indptr)
+    rows = np.repeat(np.arange(len(r)), np.diff(shared.indptr))
+    contained = np.zeros(len(r), dtype=bool)
+    contained[rows[shared.data == sizes[rows]]] = True
+    return bool(contained[sizes > 0].all())
@@ -0,0 +1,123 @@
+from utilities.util import generate_weighted_connected_graph, generate_cover, get_collection_data
+from algorithm.max_cover import max_cover, max_cover_sweep
+from algorithm.cover_cache import (CoverCache,
+                                   cached_max_cover_data,
+                                   cached_max_cover_sweep_data,
+                                   cover_digest,
+                                   graph_digest)
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
+import numpy as np
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert the cached results are exactly the outputs of max_cover with the same seed, and their data
+def check_cached_data(g, cover, k, data, seed):
+    t, radius, degree = data
+    assert t == max_cover(cover, k, rng=seed)
+    assert (radius, degree) == get_collection_data(g, t)
+
+
+# a worker process, which runs cached_max_cover_data on a shared cache directory
+def cached_radius(path, g, cover, k):
+    return cached_max_cover_data(CoverCache(path), g, cover, k, rng=k)[1]
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_cover_digest():
+    g = generate_weighted_connected_graph(30)
+    cover = generate_cover(g, 10)
+    assert cover_digest(cover) == cover_digest(list(reversed(list(cover))))
+    assert cover_digest(cover) != cover_digest(set(list(cover)[1:]))
+    assert graph_digest(g) == graph_digest(g.copy())
+
+
+def test_cached_max_cover_data(tmp_path):
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 20, max_cluster_size=10)
+    cache = CoverCache(os.path.join(tmp_path, 'cache'))
+    for k in range(1, 5):
+        stats = {}
+        data = cached_max_cover_data(cache, g, cover, k, rng=k, stats=stats)
+        check_cached_data(g, cover, k, data, k)
+        assert cached_max_cover_data(cache, g, cover, k, rng=k, stats=stats) == data
+        assert stats['cache misses'] == stats['cache hits'] == 1
+
+    # the seed is drawn from the global random state exactly as max_cover does
+    np.random.seed(1)
+    t = max_cover(cover, 3)
+    for _ in range(2):
+        np.random.seed(1)
+        assert cached_max_cover_data(cache, g, cover, 3)[0] == t
+
+    covers = max_cover_sweep(cover, range(1, 5), rng=5)
+    for _ in range(2):
+        sweep_data = cached_max_cover_sweep_data(cache, g, cover, range(1, 5), rng=5)
+        assert {k: t for k, (t, _, _) in sweep_data.items()} == covers
+
+
+def test_cached_max_cover_data_approx(tmp_path):
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 20, max_cluster_size=10)
+    cache = CoverCache(os.path.join(tmp_path, 'cache'))
+    stats = {}
+    t, radius, degree = cached_max_cover_data(cache, g, cover, 2, rng=0, stats=stats)
+    for _ in range(2):
+        # the upper bound is cached separately from the exact radius
+        approx_data = cached_max_cover_data(cache, g, cover, 2, rng=0, stats=stats, approx=1)
+        (_, upper), _ = get_collection_data(g, t, approx=1)
+        assert approx_data == (t, upper, degree)
+        assert radius <= upper
+    assert stats['cache misses'] == 2 and stats['cache hits'] == 1
+
+
+def test_cover_cache_eviction(tmp_path):
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 20, max_cluster_size=10)
+    path = os.path.join(tmp_path, 'cache')
+    cache = CoverCache(path)
+    cached_max_cover_data(cache, g, cover, 2, rng=0)
+    entry_size = sum(entry.stat().st_size for entry in os.scandir(path))
+    cache.max_bytes = 3 * entry_size
+    for seed in range(1, 6):
+        cached_max_cover_data(cache, g, cover, 2, rng=seed)
+        # the oldest result is used again, so it is the most recently used one
+        stats = {}
+        cached_max_cover_data(cache, g, cover, 2, rng=0, stats=stats)
+        assert stats.get('cache hits') == 1
+    assert len(os.listdir(path)) <= 4
+
+
+def test_cover_cache_corrupted_entry(tmp_path):
+    g = generate_weighted_connected_graph(30)
+    cover = generate_cover(g, 10)
+    path = os.path.join(tmp_path, 'cache')
+    cache = CoverCache(path)
+    data = cached_max_cover_data(cache, g, cover, 2, rng=0)
+    for entry in os.scandir(path):
+        with open(entry.path, 'wb') as f:
+            f.write(b'partial')
+    stats = {}
+    assert cached_max_cover_data(cache, g, cover, 2, rng=0, stats=stats) == data
+    assert stats['cache misses'] == 1
+
+
+def test_cover_cache_processes(tmp_path):
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 20, max_cluster_size=10)
+    path = os.path.join(tmp_path, 'cache')
+    ks = [1, 2, 3] * 4
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        radii = list(executor.map(partial(cached_radius, path, g, cover), ks))
+    for k, radius in zip(ks, radii):
+        assert radius == cached_radius(path, g, cover, k)
+    assert len(os.listdir(path)) == 3
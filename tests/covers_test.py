@@ -0,0 +1,109 @@
+from utilities.util import generate_weighted_connected_graph
+from utilities.covers import (generate_large_cover,
+                              grow_random_clusters,
+                              neighborhood_cover,
+                              iter_neighborhoods,
+                              COVER_MODES)
+from utilities.graph_arrays import graph_arrays
+from utilities.storage import save_cover, load_cover
+from algorithm.max_cover import max_cover
+from coarsening import coarsens
+import networkx as nx
+import numpy as np
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert cover is a correct coverage of graph nodes
+def check_cover_correctness(cover, graph_nodes):
+    assert frozenset.union(*([c for c in cover])) == set(graph_nodes)
+
+
+# assert each cluster in the cover is connected, and in the requested size
+def check_cover_clusters(g, cover, min_cluster_size, max_cluster_size):
+    for c in cover:
+        assert min_cluster_size <= len(c) <= max_cluster_size
+        assert nx.is_connected(nx.subgraph(g, list(c)))
+
+
+# assert the cover is exactly the set of different r-neighborhoods of g nodes, each of them once
+def check_neighborhood_cover(g, cover, r):
+    balls = {frozenset(nx.single_source_dijkstra_path_length(g, v, cutoff=r)) for v in g.nodes()}
+    assert len(cover) == len(balls)
+    assert set(cover) == balls
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_generate_large_cover_coverage():
+    for graph_size in range(1, 40, 3):
+        g = generate_weighted_connected_graph(graph_size)
+        for requested_cover_size in range(1, graph_size, 3):
+            cover = generate_large_cover(g, requested_cover_size, seed=requested_cover_size)
+            assert len(cover) >= requested_cover_size
+            check_cover_correctness(cover, g.nodes())
+            check_cover_clusters(g, cover, 1, graph_size)
+
+
+def test_generate_large_cover_min_max_cluster_size():
+    for graph_size in range(1, 20, 2):
+        g = generate_weighted_connected_graph(graph_size, p=0.2)
+        for i in range(1, graph_size):
+            for j in range(i, graph_size, 2):
+                for mode in COVER_MODES:
+                    cover = generate_large_cover(g, 1, min_cluster_size=i, max_cluster_size=j, mode=mode, seed=i + j)
+                    check_cover_correctness(cover, g.nodes())
+                    check_cover_clusters(g, cover, i, j)
+
+
+def test_generate_large_cover_seed():
+    g = generate_weighted_connected_graph(100, p=0.1)
+    for mode in COVER_MODES:
+        assert generate_large_cover(g, 20, max_cluster_size=10, mode=mode, seed=1) == \
+               generate_large_cover(g, 20, max_cluster_size=10, mode=mode, seed=1)
+
+
+def test_grow_random_clusters_distribution():
+    # node 0 neighbours 1 and 2, and 1 has 8 more neighbours. 2 is picked first with probability 1/2,
+    # and otherwise after 1, with probability (1/2) / (1/2 + 8/9), as in generate_random_cluster
+    g = nx.Graph([(0, 1), (0, 2)] + [(1, v) for v in range(3, 11)])
+    nx.set_edge_attributes(g, 1, 'weight')
+    arrays = graph_arrays(g)
+    samples = 20000
+    members = grow_random_clusters(arrays, np.zeros(samples, dtype=np.int64), np.full(samples, 3),
+                                   np.random.default_rng(0))
+    expected = 1 / 2 + 1 / 2 * (1 / 2) / (1 / 2 + 8 / 9)
+    assert abs(np.count_nonzero(members % len(arrays) == 2) / samples - expected) < 0.02
+
+
+def test_neighborhood_cover():
+    for graph_size in range(1, 80, 13):
+        g = generate_weighted_connected_graph(graph_size, p=0.1, max_weight=10)
+        for r in (0, 5, 20, 1000):
+            cover = neighborhood_cover(g, r)
+            check_neighborhood_cover(g, cover, r)
+            check_cover_correctness(cover, g.nodes())
+
+
+def test_neighborhood_cover_chunks(tmp_path):
+    g = generate_weighted_connected_graph(100, p=0.05, max_weight=10)
+    cover = neighborhood_cover(g, 15)
+    # balls identical to balls of previous chunks are skipped
+    chunks = list(iter_neighborhoods(g, 15, batch_size=7))
+    assert len(chunks) == 15
+    assert [ball for chunk in chunks for ball in chunk] == list(cover)
+    assert list(neighborhood_cover(g, 15, batch_size=1)) == list(cover)
+    save_cover(str(tmp_path / 'cover'), cover)
+    assert list(load_cover(str(tmp_path / 'cover'))) == list(cover)
+    assert coarsens(cover, max_cover(cover, 3, rng=0))
+
+
+def test_neighborhood_cover_node_labels():
+    g = nx.relabel_nodes(generate_weighted_connected_graph(40, p=0.1, max_weight=10), lambda v: 2 * v + 1)
+    check_neighborhood_cover(g, neighborhood_cover(g, 12, batch_size=5), 12)
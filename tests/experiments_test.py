@@ -0,0 +1,77 @@
+from project_experiments.experiments import (run_experiment_tasks,
+                                             k_integer_task,
+                                             graph_density_task,
+                                             graph_density_experiment,
+                                             experiment_checkpoints,
+                                             EXPERIMENTS_PARAMS,
+                                             NUM_OF_RESULTS_PARAMS,
+                                             NUM_OF_NODES)
+from functools import partial
+import numpy as np
+import pytest
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert the experiment results are the same for any number of workers
+def check_workers_determinism(task_function, tasks, rows, workers_options=(1, 2, 3)):
+    results = []
+    for workers in workers_options:
+        workers_results = np.zeros((rows, NUM_OF_RESULTS_PARAMS))
+        run_experiment_tasks(task_function, tasks, workers_results, workers)
+        results.append(workers_results)
+    for workers_results in results[1:]:
+        assert np.array_equal(workers_results, results[0])
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_k_integer_workers_determinism():
+    tasks = [(graph_index, cover_index) for graph_index in range(2) for cover_index in range(2)]
+    k_limit = EXPERIMENTS_PARAMS['k limit']['small']
+    check_workers_determinism(partial(k_integer_task, 'small', 1, None), tasks, k_limit)
+
+
+def test_graph_density_workers_determinism():
+    tasks = [(i, p, graph_index, 0) for i, p in enumerate([0.1, 0.5]) for graph_index in range(2)]
+    check_workers_determinism(partial(graph_density_task, 'small', 2, NUM_OF_NODES, None), tasks, 2)
+
+
+def test_graph_density_large_workers_determinism():
+    tasks = [(i, p, graph_index, 0) for i, p in enumerate([0.1, 0.5]) for graph_index in range(2)]
+    check_workers_determinism(partial(graph_density_task, 'small', 2, NUM_OF_NODES, None, large=True), tasks, 2)
+
+
+def test_graph_density_approx():
+    task = (0, 0.1, 0, 0)
+    _, exact_values, _ = graph_density_task('small', 2, NUM_OF_NODES, None, task)
+    _, approx_values, approx_stats = graph_density_task('small', 2, NUM_OF_NODES, None, task, approx=1)
+    # the degrees are exact, and the radii are upper bounds, within a factor of 2
+    assert np.array_equal(approx_values[2:], exact_values[2:])
+    assert np.all(exact_values[:2] <= approx_values[:2])
+    assert np.all(approx_values[:2] <= 2 * exact_values[:2])
+    assert 'exact refinements' in approx_stats
+
+
+def test_data_dir_seed(tmp_path):
+    # without checkpoints, the inputs are stored by the seed, which must not be drawn at random
+    with pytest.raises(ValueError):
+        graph_density_experiment('small', data_dir=str(tmp_path))
+    assert experiment_checkpoints(None, 'name', 3, str(tmp_path)) == experiment_checkpoints(None, 'name', 3)
+
+
+def test_data_dir_results(tmp_path):
+    # the inputs are generated over the same arrays as they are stored, so storing and loading them keeps the results
+    tasks = [(partial(k_integer_task, 'small', 1), (0, 0)),
+             (partial(graph_density_task, 'small', 2, NUM_OF_NODES), (0, 0.1, 0, 0))]
+    for task_function, task in tasks:
+        _, values, _ = task_function(None, task)
+        for _ in range(2):
+            _, stored_values, _ = task_function(str(tmp_path), task)
+            assert np.array_equal(stored_values, values)
@@ -0,0 +1,76 @@
+from utilities.util import (generate_weighted_connected_graph,
+                            generate_cover,
+                            calculate_collection_radius,
+                            calculate_collection_degree)
+from algorithm.incremental_cover import MaxCoverState
+from algorithm.validation import exceeds_bound
+from coarsening import coarsens
+import numpy as np
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert the state's T coarsens S, satisfies the max cover properties, and is consistent with its degree tracking
+def check_state(g, state):
+    t = state.T
+    assert coarsens(state.S, t)
+    assert calculate_collection_radius(g, t) <= (2 * state.k - 1) * calculate_collection_radius(g, state.S)
+    assert state.degree() == calculate_collection_degree(t)
+    assert not exceeds_bound(state.degree(), state.degree_bound())
+    assert set(state.owners) == state.S
+    for s, owner in state.owners.items():
+        assert s <= owner and s in state.members[owner]
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_max_cover_state_updates():
+    rng = np.random.default_rng(0)
+    for size in range(20, 101, 40):
+        g = generate_weighted_connected_graph(size, p=0.1)
+        cover = generate_cover(g, size, max_cluster_size=10)
+        extra = list(generate_cover(g, size, max_cluster_size=10) - cover)
+        for k in (1, 2, 4):
+            state = MaxCoverState(cover, k, rng=k)
+            check_state(g, state)
+            s_clusters = list(cover)
+            added = list(extra)
+            for i in range(30):
+                if i % 3 == 0 and added:
+                    state.add_cluster(added.pop())
+                elif len(s_clusters) > 1:
+                    state.remove_cluster(s_clusters.pop(rng.integers(len(s_clusters))))
+                check_state(g, state)
+
+
+def test_max_cover_state_add_contained():
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 30, max_cluster_size=10)
+    state = MaxCoverState(cover, 2, rng=0)
+    t = state.T
+    for v in g.nodes():
+        s = frozenset([v])
+        if s not in state.S:
+            state.add_cluster(s)
+            # a cluster contained in a cluster of T is adopted by it, without changing T
+            assert state.T == t and v in state.owners[s]
+    check_state(g, state)
+
+
+def test_max_cover_state_degree_rounding():
+    g = generate_weighted_connected_graph(50, p=0.1)
+    state = MaxCoverState(generate_cover(g, 30, max_cluster_size=10), 2, rng=0)
+    degree = state.degree()
+    # a bound within rounding errors of Deg(T), e.g. 2k*|S|^(1/k) for |S| = 64 and k = 3, does not rebuild T
+    state.degree_bound = lambda: degree - 1e-12
+    state.check_degree()
+    assert state.rebuilds == 0
+    state.degree_bound = lambda: degree - 1
+    state.check_degree()
+    assert state.rebuilds == 1
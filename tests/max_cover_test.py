@@ -9,8 +9,15 @@ from utilities.util import (generate_weighted_connected_graph,
                             generate_cover,
                             calculate_collection_radius,
                             calculate_collection_degree)
-from algorithm.max_cover import procedure_cover, max_cover
+from algorithm.max_cover import (procedure_cover, max_cover, max_cover_sweep, iter_max_cover, ClusterIndex,
+                                 cover_engine)
+from algorithm.backends import BACKENDS
+from coarsening import coarsens
+from algorithm.parallel_cover import iter_parallel_max_cover
+from algorithm.cover_stats import MaxCoverStats
+from algorithm.cover_radii import ClusterRadii
 import numpy as np
+import pytest
 
 
 #############################################
@@ -37,7 +44,9 @@ def check_dt_disjointness(dt):
 
 # assert property (3): |DR| >= |R|^(1-1/k)
 def check_dr_bound(dr, r, k):
-    assert len(dr) >= np.power(len(r), 1 - (1 / k))
+    # the bound is an integer whenever |DR| can be exactly on it, e.g. 8^(2/3) = 4, so its rounding error is ignored
+    bound = np.power(len(r), 1 - (1 / k))
+    assert len(dr) >= bound or np.isclose(len(dr), bound)
 
 
 # assert property (4): Rad(DT) <= (2k-1)*Rad(R)
@@ -62,6 +71,65 @@ def check_t_degree(s, t, k):
     assert t_degree <= 2 * k * np.power(len(s), 1 / k)
 
 
+# assert every yielded cluster contains the clusters it was constructed for,
+# and every cluster of s was yielded with exactly one of them
+def check_iter_max_cover(s, iter_t):
+    members = []
+    for t_cluster, s_clusters in iter_t:
+        assert all(c <= t_cluster for c in s_clusters)
+        members.extend(s_clusters)
+    assert len(members) == len(s) and set(members) == set(s)
+
+
+# assert the recorded stats agree with the run, every phase covers its clusters,
+# and every kernel was stopped by the growth test at its last layer only
+def check_max_cover_stats(s, t, stats):
+    assert sum(phase['covered'] for phase in stats.phases) == len(s)
+    assert stats.phases[0]['R'] == len(s)
+    assert len(stats.kernels) == len(t) == sum(phase['kernels'] for phase in stats.phases)
+    assert sum(kernel['union size'] for kernel in stats.kernels) == sum(len(t_cluster) for t_cluster in t)
+    for kernel in stats.kernels:
+        assert kernel['ratios'][-1] <= 1 and all(ratio > 1 for ratio in kernel['ratios'][:-1])
+        assert kernel['intersection tests'] >= kernel['Z']
+    summary = stats.summary()
+    assert summary['kernels'] == len(t) and summary['phases'] == len(stats.phases)
+
+
+# assert the recorded radius bounds of every cluster of T contain its radius, within (2k-1)*Rad(S),
+# and the clusters of S in T keep their exact radii
+def check_max_cover_radii(g, s, t, k, radii):
+    bound = (2 * k - 1) * calculate_collection_radius(g, s)
+    for t_cluster in t:
+        lower, upper = radii.bounds[t_cluster]
+        assert lower <= calculate_collection_radius(g, [t_cluster]) <= upper <= bound
+        assert radii.centers[t_cluster] in s and radii.centers[t_cluster] <= t_cluster
+        if t_cluster in s:
+            assert lower == upper
+
+
+# CLUSTER INDEX CHECKERS:
+
+# assert Z of every layer is exactly the set of clusters in u that intersect Y
+def check_layers_intersections(index, u, layers_num=5):
+    layers = index.layers(index.pick())
+    for _ in range(layers_num):
+        _, y_union, z = next(layers)
+        assert z == {c for c in u if frozenset.intersection(c, y_union)}
+
+
+# assert the layers of a backend engine are the same as the layers of a ClusterIndex of the same clusters
+def check_engine_layers(index, engine, layers_num=5):
+    seed = index.pick()
+    layers = index.layers(seed)
+    engine_layers = engine.layers(engine.collection.cluster_ids[seed])
+    for _ in range(layers_num):
+        y, y_union, z = next(layers)
+        engine_y, engine_y_union, engine_z = next(engine_layers)
+        assert engine.as_clusters(engine_y) == y
+        assert engine.as_cluster(engine_y_union) == y_union
+        assert engine.as_clusters(engine_z) == z
+
+
 #############################################
 # TESTS #####################################
 #############################################
@@ -88,3 +156,147 @@ def test_max_cover():
             check_t_radius(g, cover, t, k)
             check_t_degree(cover, t, k)
             check_coarsening(cover, t)
+
+
+def test_cluster_index_layers():
+    for size in range(1, 101, 20):
+        g = generate_weighted_connected_graph(size, p=0.1)
+        cover = generate_cover(g, 1)
+        index = ClusterIndex(cover)
+        while index:
+            check_layers_intersections(index, index.clusters)
+            index.remove({index.pick()})
+
+
+def test_collection_engine_layers():
+    for size in range(1, 101, 20):
+        g = generate_weighted_connected_graph(size, p=0.1)
+        cover = generate_cover(g, 1)
+        for backend in BACKENDS:
+            index = ClusterIndex(cover)
+            engine = cover_engine(cover, backend)
+            while index:
+                check_engine_layers(index, engine)
+                removed = {index.pick()}
+                index.remove(removed)
+                engine.remove(engine.collection.ids(removed))
+
+
+def test_max_cover_backends():
+    for size in range(1, 101, 20):
+        g = generate_weighted_connected_graph(size)
+        cover = generate_cover(g, 1)
+        for k in range(1, 10):
+            np.random.seed(k)
+            t = max_cover(cover, k)
+            for backend in BACKENDS:
+                np.random.seed(k)
+                assert max_cover(cover, k, backend=backend) == t
+            assert coarsens(cover, t)
+
+
+def test_max_cover_backend_collection():
+    g = generate_weighted_connected_graph(60)
+    cover = generate_cover(g, 1)
+    for backend in BACKENDS:
+        # a prebuilt collection is used as is, for any number of runs
+        collection = BACKENDS[backend](cover)
+        for k in range(1, 4):
+            assert max_cover(cover, k, backend=collection, rng=k) == max_cover(cover, k, backend=backend, rng=k)
+
+
+def test_max_cover_sweep():
+    for size in range(1, 101, 20):
+        g = generate_weighted_connected_graph(size)
+        cover = generate_cover(g, 1)
+        ks = range(1, 10)
+        covers = max_cover_sweep(cover, ks)
+        assert sorted(covers) == list(ks)
+        for k, t in covers.items():
+            check_t_radius(g, cover, t, k)
+            check_t_degree(cover, t, k)
+            check_coarsening(cover, t)
+
+
+def test_iter_max_cover():
+    for size in range(1, 101, 20):
+        g = generate_weighted_connected_graph(size)
+        cover = generate_cover(g, 1)
+        for k in range(1, 10):
+            np.random.seed(k)
+            t = max_cover(cover, k)
+            np.random.seed(k)
+            assert {t_cluster for t_cluster, _ in iter_max_cover(cover, k)} == t
+            check_iter_max_cover(cover, iter_max_cover(cover, k))
+
+
+def test_max_cover_rng():
+    for size in range(1, 101, 20):
+        g = generate_weighted_connected_graph(size)
+        cover = generate_cover(g, 1)
+        for k in range(1, 10):
+            t = max_cover(cover, k, rng=k)
+            assert max_cover(cover, k, rng=np.random.default_rng(k)) == t
+            assert max_cover_sweep(cover, [k], rng=k)[k] == t
+
+
+def test_parallel_max_cover():
+    for size in range(1, 101, 20):
+        g = generate_weighted_connected_graph(size)
+        cover = generate_cover(g, 1)
+        for k in range(1, 10):
+            t = {t_cluster for t_cluster, _ in iter_parallel_max_cover(cover, k, rng=k, batch=4)}
+            check_t_radius(g, cover, t, k)
+            check_t_degree(cover, t, k)
+            check_coarsening(cover, t)
+            check_iter_max_cover(cover, iter_parallel_max_cover(cover, k, rng=k, batch=4))
+
+
+def test_parallel_max_cover_workers():
+    g = generate_weighted_connected_graph(200, p=0.05)
+    cover = generate_cover(g, 150, max_cluster_size=10)
+    for k in (2, 5):
+        t = {t_cluster for t_cluster, _ in iter_parallel_max_cover(cover, k, rng=k)}
+        assert max_cover(cover, k, rng=k, workers=2) == t
+        assert max_cover(cover, k, rng=k, workers=3) == t
+        check_t_degree(cover, t, k)
+        check_coarsening(cover, t)
+
+
+def test_parallel_max_cover_single_worker_options():
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 30, max_cluster_size=10)
+    # the worker processes neither record stats nor use other backends, so these are rejected instead of ignored
+    with pytest.raises(ValueError):
+        max_cover(cover, 2, workers=2, stats=MaxCoverStats())
+    for backend in BACKENDS:
+        with pytest.raises(ValueError):
+            max_cover(cover, 2, backend=backend, workers=2)
+        with pytest.raises(ValueError):
+            max_cover(cover, 2, backend=BACKENDS[backend](cover), workers=2)
+
+
+def test_max_cover_stats():
+    g = generate_weighted_connected_graph(100, p=0.1)
+    cover = generate_cover(g, 50, max_cluster_size=15)
+    for k in range(1, 6):
+        t = max_cover(cover, k, rng=k)
+        for backend in ('frozenset',) + tuple(BACKENDS):
+            stats = MaxCoverStats()
+            assert max_cover(cover, k, backend=backend, rng=k, stats=stats) == t
+            check_max_cover_stats(cover, t, stats)
+
+
+def test_max_cover_radii():
+    g = generate_weighted_connected_graph(100, p=0.1)
+    cover = generate_cover(g, 50, max_cluster_size=15)
+    intervals = {}
+    calculate_collection_radius(g, cover, intervals=intervals)
+    for k in range(1, 6):
+        t = max_cover(cover, k, rng=k)
+        for backend in ('frozenset',) + tuple(BACKENDS):
+            radii = ClusterRadii(intervals)
+            assert max_cover(cover, k, backend=backend, rng=k, radii=radii) == t
+            check_max_cover_radii(g, cover, t, k, radii)
+    with pytest.raises(ValueError):
+        max_cover(cover, 2, workers=2, radii=ClusterRadii(intervals))
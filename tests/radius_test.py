@@ -0,0 +1,198 @@
+from utilities.util import (generate_weighted_connected_graph,
+                            generate_cover,
+                            cluster_induced_graph,
+                            calculate_graph_radius,
+                            calculate_collection_radius,
+                            weight_graph_edges)
+from utilities import radius as radius_module
+from utilities.radius import cluster_radius, radius_cache, balanced_chunks, RadiusCache
+import networkx as nx
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert the radius of every cluster is the same as calculated by networkx
+def check_clusters_radii(g, cover):
+    for c in cover:
+        assert cluster_radius(g, c) == calculate_graph_radius(cluster_induced_graph(g, c))
+
+
+# assert the bounded radius of every cluster is the same as calculated by networkx
+def check_clusters_bounded_radii(g, cover):
+    for c in cover:
+        assert cluster_radius(g, c, bounded=True) == calculate_graph_radius(cluster_induced_graph(g, c))
+
+
+# assert the radius of cover is the same as calculated by networkx
+def check_collection_radius(g, cover):
+    assert calculate_collection_radius(g, cover) == calculate_collection_radius(g, cover, method='networkx')
+
+
+# assert the radius bounds of every cluster, and of cover, contain their radii,
+# and a single Dijkstra run bounds the radius within a factor of 2
+def check_approx_collection_radius(g, cover, sources):
+    intervals = {}
+    lower, upper = calculate_collection_radius(g, cover, approx=sources, intervals=intervals)
+    assert lower <= calculate_collection_radius(g, cover, method='networkx') <= upper
+    assert set(intervals) == set(cover)
+    for c, (cluster_lower, cluster_upper) in intervals.items():
+        assert cluster_lower <= calculate_graph_radius(cluster_induced_graph(g, c)) <= cluster_upper
+        assert cluster_upper <= 2 * cluster_lower
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_cluster_radius():
+    for size in range(20, 101, 20):
+        g = generate_weighted_connected_graph(size, p=0.1, max_weight=5)
+        cover = generate_cover(g, 5, max_cluster_size=20)
+        check_clusters_radii(g, cover)
+
+
+def test_cluster_bounded_radius():
+    for size in range(20, 101, 20):
+        for max_weight in (0, 1, 100):
+            g = generate_weighted_connected_graph(size, p=0.1, max_weight=max_weight)
+            cover = generate_cover(g, 5, max_cluster_size=20)
+            check_clusters_bounded_radii(g, cover)
+
+
+def test_collection_bounded_radius_stats():
+    g = generate_weighted_connected_graph(200, p=0.05)
+    cover = {frozenset(g.nodes())}
+    stats = {}
+    assert calculate_collection_radius(g, cover, method='bounded', stats=stats) == calculate_graph_radius(g)
+    assert stats['dijkstra runs'] + stats['dijkstra saved'] == 200
+
+
+def test_collection_radius():
+    for size in range(20, 101, 20):
+        g = generate_weighted_connected_graph(size, p=0.1)
+        cover = generate_cover(g, 5, max_cluster_size=20)
+        check_collection_radius(g, cover)
+
+
+def test_approx_graph_radius():
+    for size in range(20, 101, 20):
+        g = generate_weighted_connected_graph(size, p=0.1)
+        exact = calculate_graph_radius(g)
+        for sources in (1, 2, size):
+            lower, upper = calculate_graph_radius(g, approx=sources)
+            assert lower <= exact <= upper <= 2 * lower
+        assert calculate_graph_radius(g, approx=size) == (exact, exact)
+
+
+def test_approx_collection_radius():
+    for size in range(20, 101, 20):
+        g = generate_weighted_connected_graph(size, p=0.1)
+        cover = generate_cover(g, 5, max_cluster_size=20)
+        for sources in (1, 2):
+            check_approx_collection_radius(g, cover, sources)
+
+
+def test_approx_collection_radius_cache():
+    g = generate_weighted_connected_graph(200, p=0.05)
+    cover = generate_cover(g, 20, max_cluster_size=30)
+    cache = RadiusCache()
+    first_stats, second_stats = {}, {}
+    bounds = calculate_collection_radius(g, cover, approx=1, stats=first_stats, cache=cache)
+    # refined and certified radii are cached, so nothing is refined again
+    assert calculate_collection_radius(g, cover, approx=1, stats=second_stats, cache=cache) == bounds
+    assert second_stats['exact refinements'] == 0
+    assert second_stats['dijkstra runs'] < first_stats['dijkstra runs']
+    radius = calculate_collection_radius(g, cover, method='networkx')
+    assert calculate_collection_radius(g, cover, method='networkx', approx=1) == (radius, radius)
+
+
+def test_collection_radius_bounds():
+    g = generate_weighted_connected_graph(200, p=0.05)
+    cover = generate_cover(g, 40, max_cluster_size=30)
+    intervals = {}
+    exact = calculate_collection_radius(g, cover, intervals=intervals)
+    assert all(lower == upper for lower, upper in intervals.values()) and set(intervals) == set(cover)
+    # with exact bounds, the radius is calculated without running Dijkstra
+    stats = {}
+    assert calculate_collection_radius(g, cover, bounds=intervals, stats=stats) == exact
+    assert stats['dijkstra runs'] == 0
+    # with loose bounds, clusters are calculated until the radius is exact
+    loose = {cluster: (0, upper + i) for i, (cluster, (_, upper)) in enumerate(intervals.items())}
+    assert calculate_collection_radius(g, cover, bounds=loose) == exact
+    lower, upper = calculate_collection_radius(g, cover, bounds=loose, approx=1)
+    assert lower <= exact <= upper
+
+
+def test_collection_radius_node_labels():
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 5, max_cluster_size=20)
+    labels = {v: 'node {}'.format(v) for v in g.nodes()}
+    labeled_cover = {frozenset(labels[v] for v in c) for c in cover}
+    labeled_g = nx.relabel_nodes(g, labels)
+    assert calculate_collection_radius(labeled_g, labeled_cover) == calculate_collection_radius(g, cover)
+
+
+def test_radius_cache():
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 5, max_cluster_size=20)
+    radius = calculate_collection_radius(g, cover, cache=True)
+    cache = radius_cache(g)
+    assert cache.misses == len(cover) and cache.hits == 0
+    assert calculate_collection_radius(g, cover, cache=True) == radius
+    assert cache.hits == len(cover)
+    weight_graph_edges(g)
+    assert radius_cache(g) is not cache and len(radius_cache(g)) == 0
+    assert calculate_collection_radius(g, cover, cache=True) == calculate_collection_radius(g, cover)
+
+
+def test_changed_graph_radius():
+    g = nx.path_graph(3)
+    nx.set_edge_attributes(g, 1, 'weight')
+    cluster = frozenset(g.nodes())
+    for cache in (None, True):
+        g[0][1]['weight'] = 1
+        g.remove_edges_from([(0, 2)])
+        assert calculate_collection_radius(g, [cluster], cache=cache) == 1
+        g[0][1]['weight'] = 10
+        assert calculate_collection_radius(g, [cluster], cache=cache) == 10
+        assert calculate_collection_radius(g, [cluster], method='networkx') == 10
+        g.add_edge(0, 2, weight=0)
+        assert calculate_collection_radius(g, [cluster], cache=cache) == 1
+
+
+def test_radius_cache_eviction():
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = list(generate_cover(g, 5, max_cluster_size=20))
+    cache = RadiusCache(maxsize=2)
+    for method in ('csgraph', 'networkx'):
+        cache.clear()
+        calculate_collection_radius(g, cover, method=method, cache=cache)
+        assert list(cache.radii) == cover[-2:]
+
+
+def test_balanced_chunks():
+    sizes = [1, 7, 3, 20, 20, 5, 9, 2, 2, 14]
+    for num_of_chunks in range(1, 12):
+        chunks = balanced_chunks(sizes, num_of_chunks)
+        assert len(chunks) == min(num_of_chunks, len(sizes))
+        assert sorted(i for chunk in chunks for i in chunk) == list(range(len(sizes)))
+
+
+def test_parallel_collection_radius(monkeypatch):
+    monkeypatch.setattr(radius_module, 'PARALLEL_MIN_NODES', 0)
+    g = generate_weighted_connected_graph(100, p=0.05)
+    cover = generate_cover(g, 20, max_cluster_size=30)
+    for method in ('csgraph', 'bounded'):
+        serial_stats, parallel_stats = {}, {}
+        serial_cache, parallel_cache = RadiusCache(), RadiusCache()
+        serial = calculate_collection_radius(g, cover, method=method, stats=serial_stats, cache=serial_cache)
+        for workers in (2, 3):
+            parallel = calculate_collection_radius(g, cover, method=method, stats=parallel_stats,
+                                                   cache=parallel_cache, workers=workers)
+            assert parallel == serial
+            parallel_cache.clear()
+        assert parallel_stats['dijkstra runs'] == 2 * serial_stats['dijkstra runs']
@@ -0,0 +1,65 @@
+from utilities.random_set import RandomSet, as_generator
+import numpy as np
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert the items and positions of the random set are consistent, and hold exactly the expected items
+def check_random_set(random_set, expected):
+    assert len(random_set) == len(expected)
+    assert set(random_set) == expected
+    for item in expected:
+        assert item in random_set
+        assert random_set.items[random_set.positions[item]] == item
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_random_set_add_discard():
+    rng = np.random.default_rng(0)
+    random_set = RandomSet(range(50), rng)
+    expected = set(range(50))
+    for _ in range(200):
+        item = int(rng.integers(70))
+        if rng.random() < 0.5:
+            random_set.add(item)
+            expected.add(item)
+        else:
+            random_set.discard(item)
+            expected.discard(item)
+        check_random_set(random_set, expected)
+
+
+def test_random_set_bulk_remove():
+    for size in range(1, 60, 7):
+        items = list(range(size))
+        removed = set(items[::3])
+        first, second = RandomSet(items, 1), RandomSet(items, 1)
+        first -= removed
+        second -= sorted(removed, reverse=True)
+        check_random_set(first, set(items) - removed)
+        # the positions of the remaining items don't depend on the order of the removed items
+        assert first.items == second.items
+
+
+def test_random_set_pick():
+    random_set = RandomSet(range(10), 0)
+    picks = [random_set.pick() for _ in range(10000)]
+    assert set(picks) == set(range(10))
+    assert max(np.bincount(picks)) < 1200
+    assert [RandomSet(range(10), 5).pick() for _ in range(10)] == [RandomSet(range(10), 5).pick() for _ in range(10)]
+
+
+def test_as_generator():
+    rng = np.random.default_rng(0)
+    assert as_generator(rng) is rng
+    np.random.seed(3)
+    first = as_generator().random()
+    np.random.seed(3)
+    assert as_generator().random() == first
@@ -0,0 +1,91 @@
+from utilities.util import (generate_weighted_connected_graph,
+                            generate_cover,
+                            get_collection_data,
+                            networkx_graph)
+from utilities.storage import (save_graph,
+                               load_graph,
+                               save_cover,
+                               load_cover,
+                               stored_graph,
+                               stored_cover)
+from algorithm.max_cover import max_cover
+from coarsening import coarsens
+import numpy as np
+import networkx as nx
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert the loaded graph has the same nodes, edges and weights as g
+def check_graph_equality(g, loaded):
+    loaded_g = networkx_graph(loaded)
+    assert set(loaded_g.nodes()) == set(g.nodes())
+    assert {frozenset(e) for e in loaded_g.edges()} == {frozenset(e) for e in g.edges()}
+    for u, v in g.edges():
+        assert loaded_g[u][v]['weight'] == g[u][v]['weight']
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_graph_storage(tmp_path):
+    for size in range(1, 60, 7):
+        g = generate_weighted_connected_graph(size, p=0.2)
+        save_graph(str(tmp_path / 'graph'), g)
+        loaded = load_graph(str(tmp_path / 'graph'))
+        assert isinstance(loaded.indices, np.memmap)
+        check_graph_equality(g, loaded)
+
+
+def test_graph_storage_labels(tmp_path):
+    g = nx.relabel_nodes(generate_weighted_connected_graph(30, p=0.2), lambda v: 2 * v + 7)
+    save_graph(str(tmp_path / 'graph'), g)
+    check_graph_equality(g, load_graph(str(tmp_path / 'graph')))
+
+
+def test_cover_storage(tmp_path):
+    for size in range(1, 60, 7):
+        g = generate_weighted_connected_graph(size, p=0.2)
+        cover = generate_cover(g, size // 2 + 1)
+        save_cover(str(tmp_path / 'cover'), cover)
+        loaded = load_cover(str(tmp_path / 'cover'))
+        assert len(loaded) == len(cover)
+        assert list(loaded) == list(cover)
+        assert [loaded.cluster(i) for i in range(len(loaded))] == list(cover)
+
+
+def test_stored_collection_data(tmp_path):
+    g = generate_weighted_connected_graph(50, p=0.1)
+    cover = generate_cover(g, 20, max_cluster_size=10)
+    save_graph(str(tmp_path / 'graph'), g)
+    save_cover(str(tmp_path / 'cover'), cover)
+    loaded_g, loaded_cover = load_graph(str(tmp_path / 'graph')), load_cover(str(tmp_path / 'cover'))
+    assert get_collection_data(loaded_g, loaded_cover) == get_collection_data(g, cover)
+    for k in range(1, 5):
+        np.random.seed(k)
+        t = max_cover(loaded_cover, k)
+        np.random.seed(k)
+        assert max_cover(loaded_cover, k) == t
+        assert coarsens(cover, t)
+        assert get_collection_data(loaded_g, t)[1] <= 2 * k * np.power(len(cover), 1 / k)
+
+
+def test_stored_inputs_generated_once(tmp_path):
+    generated = []
+
+    def generate():
+        generated.append(1)
+        return generate_weighted_connected_graph(20)
+
+    first = stored_graph(str(tmp_path / 'graph'), generate)
+    second = stored_graph(str(tmp_path / 'graph'), generate)
+    assert len(generated) == 1
+    assert np.array_equal(first.weights, second.weights)
+    cover = stored_cover(str(tmp_path / 'cover'), lambda: generate_cover(networkx_graph(first), 5))
+    assert list(stored_cover(str(tmp_path / 'cover'), lambda: None)) == list(cover)
+    assert stored_graph(None, lambda: 'graph') == 'graph'
@@ -1,7 +1,19 @@
 from utilities.util import (generate_weighted_connected_graph,
                             generate_random_cluster,
-                            generate_cover)
+                            generate_cover,
+                            calculate_node_degree_in_collection,
+                            calculate_collection_degree,
+                            calculate_collection_degree_distribution,
+                            calculate_collection_radius,
+                            get_collection_data,
+                            get_collections_data,
+                            gnp_pairs,
+                            pairs_to_edges)
+from algorithm.max_cover import max_cover
+from algorithm.cover_radii import ClusterRadii
 import networkx as nx
+import numpy as np
+import pytest
 
 
 #############################################
@@ -46,6 +58,17 @@ def check_cover_clusters_size(cover, min_cluster_size, max_cluster_size):
         check_cluster_size(c, min_cluster_size, max_cluster_size)
 
 
+# assert collection degree, and its nodes degrees distribution, match the degree of every node
+def check_collection_degree(cover, graph_nodes):
+    nodes_degrees = {v: calculate_node_degree_in_collection(cover, v) for v in graph_nodes}
+    degree, histogram, max_degree_nodes = calculate_collection_degree_distribution(cover)
+    assert calculate_collection_degree(cover) == degree == max(nodes_degrees.values())
+    assert sorted(max_degree_nodes) == sorted(v for v, d in nodes_degrees.items() if d == degree)
+    assert histogram.sum() == len(nodes_degrees)
+    for d, count in enumerate(histogram):
+        assert count == list(nodes_degrees.values()).count(d)
+
+
 #############################################
 # TESTS #####################################
 #############################################
@@ -64,6 +87,37 @@ def test_generate_weighted_connected_graph_weights():
             check_graph_weights(g, max_weight)
 
 
+def test_generate_weighted_connected_graph_sparse():
+    for size in range(1, 100, 7):
+        for p in (0, 0.01, 1):
+            g = generate_weighted_connected_graph(size, p=p)
+            check_graph_connectivity(g)
+            check_graph_weights(g)
+            if p == 1:
+                assert g.number_of_edges() == size * (size - 1) // 2
+
+
+def test_generate_weighted_connected_graph_arrays():
+    for size in range(1, 50, 7):
+        arrays = generate_weighted_connected_graph(size, p=0.1, max_weight=10, as_arrays=True)
+        assert len(arrays) == size
+        assert np.all((0 <= arrays.weights) & (arrays.weights <= 10))
+        g = nx.Graph()
+        g.add_nodes_from(range(size))
+        g.add_edges_from(zip(np.repeat(np.arange(size), np.diff(arrays.indptr)).tolist(), arrays.indices.tolist()))
+        check_graph_connectivity(g)
+
+
+def test_gnp_pairs_density():
+    n, p = 1000, 0.05
+    pairs = gnp_pairs(n, p)
+    assert np.all(np.diff(pairs) > 0)
+    assert abs(len(pairs) / (n * (n - 1) / 2) - p) < 0.005
+    u, v = pairs_to_edges(pairs)
+    assert np.all((0 <= u) & (u < v) & (v < n))
+    assert np.array_equal(v * (v - 1) // 2 + u, pairs)
+
+
 def test_generate_random_cluster_connectivity():
     for size in range(1, 100):
         g = generate_weighted_connected_graph(size)
@@ -99,3 +153,55 @@ def test_generate_cover_min_max_cluster_size():
                 check_cover_size(cover, 1)
                 check_cover_correctness(cover, g.nodes())
                 check_cover_clusters_size(cover, i, j)
+
+
+def test_generate_cover_invalid_sizes():
+    assert generate_cover(nx.Graph(), 5) == set()
+    g = generate_weighted_connected_graph(10)
+    with pytest.raises(ValueError):
+        generate_cover(g, 1, min_cluster_size=5, max_cluster_size=4)
+    with pytest.raises(ValueError):
+        generate_cover(g, 1, min_cluster_size=11)
+
+
+def test_calculate_collection_degree():
+    for graph_size in range(1, 40, 5):
+        g = generate_weighted_connected_graph(graph_size)
+        cover = generate_cover(g, graph_size)
+        check_collection_degree(cover, g.nodes())
+
+
+def test_get_collection_data_stats():
+    g = generate_weighted_connected_graph(50, p=0.2)
+    cover = generate_cover(g, 20, max_cluster_size=10)
+    stats = {}
+    assert get_collection_data(g, cover, stats=stats) == (calculate_collection_radius(g, cover),
+                                                          calculate_collection_degree(cover))
+    assert stats['radius time'] > 0 and stats['degree time'] > 0
+    assert stats['dijkstra runs'] == sum(len(cluster) for cluster in cover)
+
+
+def test_get_collections_data():
+    g = generate_weighted_connected_graph(60, p=0.1)
+    covers = [generate_cover(g, 20, max_cluster_size=10) for _ in range(3)]
+    collections = covers + [max_cover(cover, k, rng=k) for cover in covers for k in (1, 3)] + [covers[0]]
+    for method in ('csgraph', 'networkx'):
+        assert get_collections_data(g, collections, method) == [get_collection_data(g, collection, method)
+                                                                for collection in collections]
+    # every different cluster is measured once
+    stats = {}
+    get_collections_data(g, collections, stats=stats)
+    assert stats['dijkstra runs'] == sum(len(cluster) for cluster in set().union(*collections))
+    for ((lower, upper), approx_degree), (exact, degree) in zip(get_collections_data(g, collections, approx=1),
+                                                                 get_collections_data(g, collections)):
+        assert lower <= exact <= upper and approx_degree == degree
+
+
+def test_get_collections_data_bounds():
+    g = generate_weighted_connected_graph(80, p=0.05)
+    cover = generate_cover(g, 30, max_cluster_size=10)
+    intervals = {}
+    get_collection_data(g, cover, intervals=intervals)
+    radii = ClusterRadii(intervals)
+    coarsenings = [max_cover(cover, k, rng=k, radii=radii) for k in (2, 4, 6)]
+    assert get_collections_data(g, coarsenings, bounds=radii.bounds) == get_collections_data(g, coarsenings)
@@ -0,0 +1,85 @@
+from utilities.util import generate_weighted_connected_graph, generate_cover
+from algorithm.max_cover import procedure_cover, max_cover
+from algorithm.validation import CoverValidationError, validate_procedure_cover, validate_max_cover
+import networkx as nx
+import pytest
+
+
+#############################################
+# CHECKERS ##################################
+#############################################
+
+
+# assert validate raises CoverValidationError of the violated property, with the expected violating clusters
+def check_violation(validate, cover_property, clusters=None):
+    with pytest.raises(CoverValidationError) as error:
+        validate()
+    assert error.value.cover_property == cover_property
+    assert isinstance(error.value, ValueError)
+    if clusters is not None:
+        assert set(error.value.clusters) == set(clusters)
+
+
+#############################################
+# TESTS #####################################
+#############################################
+
+
+def test_validate_valid_outputs():
+    for size in range(20, 101, 20):
+        g = generate_weighted_connected_graph(size, p=0.2)
+        cover = generate_cover(g, size, max_cluster_size=10)
+        for k in range(1, 6):
+            dr, dt = procedure_cover(cover, k, rng=k, validate=True)
+            validate_procedure_cover(cover, dr, dt, k, g)
+            t = max_cover(cover, k, rng=k, validate=True)
+            validate_max_cover(cover, t, k, g)
+            validate_max_cover(list(cover), t, k)
+
+
+def test_validate_procedure_cover_violations():
+    g = generate_weighted_connected_graph(60, p=0.1)
+    cover = generate_cover(g, 40, max_cluster_size=10)
+    dr, dt = procedure_cover(cover, 3, rng=0)
+
+    missing = max(dt, key=len)
+    uncovered = [cluster for cluster in dr if cluster <= missing]
+    with pytest.raises(CoverValidationError) as error:
+        validate_procedure_cover(cover, dr, dt - {missing}, 3)
+    assert error.value.cover_property == 'coarsening' and error.value.clusters[0] in uncovered
+
+    overlapping = frozenset(missing | {-1})
+    check_violation(lambda: validate_procedure_cover(cover, dr, dt | {overlapping}, 3), 'disjointness',
+                    [overlapping, missing])
+    check_violation(lambda: validate_procedure_cover(cover, dr | {frozenset([-1])}, dt, 3), 'subset',
+                    [frozenset([-1])])
+    check_violation(lambda: validate_procedure_cover(cover, set(), set(), 3), 'DR size', [])
+
+    # |DR| = 8^(2/3) = 4 is exactly on the bound, although it is rounded above it
+    singletons = [frozenset([v]) for v in range(8)]
+    validate_procedure_cover(singletons, singletons[:4], singletons[:4], 3)
+    check_violation(lambda: validate_procedure_cover(singletons, singletons[:3], singletons[:3], 3), 'DR size', [])
+
+
+def test_validate_max_cover_violations():
+    g = nx.path_graph(10)
+    nx.set_edge_attributes(g, 1, 'weight')
+    s = {frozenset([i, i + 1]) for i in range(9)}
+
+    check_violation(lambda: validate_max_cover(s, {frozenset(range(5))}, 2), 'coarsening')
+    # a single cluster of all nodes coarsens s, but its radius is 5 > (2k-1)*Rad(S) = 1
+    validate_max_cover(s, {frozenset(range(10))}, 1)
+    check_violation(lambda: validate_max_cover(s, {frozenset(range(10))}, 1, g), 'radius', [frozenset(range(10))])
+
+    # node 0 belongs to 5 clusters, more than 2k*|S|^(1/k) = 4
+    s = {frozenset([0]), frozenset([1])}
+    t = {frozenset(range(i)) for i in range(2, 7)}
+    validate_max_cover(s, t, 2)
+    check_violation(lambda: validate_max_cover(s, t, 1), 'degree', t)
+
+    # node 0 belongs to 24 clusters, exactly 2k*|S|^(1/k) = 6*64^(1/3), although it is rounded below it
+    s = {frozenset([i]) for i in range(64)}
+    t = {frozenset(range(i)) for i in range(41, 65)}
+    validate_max_cover(s, t, 3)
+    t.add(frozenset(range(40)))
+    check_violation(lambda: validate_max_cover(s, t, 3), 'degree', t)
@@ -0,0 +1,273 @@
+"""
+Cover generation for large graphs, over the graph's CSR arrays (see utilities.graph_arrays).
+
+Unlike generate_cover in utilities.util, the covered nodes are tracked incrementally,
+and once the requested number of clusters is reached, every new cluster is started from a node
+that is still uncovered, so the generation always terminates.
+Clusters are grown in batches, all clusters of a batch at once, over flat arrays of
+(cluster, node) pairs, where every pair is encoded as the single integer cluster * n + node.
+
+neighborhood_cover builds the r-neighborhood cover of a graph the same way, the ball of radius r around every node,
+emitting the balls of every batch as CSR arrays, so no frozenset is created until the cover is iterated.
+"""
+
+from hashlib import blake2b
+import numpy as np
+from utilities.graph_arrays import graph_arrays, neighbours_positions
+from utilities.storage import ClusterArrays
+
+COVER_MODES = ('random', 'ball')
+
+# number of clusters grown together
+CLUSTERS_BATCH = 4096
+
+# number of passes over the nodes, as random clusters centers, before giving up on the requested cover size
+RANDOM_COVER_PASSES = 10
+
+# number of neighborhoods grown together, bounds the memory to the pairs of that many balls and their edges
+NEIGHBORHOODS_BATCH = 1024
+
+
+def is_member(keys, sorted_keys):
+    """
+    :param keys: array of encoded (cluster, node) pairs
+    :param sorted_keys: sorted array of encoded (cluster, node) pairs
+    :return: boolean array, True for every pair of keys that is in sorted_keys
+    """
+    found = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[found] == keys
+
+
+def grow_random_clusters(arrays, centers, sizes, rng):
+    """
+    grows a random connected cluster from every center.
+    every iteration each cluster picks a random node from its frontier, i.e. the neighbours of its nodes,
+    where a node appears once for every cluster node it neighbours, with the weight 1/deg(cluster node).
+    so like in generate_random_cluster, which picks a random cluster node and then a random neighbour of it,
+    a node is picked with probability proportional to the sum of 1/deg(u) over the cluster nodes u it neighbours.
+    the frontier pairs are encoded together with the degree of the cluster node they neighbour,
+    and kept sorted, so the frontier of every cluster is a contiguous range of it.
+
+    :param arrays: GraphArrays of graph g
+    :param centers: array of node numbers to grow the clusters from
+    :param sizes: array of requested clusters sizes,
+                  a cluster is smaller if its center's connected component is smaller
+    :param rng: numpy random Generator
+    :return: sorted array of encoded (cluster, node) pairs of all clusters, cluster being the index in centers
+    """
+    n = len(arrays)
+    degrees = np.diff(arrays.indptr)
+    # frontier entries are encoded as (cluster * n + node) * radix + degree of the cluster node it neighbours
+    radix = int(degrees.max(initial=0)) + 1
+    members = np.sort(np.arange(len(centers)) * n + centers)
+    counts = np.ones(len(centers), dtype=np.int64)
+    owners, positions = neighbours_positions(arrays, centers)
+    frontier = np.sort((owners * n + arrays.indices[positions]) * radix + degrees[centers][owners])
+    while len(frontier):
+        rows = frontier // (n * radix)
+        lengths = np.bincount(rows, minlength=len(centers))
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        active = np.flatnonzero((counts < sizes) & (lengths > 0))
+        if not len(active):
+            break
+        cumulative = np.concatenate(([0], np.cumsum(1 / (frontier % radix))))
+        first, last = cumulative[starts[active]], cumulative[ends[active]]
+        targets = first + rng.random(len(active)) * (last - first)
+        # rounding may only push a target off its cluster's range
+        picks = np.clip(np.searchsorted(cumulative, targets, side='right') - 1, starts[active], ends[active] - 1)
+        picked = frontier[picks] // radix
+        frontier = np.delete(frontier, picks)
+        picked = picked[~is_member(picked, members)]
+        counts[picked // n] += 1
+        owners, positions = neighbours_positions(arrays, picked % n)
+        added = np.sort(((picked // n)[owners] * n + arrays.indices[positions]) * radix +
+                        degrees[picked % n][owners])
+        # both arrays are sorted, so the stable sort (timsort) only merges them
+        members = np.sort(np.concatenate((members, picked)), kind='stable')
+        frontier = np.sort(np.concatenate((frontier, added)), kind='stable')
+    return members
+
+
+def carve_balls(arrays, centers, sizes):
+    """
+    carves a ball around every center, i.e. the first nodes reached by a breadth first search from center,
+    the nodes of the last layer are taken by their order in the graph.
+
+    :param arrays: GraphArrays of graph g
+    :param centers: array of node numbers to carve the balls around
+    :param sizes: array of requested balls sizes,
+                  a ball is smaller if its center's connected component is smaller
+    :return: sorted array of encoded (ball, node) pairs of all balls, ball being the index in centers
+    """
+    n = len(arrays)
+    layer = np.arange(len(centers)) * n + centers
+    members = np.sort(layer)
+    counts = np.ones(len(centers), dtype=np.int64)
+    while len(layer):
+        owners, positions = neighbours_positions(arrays, layer % n)
+        reached = np.sort((layer // n)[owners] * n + arrays.indices[positions])
+        reached = reached[np.r_[True, reached[1:] != reached[:-1]]] if len(reached) else reached
+        reached = reached[~is_member(reached, members)]
+        rows = reached // n
+        ranks = np.arange(len(reached)) - np.searchsorted(rows, rows)
+        layer = reached[ranks < (sizes - counts)[rows]]
+        counts += np.bincount(layer // n, minlength=len(centers))
+        members = np.sort(np.concatenate((members, layer)), kind='stable')
+    return members
+
+
+def generate_large_cover(g, cover_size, min_cluster_size=0, max_cluster_size=0, mode='random', seed=None):
+    """
+    generates a cover with at least cover_size clusters (if possible), that covers all nodes in g.
+
+    clusters are grown from centers drawn from a random permutation of the nodes.
+    until there are cover_size clusters, the centers are taken in order,
+    and from then on only the centers that are still uncovered, so every new cluster covers a new node.
+    identical clusters are generated only once.
+
+    :param g: graph, or its GraphArrays
+    :param cover_size: size of requested cover
+    :param min_cluster_size: minimum nodes in a cluster
+    :param max_cluster_size: maximum nodes in a cluster
+    :param mode: 'random' grows clusters like generate_random_cluster,
+                 'ball' carves breadth first balls around the centers.
+                 in 'ball' mode every node is a center at most once, so it makes no retries,
+                 and the cover might be smaller than cover_size if there aren't enough different balls.
+                 in 'random' mode the nodes are passed over up to RANDOM_COVER_PASSES times.
+    :param seed: seed of the numpy random Generator, or a Generator
+    :return: a cover, i.e. a set of frozensets, each frozenset is a cluster of nodes
+    """
+    if mode not in COVER_MODES:
+        raise ValueError('unknown mode {}, expected one of {}'.format(mode, COVER_MODES))
+    arrays = graph_arrays(g)
+    rng = np.random.default_rng(seed)
+    n = len(arrays)
+    min_cluster_size = min_cluster_size if min_cluster_size != 0 else 1
+    max_cluster_size = max_cluster_size if max_cluster_size != 0 else n
+    clusters = set()
+    covered = np.zeros(n, dtype=bool)
+    uncovered = n
+    passes = RANDOM_COVER_PASSES if mode == 'random' else 1
+    for _ in range(passes):
+        order = rng.permutation(n)
+        sizes = rng.integers(min_cluster_size, max_cluster_size + 1, size=n)
+        position = 0
+        while position < n and (len(clusters) < cover_size or uncovered):
+            if len(clusters) < cover_size:
+                batch = np.arange(position, min(position + cover_size - len(clusters), position + CLUSTERS_BATCH, n))
+                position = batch[-1] + 1
+            else:
+                window = np.arange(position, min(position + 4 * CLUSTERS_BATCH, n))
+                batch = window[~covered[order[window]]][:CLUSTERS_BATCH]
+                position = batch[-1] + 1 if len(batch) == CLUSTERS_BATCH else window[-1] + 1
+                if not len(batch):
+                    continue
+            centers = order[batch]
+            if mode == 'random':
+                members = grow_random_clusters(arrays, centers, sizes[batch], rng)
+            else:
+                members = carve_balls(arrays, centers, sizes[batch])
+            nodes = members % n
+            bounds = np.searchsorted(members // n, np.arange(len(centers) + 1)).tolist()
+            nodes_list = nodes.tolist()
+            for start, end in zip(bounds, bounds[1:]):
+                clusters.add(arrays.labels(nodes_list[start:end]))
+            uncovered -= np.count_nonzero(~covered[nodes])
+            covered[nodes] = True
+        if len(clusters) >= cover_size and not uncovered:
+            break
+    return clusters
+
+
+def grow_neighborhoods(arrays, centers, r):
+    """
+    grows the ball of radius r around every center, i.e. the nodes within distance r from it,
+    by a Dijkstra from all centers at once that stops at distance r.
+    instead of settling one node at a time, every iteration relaxes the edges of all the pairs
+    whose distance was improved in the previous one, until no distance is improved,
+    so every iteration is a few array operations over all the balls of the batch.
+
+    :param arrays: GraphArrays of graph g
+    :param centers: array of node numbers to grow the balls around
+    :param r: radius of the balls
+    :return: sorted array of encoded (ball, node) pairs of all balls, ball being the index in centers
+    """
+    n = len(arrays)
+    members = np.arange(len(centers)) * n + centers
+    distances = np.zeros(len(centers))
+    frontier, frontier_distances = members, distances
+    while len(frontier):
+        owners, positions = neighbours_positions(arrays, frontier % n)
+        reached_distances = frontier_distances[owners] + arrays.weights[positions]
+        inside = reached_distances <= r
+        reached = ((frontier // n)[owners] * n + arrays.indices[positions])[inside]
+        reached_distances = reached_distances[inside]
+        if not len(reached):
+            break
+        # the shortest distance of every reached pair
+        order = np.argsort(reached)
+        reached, reached_distances = reached[order], reached_distances[order]
+        starts = np.flatnonzero(np.r_[True, reached[1:] != reached[:-1]])
+        reached, reached_distances = reached[starts], np.minimum.reduceat(reached_distances, starts)
+        found = np.minimum(np.searchsorted(members, reached), len(members) - 1)
+        new = members[found] != reached
+        improved = ~new & (reached_distances < distances[found])
+        distances[found[improved]] = reached_distances[improved]
+        frontier, frontier_distances = reached[new | improved], reached_distances[new | improved]
+        members = np.concatenate((members, reached[new]))
+        order = np.argsort(members, kind='stable')
+        members, distances = members[order], np.concatenate((distances, reached_distances[new]))[order]
+    return members
+
+
+def iter_neighborhoods(g, r, batch_size=NEIGHBORHOODS_BATCH):
+    """
+    generates the r-neighborhood cover of g in chunks, see neighborhood_cover.
+    only the digests of the balls emitted so far are kept, to skip balls identical to them.
+
+    :param g: graph, or its GraphArrays
+    :param r: radius of the balls
+    :param batch_size: number of balls grown together
+    :return: generator of ClusterArrays, of the different balls of every batch of centers
+    """
+    arrays = graph_arrays(g)
+    n = len(arrays)
+    labels = None if arrays.node_ids is None else np.asarray(arrays.nodes)
+    digests = set()
+    for start in range(0, n, batch_size):
+        centers = np.arange(start, min(start + batch_size, n))
+        members = grow_neighborhoods(arrays, centers, r)
+        nodes = members % n
+        bounds = np.searchsorted(members // n, np.arange(len(centers) + 1))
+        kept = np.zeros(len(centers), dtype=bool)
+        for i, (ball_start, ball_end) in enumerate(zip(bounds.tolist(), bounds[1:].tolist())):
+            digest = blake2b(nodes[ball_start:ball_end].tobytes(), digest_size=16).digest()
+            if digest not in digests:
+                digests.add(digest)
+                kept[i] = True
+        sizes = np.diff(bounds)
+        indptr = np.zeros(np.count_nonzero(kept) + 1, dtype=np.int64)
+        np.cumsum(sizes[kept], out=indptr[1:])
+        indices = nodes[np.repeat(kept, sizes)]
+        yield ClusterArrays(indptr, indices if labels is None else labels[indices])
+
+
+def neighborhood_cover(g, r, batch_size=NEIGHBORHOODS_BATCH):
+    """
+    builds the r-neighborhood cover of g, i.e. the ball of radius r around every node:
+    ball(v, r) = {w | dist(v, w) <= r}
+    identical balls are kept only once, and the balls are ordered by their centers.
+    the cover is kept as CSR arrays, which can be saved with utilities.storage.save_cover,
+    or passed to max_cover, which reads it into memory as frozensets (see algorithm.max_cover.iter_max_cover).
+
+    :param g: graph, or its GraphArrays
+    :param r: radius of the balls
+    :param batch_size: number of balls grown together, see iter_neighborhoods
+    :return: ClusterArrays of the cover
+    """
+    chunks = list(iter_neighborhoods(g, r, batch_size))
+    offsets = np.cumsum([0] + [chunk.indptr[-1] for chunk in chunks])
+    indptr = np.concatenate([[0]] + [chunk.indptr[1:] + offset for chunk, offset in zip(chunks, offsets)])
+    indices = np.concatenate([chunk.indices for chunk in chunks]) if chunks else np.zeros(0, dtype=np.int64)
+    return ClusterArrays(indptr.astype(np.int64), indices)
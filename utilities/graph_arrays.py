@@ -0,0 +1,140 @@
+"""
+Compressed sparse row (CSR) representation of a weighted graph.
+
+The nodes of the graph are numbered 0, ..., n-1 by their order in g.nodes(),
+and the neighbours of node i, and the weights of the edges to them, are
+indices[indptr[i]:indptr[i + 1]] and weights[indptr[i]:indptr[i + 1]].
+Every undirected edge appears in both directions.
+"""
+
+import numpy as np
+
+
+class GraphArrays:
+    """
+    A weighted undirected graph as CSR arrays.
+    """
+
+    def __init__(self, nodes, indptr, indices, weights):
+        """
+        :param nodes: the node labels, by their numbers
+        :param indptr: CSR index pointers, of length n+1
+        :param indices: CSR neighbours
+        :param weights: CSR edges weights
+        """
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._node_ids = None
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def node_ids(self):
+        """
+        :return: dictionary of node label -> node number,
+                 or None if the labels are the numbers themselves, i.e. nodes are 0, ..., n-1
+        """
+        if self._node_ids is None:
+            n = len(self)
+            if self.nodes == range(n) or (len(self.nodes) == n and all(v == i for i, v in enumerate(self.nodes))):
+                self._node_ids = False
+            else:
+                self._node_ids = {v: i for i, v in enumerate(self.nodes)}
+        return self._node_ids or None
+
+    def ids(self, cluster):
+        """
+        :param cluster: a cluster of nodes in the graph
+        :return: array of the cluster's node numbers
+        """
+        node_ids = self.node_ids
+        if node_ids is None:
+            return np.fromiter(cluster, dtype=np.int64, count=len(cluster))
+        return np.fromiter((node_ids[v] for v in cluster), dtype=np.int64, count=len(cluster))
+
+    def labels(self, ids):
+        """
+        :param ids: array, or list, of node numbers
+        :return: frozenset of the nodes labels
+        """
+        if isinstance(ids, np.ndarray):
+            ids = ids.tolist()
+        if self.node_ids is None:
+            return frozenset(ids)
+        return frozenset(self.nodes[i] for i in ids)
+
+
+def edges_to_graph_arrays(n, u, v, w, nodes=None):
+    """
+    :param n: number of nodes
+    :param u: array of edges first endpoints
+    :param v: array of edges second endpoints
+    :param w: array of edges weights
+    :param nodes: node labels, by default the nodes are labeled 0, ..., n-1
+    :return: GraphArrays of the undirected graph with the given edges
+    """
+    sources = np.concatenate((u, v)).astype(np.int64)
+    targets = np.concatenate((v, u)).astype(np.int64)
+    weights = np.concatenate((w, w)).astype(np.float64)
+    order = np.argsort(sources, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return GraphArrays(list(range(n)) if nodes is None else nodes, indptr, targets[order], weights[order])
+
+
+def graph_arrays(g, weight='weight'):
+    """
+    converts a networkx graph to GraphArrays.
+    a networkx graph may change at any time, so it is converted again on every call,
+    callers that measure many collections of the same graph convert it once, and pass its GraphArrays instead.
+
+    :param g: graph, or GraphArrays which is returned as is
+    :param weight: edges weights attribute, edges without it weigh 1 (like networkx shortest paths)
+    :return: GraphArrays of g
+    """
+    if isinstance(g, GraphArrays):
+        return g
+    nodes = list(g.nodes())
+    node_ids = {v: i for i, v in enumerate(nodes)}
+    m = g.number_of_edges()
+    u = np.empty(m, dtype=np.int64)
+    v = np.empty(m, dtype=np.int64)
+    w = np.empty(m, dtype=np.float64)
+    for i, (a, b, d) in enumerate(g.edges(data=True)):
+        u[i], v[i], w[i] = node_ids[a], node_ids[b], d.get(weight, 1)
+    return edges_to_graph_arrays(len(nodes), u, v, w, nodes)
+
+
+def neighbours_positions(arrays, ids):
+    """
+    :param arrays: GraphArrays
+    :param ids: array of node numbers
+    :return: arrays (owners, positions), where arrays.indices[positions] are the neighbours of all nodes in ids,
+             and ids[owners] the node each of them neighbours
+    """
+    starts = arrays.indptr[ids]
+    lengths = arrays.indptr[ids + 1] - starts
+    owners = np.repeat(np.arange(len(ids)), lengths)
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(len(owners))
+    return owners, positions
+
+
+def induced_graph_arrays(arrays, ids):
+    """
+    :param arrays: GraphArrays
+    :param ids: array of node numbers
+    :return: CSR arrays (indptr, indices, weights) of the graph induced by ids,
+             with its nodes numbered by their position in ids
+    """
+    order = np.argsort(ids)
+    sorted_ids = ids[order]
+    rows, positions = neighbours_positions(arrays, ids)
+    neighbours = arrays.indices[positions]
+    found = np.minimum(np.searchsorted(sorted_ids, neighbours), max(len(ids) - 1, 0))
+    inside = sorted_ids[found] == neighbours if len(ids) else np.zeros(0, dtype=bool)
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[inside], minlength=len(ids)), out=indptr[1:])
+    return indptr, order[found[inside]], arrays.weights[positions[inside]]
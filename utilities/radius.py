@@ -0,0 +1,472 @@
+"""
+Radius engine over the CSR arrays of a graph (see utilities.graph_arrays).
+
+Instead of a networkx Dijkstra per node of a cluster, every cluster's induced graph is extracted
+from the graph's arrays, and its eccentricities are computed by scipy's compiled Dijkstra,
+from batches of sources at once.
+"""
+
+import heapq
+import weakref
+from hashlib import blake2b
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+    from scipy.sparse import csgraph
+except ImportError:
+    sp = csgraph = None
+
+from utilities.graph_arrays import GraphArrays, graph_arrays, induced_graph_arrays
+from utilities.shared_arrays import SharedArrays, attach_arrays
+
+# number of Dijkstra sources computed together, bounds the distances matrix to SOURCES_BATCH x |cluster|
+SOURCES_BATCH = 256
+
+# default maximum number of clusters radii kept by a RadiusCache
+RADIUS_CACHE_SIZE = 100000
+
+# radius caches of graphs, kept for as long as the graph itself exists, with the fingerprint of a networkx graph
+_GRAPHS_CACHES = weakref.WeakKeyDictionary()
+
+# collections with fewer nodes, in the clusters that are not cached, are measured serially even with workers,
+# since starting the worker processes would take longer than measuring them
+PARALLEL_MIN_NODES = 20000
+
+# number of clusters chunks for every worker, more chunks balance the load better, but cost more messages
+CHUNKS_PER_WORKER = 4
+
+# default number of Dijkstra runs per cluster of the approximate radius, see approx_collection_radius
+APPROX_SOURCES = 2
+
+# the graph arrays attached by a radius worker process, see attach_shared_arrays
+_WORKER_GRAPH = None
+
+
+class RadiusCache:
+    """
+    Least recently used cache of the radii of clusters in one graph, keyed by the clusters.
+    """
+
+    def __init__(self, maxsize=RADIUS_CACHE_SIZE):
+        """
+        :param maxsize: maximum number of radii kept, the least recently used are evicted first
+        """
+        self.maxsize = maxsize
+        self.radii = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.radii)
+
+    def get(self, cluster):
+        """
+        :param cluster: a cluster
+        :return: the cached radius of cluster, or None if it is not cached
+        """
+        cluster_radius = self.radii.get(cluster)
+        if cluster_radius is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.radii.move_to_end(cluster)
+        return cluster_radius
+
+    def put(self, cluster, cluster_radius):
+        """
+        :param cluster: a cluster
+        :param cluster_radius: its radius
+        :return: None
+        """
+        self.radii[cluster] = cluster_radius
+        self.radii.move_to_end(cluster)
+        while len(self.radii) > self.maxsize:
+            self.radii.popitem(last=False)
+
+    def clear(self):
+        self.radii.clear()
+
+
+def graph_fingerprint(arrays):
+    """
+    :param arrays: GraphArrays
+    :return: digest of the nodes, edges and weights of the graph
+    """
+    digest = blake2b(repr(list(arrays.nodes)).encode())
+    for array in (arrays.indptr, arrays.indices, arrays.weights):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.digest()
+
+
+def radius_cache(g, arrays=None):
+    """
+    :param g: graph, or its GraphArrays
+    :param arrays: graph_arrays(g), if it was already converted
+    :return: the RadiusCache of g, created on first use and dropped by invalidate_radius_cache(g).
+             a networkx graph may change at any time, so its cache is kept together with its fingerprint,
+             and it is dropped as soon as the fingerprint changes
+    """
+    fingerprint = None
+    if not isinstance(g, GraphArrays):
+        fingerprint = graph_fingerprint(arrays if arrays is not None else graph_arrays(g))
+    entry = _GRAPHS_CACHES.get(g)
+    if entry is None or entry[0] != fingerprint:
+        entry = _GRAPHS_CACHES[g] = fingerprint, RadiusCache()
+    return entry[1]
+
+
+def invalidate_radius_cache(g):
+    """
+    drops the RadiusCache of g, the cache of a networkx graph is also dropped when radius_cache(g) finds it changed
+    :param g: graph
+    :return: None
+    """
+    _GRAPHS_CACHES.pop(g, None)
+
+
+def induced_matrix(arrays, cluster=None, ids=None):
+    """
+    :param arrays: GraphArrays of a graph g
+    :param cluster: a cluster in g
+    :param ids: array of the cluster's node numbers, instead of cluster
+    :return: the adjacency matrix of the graph induced by cluster in g, as a scipy CSR matrix
+    """
+    if ids is None:
+        ids = arrays.ids(cluster)
+    indptr, indices, weights = induced_graph_arrays(arrays, ids)
+    return sp.csr_matrix((weights, indices, indptr), shape=(len(ids), len(ids)))
+
+
+def eccentricities(matrix, sources=None):
+    """
+    calculates the eccentricity of each source in the graph, i.e. its node radius:
+    Rad(v, g) = max(dist(v, w) | for every w reachable from v in g)
+
+    :param matrix: adjacency matrix of a graph, as a scipy CSR matrix
+    :param sources: array of nodes, all nodes by default
+    :return: array of the sources eccentricities
+    """
+    if sources is None:
+        sources = np.arange(matrix.shape[0])
+    radii = np.empty(len(sources))
+    for start in range(0, len(sources), SOURCES_BATCH):
+        batch = sources[start:start + SOURCES_BATCH]
+        distances = csgraph.dijkstra(matrix, indices=batch)
+        distances[np.isinf(distances)] = 0
+        radii[start:start + len(batch)] = distances.max(axis=1)
+    return radii
+
+
+def matrix_radius(matrix):
+    """
+    :param matrix: adjacency matrix of a graph, as a scipy CSR matrix
+    :return: radius of the graph, i.e. the minimum of all its nodes eccentricities
+    """
+    return eccentricities(matrix).min()
+
+
+def bounded_matrix_radius(matrix):
+    """
+    calculates the radius of a graph exactly, without running Dijkstra from all of its nodes,
+    see matrix_radius_bounds
+
+    :param matrix: adjacency matrix of a graph, as a scipy CSR matrix
+    :return: radius of the graph, and the number of Dijkstra runs it took
+    """
+    _, radius, runs = matrix_radius_bounds(matrix)
+    return radius, runs
+
+
+def matrix_radius_bounds(matrix, max_runs=None):
+    """
+    bounds the radius of a graph by keeping lower and upper bounds on the eccentricity of every node
+    (Takes & Kosters bounding), running Dijkstra until the radius is certified, or max_runs Dijkstra runs were made.
+
+    a Dijkstra from v gives ecc(v), and for every w in v's connected component:
+        max(dist(v, w), ecc(v) - dist(v, w)) <= ecc(w) <= ecc(v) + dist(v, w)
+    sources alternate between the candidate with the smallest lower bound, which is likely to be a center,
+    and the node with the largest upper bound, which is likely to be peripheral and so tightens the lower bounds.
+    every node whose lower bound reaches the best eccentricity found so far is ruled out,
+    and the radius is certified once no candidates are left.
+    a Dijkstra from a candidate is limited to the best eccentricity so far, since a farther node proves it is larger,
+    and also rules out every node that is farther than it from the candidate.
+
+    the radius is always between the smallest lower bound of the remaining candidates and the best eccentricity,
+    so the first Dijkstra alone, from any node v, already bounds it between ecc(v)/2 and ecc(v) in a connected graph.
+
+    :param matrix: adjacency matrix of a graph, as a scipy CSR matrix
+    :param max_runs: maximum number of Dijkstra runs, unlimited by default
+    :return: lower and upper bounds of the radius of the graph, which are equal once it is certified,
+             and the number of Dijkstra runs it took
+    """
+    n = matrix.shape[0]
+    _, components = csgraph.connected_components(matrix, directed=False)
+    degrees = np.diff(matrix.indptr)
+    lower = np.zeros(n)
+    upper = np.full(n, np.inf)
+    candidates = np.ones(n, dtype=bool)
+    sources = np.zeros(n, dtype=bool)
+    best = np.inf
+    runs = 0
+    while True:
+        remaining = np.flatnonzero(candidates & (lower < best))
+        if not len(remaining):
+            return best, best, runs
+        if runs == max_runs:
+            return lower[remaining].min(), best, runs
+        if runs % 2:
+            others = np.flatnonzero(~sources)
+            v = others[np.lexsort((degrees[others], upper[others]))[-1]]
+            limit = np.inf
+        else:
+            v = remaining[np.lexsort((-degrees[remaining], upper[remaining], lower[remaining]))[0]]
+            limit = best
+        candidates[v] = False
+        sources[v] = True
+        distances = csgraph.dijkstra(matrix, indices=v, limit=limit)
+        runs += 1
+        component = np.flatnonzero(components == components[v])
+        distances = distances[component]
+        reached = np.isfinite(distances)
+        if reached.all():
+            eccentricity = distances.max()
+            best = min(best, eccentricity)
+            lower[component] = np.maximum(lower[component], np.maximum(distances, eccentricity - distances))
+            upper[component] = np.minimum(upper[component], eccentricity + distances)
+        else:
+            lower[component[~reached]] = np.inf
+            lower[component[reached]] = np.maximum(lower[component[reached]], distances[reached])
+
+
+def cluster_radius(g, cluster, bounded=False):
+    """
+    :param g: graph, or its GraphArrays
+    :param cluster: a cluster in g
+    :param bounded: use bounded_matrix_radius instead of all the nodes eccentricities
+    :return: radius of the graph induced by cluster in g
+    """
+    matrix = induced_matrix(graph_arrays(g), cluster)
+    return bounded_matrix_radius(matrix)[0] if bounded else matrix_radius(matrix)
+
+
+def cluster_radius_bounds(g, cluster, max_runs=APPROX_SOURCES):
+    """
+    :param g: graph, or its GraphArrays
+    :param cluster: a cluster in g
+    :param max_runs: maximum number of Dijkstra runs
+    :return: lower and upper bounds of the radius of the graph induced by cluster in g (see matrix_radius_bounds)
+    """
+    lower, upper, _ = matrix_radius_bounds(induced_matrix(graph_arrays(g), cluster), max_runs)
+    return lower, upper
+
+
+def ids_radius(arrays, ids, bounded=False):
+    """
+    :param arrays: GraphArrays of a graph g
+    :param ids: array of the node numbers of a cluster in g
+    :param bounded: use bounded_matrix_radius instead of all the nodes eccentricities
+    :return: radius of the graph induced by the cluster in g, and the number of Dijkstra runs it took
+    """
+    matrix = induced_matrix(arrays, ids=ids)
+    if bounded:
+        return bounded_matrix_radius(matrix)
+    return matrix_radius(matrix), matrix.shape[0]
+
+
+def attach_shared_arrays(spec):
+    """
+    initializer of a radius worker process, attaches to the shared graph arrays
+    :param spec: SharedArrays.spec of the graph arrays indptr, indices and weights
+    :return: None
+    """
+    global _WORKER_GRAPH
+    memories, (indptr, indices, weights) = attach_arrays(spec)
+    # the memories are kept with the arrays, so their buffers stay open
+    _WORKER_GRAPH = GraphArrays(range(len(indptr) - 1), indptr, indices, weights), memories
+
+
+def chunk_radii(bounded, chunk):
+    """
+    radius worker task, measures a chunk of clusters over the attached graph arrays
+    :param bounded: use bounded_matrix_radius instead of all the nodes eccentricities
+    :param chunk: list of arrays of the clusters node numbers
+    :return: list of the clusters (radius, Dijkstra runs)
+    """
+    arrays, _ = _WORKER_GRAPH
+    return [ids_radius(arrays, ids, bounded) for ids in chunk]
+
+
+def balanced_chunks(sizes, num_of_chunks):
+    """
+    splits clusters into chunks of about the same total cost,
+    estimated as size^2 for a cluster (a Dijkstra run from each of its nodes).
+    the clusters are assigned from the most expensive one, each to the chunk of the lowest cost so far.
+
+    :param sizes: list of the clusters sizes
+    :param num_of_chunks: maximum number of chunks
+    :return: list of chunks, each a list of clusters indices
+    """
+    chunks = [[] for _ in range(min(num_of_chunks, len(sizes)))]
+    costs = [(0, i) for i in range(len(chunks))]
+    for index in sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True):
+        cost, i = heapq.heappop(costs)
+        chunks[i].append(index)
+        heapq.heappush(costs, (cost + sizes[index] ** 2, i))
+    return [chunk for chunk in chunks if chunk]
+
+
+def parallel_radii(arrays, clusters_ids, bounded, workers):
+    """
+    measures clusters on a pool of worker processes, which share the graph arrays (see utilities.shared_arrays)
+    :param arrays: GraphArrays of a graph g
+    :param clusters_ids: list of arrays of the clusters node numbers
+    :param bounded: use bounded_matrix_radius instead of all the nodes eccentricities
+    :param workers: number of worker processes
+    :return: list of the clusters (radius, Dijkstra runs), in the order of clusters_ids
+    """
+    chunks = balanced_chunks([len(ids) for ids in clusters_ids], workers * CHUNKS_PER_WORKER)
+    results = [None] * len(clusters_ids)
+    with SharedArrays([arrays.indptr, arrays.indices, arrays.weights]) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_shared_arrays,
+                                 initargs=(shared.spec,)) as executor:
+            chunks_results = executor.map(partial(chunk_radii, bounded),
+                                          [[clusters_ids[i] for i in chunk] for chunk in chunks])
+            for chunk, chunk_results in zip(chunks, chunks_results):
+                for i, result in zip(chunk, chunk_results):
+                    results[i] = result
+    return results
+
+
+def collection_radius(g, collection, bounded=False, stats=None, cache=None, workers=1, intervals=None):
+    """
+    :param g: graph, or its GraphArrays
+    :param collection: a collection of clusters in g
+    :param bounded: use bounded_matrix_radius instead of all the nodes eccentricities
+    :param stats: optional dictionary, 'dijkstra runs' and 'dijkstra saved' (compared to a run from every node)
+                  are added to it
+    :param cache: optional RadiusCache of g, or True for radius_cache(g)
+    :param workers: number of worker processes the clusters are measured on (see parallel_radii),
+                    the clusters are measured serially if it is 1,
+                    or if the clusters that are not cached have less than PARALLEL_MIN_NODES nodes in total
+    :param intervals: optional dictionary, the radius of every cluster is stored in it, as its (lower, upper) bounds
+    :return: radius of collection, i.e. the maximum of its clusters radii
+    """
+    arrays = graph_arrays(g)
+    if cache is True:
+        cache = radius_cache(g, arrays)
+    radii = []
+
+    def uncached_clusters():
+        for cluster in collection:
+            cluster_radius = cache.get(cluster) if cache is not None else None
+            if cluster_radius is None:
+                yield cluster, arrays.ids(cluster)
+            else:
+                radii.append(cluster_radius)
+                if intervals is not None:
+                    intervals[cluster] = cluster_radius, cluster_radius
+
+    # serially, the clusters are measured while the collection is iterated, without keeping all of them in memory
+    clusters = uncached_clusters()
+    results = None
+    if workers > 1:
+        clusters = list(clusters)
+        if sum(len(ids) for _, ids in clusters) >= PARALLEL_MIN_NODES:
+            results = parallel_radii(arrays, [ids for _, ids in clusters], bounded, workers)
+    runs = saved = 0
+    for i, (cluster, ids) in enumerate(clusters):
+        cluster_radius, cluster_runs = ids_radius(arrays, ids, bounded) if results is None else results[i]
+        runs += cluster_runs
+        saved += len(ids) - cluster_runs
+        if cache is not None:
+            cache.put(cluster, cluster_radius)
+        if intervals is not None:
+            intervals[cluster] = cluster_radius, cluster_radius
+        radii.append(cluster_radius)
+    if stats is not None:
+        stats['dijkstra runs'] = stats.get('dijkstra runs', 0) + runs
+        stats['dijkstra saved'] = stats.get('dijkstra saved', 0) + saved
+    return max(radii)
+
+
+def approx_collection_radius(g, collection, sources=APPROX_SOURCES, stats=None, cache=None, intervals=None,
+                             bounds=None, exact=False):
+    """
+    bounds the radius of collection, i.e. the maximum of its clusters radii,
+    bounding every cluster's radius with at most sources Dijkstra runs (see matrix_radius_bounds).
+
+    the collection radius is then between the largest lower bound and the largest upper bound of the clusters,
+    and the cluster of the largest upper bound is refined, i.e. its radius is calculated exactly,
+    as long as its interval overlaps the interval of another cluster.
+    so clusters are refined only when they compete for the maximum,
+    and the returned interval is the interval of the single cluster whose radius is the collection radius.
+
+    :param g: graph, or its GraphArrays
+    :param collection: a collection of clusters in g
+    :param sources: maximum number of Dijkstra runs of a cluster before it is refined
+    :param stats: optional dictionary, 'dijkstra runs' and 'exact refinements' are added to it
+    :param cache: optional RadiusCache of g, or True for radius_cache(g).
+                  cached radii are used as exact intervals, and refined radii are stored in it
+    :param intervals: optional dictionary, the interval (lower, upper) of every cluster is stored in it
+    :param bounds: optional dictionary of cluster -> (lower, upper) known bounds of its radius,
+                   e.g. algorithm.cover_radii.ClusterRadii.bounds of a max_cover output.
+                   Dijkstra is not run for clusters whose known radius is exact,
+                   or whose known upper bound is below the largest lower bound so far,
+                   and the known bounds of the other clusters are intersected with their Dijkstra bounds
+    :param exact: refine the cluster of the largest upper bound until its radius is exact as well,
+                  so the returned bounds are both the exact radius of collection
+    :return: lower and upper bounds of the radius of collection
+    """
+    arrays = graph_arrays(g)
+    if cache is True:
+        cache = radius_cache(g, arrays)
+    # only clusters whose upper bound is above the largest lower bound so far may be refined, so only they are kept
+    clusters, lowers, uppers = [], [], []
+    max_lower = -np.inf
+    runs = refinements = 0
+    for cluster in collection:
+        cluster_radius = cache.get(cluster) if cache is not None else None
+        known = bounds.get(cluster) if bounds is not None else None
+        if cluster_radius is not None:
+            lower = upper = cluster_radius
+        elif known is not None and (known[0] == known[1] or known[1] < max_lower):
+            lower, upper = known
+        else:
+            lower, upper, cluster_runs = matrix_radius_bounds(induced_matrix(arrays, cluster), sources)
+            runs += cluster_runs
+            if known is not None:
+                lower, upper = max(lower, known[0]), min(upper, known[1])
+            if cache is not None and lower == upper:
+                cache.put(cluster, upper)
+        if intervals is not None:
+            intervals[cluster] = lower, upper
+        max_lower = max(max_lower, lower)
+        if upper >= max_lower:
+            clusters.append(cluster)
+            lowers.append(lower)
+            uppers.append(upper)
+
+    heap = [(-upper, i) for i, upper in enumerate(uppers) if upper >= max_lower]
+    heapq.heapify(heap)
+    while True:
+        _, top = heapq.heappop(heap)
+        certified = not heap or lowers[top] >= -heap[0][0]
+        if certified and (not exact or lowers[top] == uppers[top]):
+            break
+        cluster_radius, cluster_runs = ids_radius(arrays, arrays.ids(clusters[top]), bounded=True)
+        runs += cluster_runs
+        refinements += 1
+        lowers[top] = uppers[top] = cluster_radius
+        if cache is not None:
+            cache.put(clusters[top], cluster_radius)
+        if intervals is not None:
+            intervals[clusters[top]] = cluster_radius, cluster_radius
+        heapq.heappush(heap, (-cluster_radius, top))
+    if stats is not None:
+        stats['dijkstra runs'] = stats.get('dijkstra runs', 0) + runs
+        stats['exact refinements'] = stats.get('exact refinements', 0) + refinements
+    return lowers[top], uppers[top]
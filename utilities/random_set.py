@@ -0,0 +1,109 @@
+"""
+A set with O(1) uniform random picks, used wherever a random element of a changing set is chosen,
+instead of copying the set to a list for every choice.
+"""
+
+import numpy as np
+
+
+def as_generator(rng=None):
+    """
+    :param rng: numpy random Generator, a seed for one, or None
+    :return: rng itself if it is a Generator, otherwise a new numpy random Generator.
+             for None, it is seeded from numpy's global random state,
+             so runs are still reproducible by np.random.seed
+    """
+    if rng is None:
+        return np.random.default_rng(np.random.randint(2 ** 31))
+    return np.random.default_rng(rng)
+
+
+def random_index(rng, n):
+    """
+    :param rng: numpy random Generator
+    :param n: positive integer
+    :return: a uniformly random integer in 0, ..., n-1
+    """
+    return int(rng.random() * n)
+
+
+class RandomSet:
+    """
+    A set of hashable items, kept as a list of the items and a dictionary of item -> its position in the list.
+    An item is removed by moving the last item of the list to its position,
+    so adding, removing and picking a random item are all O(1).
+    """
+
+    def __init__(self, items=(), rng=None):
+        """
+        :param items: initial items, positioned by their iteration order
+        :param rng: numpy random Generator used by pick, see as_generator
+        """
+        self.items = []
+        self.positions = {}
+        self.rng = as_generator(rng)
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def copy(self):
+        """
+        :return: an independent copy of the set, with the items in the same positions, sharing the same Generator
+        """
+        random_set = RandomSet.__new__(RandomSet)
+        random_set.items = list(self.items)
+        random_set.positions = dict(self.positions)
+        random_set.rng = self.rng
+        return random_set
+
+    def add(self, item):
+        """
+        :param item: an item, added if it is not in the set
+        :return: None
+        """
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        """
+        :param item: an item, removed if it is in the set
+        :return: None
+        """
+        position = self.positions.pop(item, None)
+        if position is None:
+            return
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.positions[last] = position
+
+    def __isub__(self, items):
+        """
+        removes all of items from the set.
+        they are removed from the last position to the first,
+        so the positions of the remaining items don't depend on the iteration order of items.
+        :param items: a collection of items
+        :return: the set
+        """
+        positions = sorted((self.positions[item] for item in items if item in self.positions), reverse=True)
+        for position in positions:
+            self.discard(self.items[position])
+        return self
+
+    def pick(self):
+        """
+        :return: a uniformly random item of the set
+        """
+        return self.items[random_index(self.rng, len(self.items))]
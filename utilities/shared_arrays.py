@@ -0,0 +1,55 @@
+"""
+NumPy arrays in shared memory blocks, for worker processes to read without receiving copies of them.
+
+The parent process copies the arrays once into a SharedArrays, and passes its spec to the workers,
+which attach to the blocks by their names (see attach_arrays).
+"""
+
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedArrays:
+    """
+    Copies of arrays in shared memory blocks, freed when the context is exited.
+    """
+
+    def __init__(self, arrays):
+        """
+        :param arrays: list of arrays
+        """
+        self.memories = []
+        self.arrays = []
+        self.spec = []
+        for array in arrays:
+            memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+            shared[:] = array
+            self.memories.append(memory)
+            self.arrays.append(shared)
+            self.spec.append((memory.name, array.shape, array.dtype.str))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # the arrays are views of the memories buffers, which can't be closed while they exist,
+        # unlinked memories are freed anyway once they are no longer mapped
+        self.arrays = []
+        for memory in self.memories:
+            try:
+                memory.close()
+            except BufferError:
+                pass
+            memory.unlink()
+
+
+def attach_arrays(spec):
+    """
+    :param spec: SharedArrays.spec
+    :return: the shared memory blocks, and the arrays over them.
+             the blocks must be kept for as long as the arrays are used
+    """
+    memories = [shared_memory.SharedMemory(name=name) for name, _, _ in spec]
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=memory.buf) for memory, (_, shape, dtype) in zip(memories, spec)]
+    return memories, arrays
@@ -0,0 +1,175 @@
+"""
+On-disk format of graphs and covers.
+
+Both are stored as a directory of .npy files:
+    graph - the CSR arrays of the graph (see utilities.graph_arrays): indptr.npy, indices.npy and weights.npy,
+            and nodes.npy with the node labels, unless the nodes are 0, ..., n-1
+    cover - the CSR arrays of its clusters: indptr.npy and indices.npy,
+            where cluster i is the nodes indices[indptr[i]:indptr[i + 1]]
+Node labels must be integers.
+
+The files are loaded as read only memory maps, so nothing is copied into memory until it is used.
+"""
+
+import os
+import shutil
+import tempfile
+import numpy as np
+from utilities.graph_arrays import GraphArrays, graph_arrays
+
+GRAPH_FILES = ('indptr', 'indices', 'weights')
+COVER_FILES = ('indptr', 'indices')
+
+# number of clusters read together while iterating over ClusterArrays
+CLUSTERS_CHUNK = 4096
+
+
+class ClusterArrays:
+    """
+    A collection of clusters as CSR arrays, usually memory maps of a stored cover.
+    Iterating over it gives its clusters as frozensets, one chunk of clusters at a time,
+    so it can be used wherever a collection of clusters is expected.
+    """
+
+    def __init__(self, indptr, indices):
+        """
+        :param indptr: CSR index pointers, of length (number of clusters)+1
+        :param indices: CSR clusters nodes
+        """
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __iter__(self):
+        for start in range(0, len(self), CLUSTERS_CHUNK):
+            bounds = np.asarray(self.indptr[start:start + CLUSTERS_CHUNK + 1])
+            nodes = np.asarray(self.indices[bounds[0]:bounds[-1]]).tolist()
+            bounds = (bounds - bounds[0]).tolist()
+            for cluster_start, cluster_end in zip(bounds, bounds[1:]):
+                yield frozenset(nodes[cluster_start:cluster_end])
+
+    def cluster(self, i):
+        """
+        :param i: cluster number
+        :return: cluster i, as a frozenset
+        """
+        return frozenset(np.asarray(self.indices[self.indptr[i]:self.indptr[i + 1]]).tolist())
+
+    def nodes_degrees(self):
+        """
+        :return: array of the degree of every node label 0, ..., max label (see calculate_node_degree_in_collection)
+        """
+        return np.bincount(self.indices)
+
+
+def _save_arrays(path, arrays, overwrite=True):
+    """
+    saves arrays as .npy files in directory path, through a temporary directory,
+    so an interrupted save never leaves a partial directory at path
+    :param path: directory path
+    :param arrays: dictionary of file name -> array
+    :param overwrite: replace path if it exists, otherwise keep it
+                      (e.g. when another process has just saved the same data there)
+    :return: None
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    temporary_path = tempfile.mkdtemp(prefix=os.path.basename(path) + '.', dir=parent)
+    for name, array in arrays.items():
+        np.save(os.path.join(temporary_path, name + '.npy'), array)
+    if overwrite:
+        shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.rename(temporary_path, path)
+    except OSError:
+        shutil.rmtree(temporary_path)
+        if overwrite:
+            raise
+
+
+def _load_array(path, name):
+    return np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+
+
+def save_graph(path, g, overwrite=True):
+    """
+    :param path: directory path
+    :param g: graph, or its GraphArrays
+    :param overwrite: replace path if it exists, otherwise keep it
+    :return: None
+    """
+    arrays = graph_arrays(g)
+    files = {name: getattr(arrays, name) for name in GRAPH_FILES}
+    if arrays.node_ids is not None:
+        files['nodes'] = np.array(arrays.nodes, dtype=np.int64)
+    _save_arrays(path, files, overwrite)
+
+
+def load_graph(path):
+    """
+    :param path: directory path of a graph saved by save_graph
+    :return: GraphArrays of the graph, over read only memory maps of the files
+    """
+    indptr, indices, weights = (_load_array(path, name) for name in GRAPH_FILES)
+    if os.path.exists(os.path.join(path, 'nodes.npy')):
+        nodes = _load_array(path, 'nodes').tolist()
+    else:
+        nodes = range(len(indptr) - 1)
+    return GraphArrays(nodes, indptr, indices, weights)
+
+
+def save_cover(path, cover, overwrite=True):
+    """
+    :param path: directory path
+    :param cover: a collection of clusters, the clusters are saved in its iteration order,
+                  ClusterArrays are saved as they are, without creating their clusters
+    :param overwrite: replace path if it exists, otherwise keep it
+    :return: None
+    """
+    if isinstance(cover, ClusterArrays):
+        _save_arrays(path, {'indptr': np.asarray(cover.indptr, dtype=np.int64),
+                            'indices': np.asarray(cover.indices, dtype=np.int64)}, overwrite)
+        return
+    clusters = list(cover)
+    indptr = np.zeros(len(clusters) + 1, dtype=np.int64)
+    np.cumsum([len(cluster) for cluster in clusters], out=indptr[1:])
+    indices = np.fromiter((v for cluster in clusters for v in sorted(cluster)), dtype=np.int64, count=indptr[-1])
+    _save_arrays(path, {'indptr': indptr, 'indices': indices}, overwrite)
+
+
+def load_cover(path):
+    """
+    :param path: directory path of a cover saved by save_cover
+    :return: ClusterArrays of the cover, over read only memory maps of the files
+    """
+    return ClusterArrays(*(_load_array(path, name) for name in COVER_FILES))
+
+
+def stored_graph(path, generate):
+    """
+    :param path: directory path, or None
+    :param generate: function that generates the graph
+    :return: the graph generated by generate if path is None,
+             otherwise the graph loaded from path, generated and saved there only if it does not exist yet
+    """
+    if path is None:
+        return generate()
+    if not os.path.isdir(path):
+        save_graph(path, generate(), overwrite=False)
+    return load_graph(path)
+
+
+def stored_cover(path, generate):
+    """
+    :param path: directory path, or None
+    :param generate: function that generates the cover
+    :return: the cover generated by generate if path is None,
+             otherwise the cover loaded from path, generated and saved there only if it does not exist yet
+    """
+    if path is None:
+        return generate()
+    if not os.path.isdir(path):
+        save_cover(path, generate(), overwrite=False)
+    return load_cover(path)
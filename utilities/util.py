@@ -1,9 +1,12 @@
+from collections import Counter
+from time import perf_counter
 import networkx as nx
 import numpy as np
 import matplotlib.pyplot as plt
-
-GRAPH_GENERATION_TRIES = 1000000
-PROBABILITY_STEP = 0.01
+from utilities.graph_arrays import edges_to_graph_arrays, graph_arrays
+from utilities import radius
+from utilities.storage import ClusterArrays
+from utilities.random_set import RandomSet, as_generator, random_index
 
 
 def draw_graph(g):
@@ -24,21 +27,114 @@ def generate_graph(n, p=0.5):
     return nx.fast_gnp_random_graph(n, p, seed)
 
 
+def pairs_to_edges(pairs):
+    """
+    every pair of nodes u < v is numbered by v*(v-1)/2 + u, i.e. all pairs ordered by v and then by u
+
+    :param pairs: array of pairs numbers
+    :return: arrays (u, v) of the pairs endpoints
+    """
+    v = ((1 + np.sqrt(1 + 8 * pairs.astype(np.float64))) / 2).astype(np.int64)
+    # fixes the float rounding of the square root for very large pairs numbers
+    v -= v * (v - 1) // 2 > pairs
+    v += (v + 1) * v // 2 <= pairs
+    return pairs - v * (v - 1) // 2, v
+
+
+def random_spanning_tree_pairs(n):
+    """
+    generates a random tree on n nodes, in which every node, in a random order, is attached to a random earlier node
+
+    :param n: number of nodes
+    :return: array of the tree edges, as pairs numbers (see pairs_to_edges)
+    """
+    order = np.random.permutation(n)
+    parents = order[(np.random.random(n - 1) * np.arange(1, n)).astype(np.int64)]
+    u, v = np.minimum(order[1:], parents), np.maximum(order[1:], parents)
+    return v * (v - 1) // 2 + u
+
+
+def gnp_pairs(n, p):
+    """
+    samples the edges of an Erdős–Rényi graph G(n, p), by geometric skipping over the n*(n-1)/2 pairs of nodes:
+    the gaps between consecutive chosen pairs are geometrically distributed,
+    so they are drawn directly, in batches, instead of drawing every pair
+
+    :param n: number of nodes
+    :param p: probability for edge existence
+    :return: sorted array of the chosen pairs numbers (see pairs_to_edges)
+    """
+    num_of_pairs = n * (n - 1) // 2
+    if p <= 0 or num_of_pairs == 0:
+        return np.zeros(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(num_of_pairs, dtype=np.int64)
+    batches = []
+    last = -1
+    while last < num_of_pairs:
+        expected = (num_of_pairs - last) * p
+        skips = np.random.geometric(p, size=int(expected + 4 * np.sqrt(expected)) + 16)
+        pairs = last + np.cumsum(skips)
+        batches.append(pairs)
+        last = pairs[-1]
+    pairs = np.concatenate(batches)
+    return pairs[pairs < num_of_pairs]
+
+
+def generate_connected_edges(n, p=0.5, max_weight=100):
+    """
+    generates the edges of a weighted connected graph with n nodes,
+    as the union of a random spanning tree (see random_spanning_tree_pairs),
+    and the edges of G(n, p) (see gnp_pairs), so beside the tree edges every edge exists in probability p
+    :param n: number of nodes in graph
+    :param p: probability for edge existence
+    :param max_weight: upper limit to edges weights
+    :return: arrays (u, v, w) of the edges endpoints and weights
+    """
+    if n <= 1:
+        pairs = np.zeros(0, dtype=np.int64)
+    else:
+        pairs = np.sort(np.concatenate((random_spanning_tree_pairs(n), gnp_pairs(n, p))))
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+    u, v = pairs_to_edges(pairs)
+    return u, v, np.random.randint(0, max_weight + 1, size=len(pairs))
+
+
 def generate_connected_graph(n, p=0.5):
     """
-    generates a connected graph with n nodes in probability p
-    if it doesn't succeed in 1000000 tries, it raises p by 0.01
+    generates a connected graph with n nodes in probability p,
+    i.e. a random spanning tree, and every other edge in probability p (see generate_connected_edges)
     :param n: number of nodes in graph
     :param p: probability for edge existence
     :return: a connected graph g
     """
-    if n <= 1:
-        return generate_graph(n)
-    for _ in range(GRAPH_GENERATION_TRIES):
-        g = generate_graph(n, p)
-        if nx.is_connected(g):
-            return g
-        p += PROBABILITY_STEP
+    u, v, _ = generate_connected_edges(n, p)
+    g = nx.Graph()
+    g.add_nodes_from(range(n))
+    g.add_edges_from(zip(u.tolist(), v.tolist()))
+    return g
+
+
+def networkx_graph(g):
+    """
+    :param g: graph, or GraphArrays, e.g. of a stored graph (see utilities.storage)
+    :return: g if it is a networkx graph, otherwise the weighted networkx graph of the GraphArrays.
+             the order of its nodes neighbours only depends on the arrays, and not on the graph they were converted
+             from, so graph algorithms that follow that order (e.g. generate_cover) run the same on any graph
+             with the same arrays, e.g. a graph and its stored copy
+    """
+    if isinstance(g, nx.Graph):
+        return g
+    arrays = g
+    u = np.repeat(np.arange(len(arrays)), np.diff(arrays.indptr))
+    v = np.asarray(arrays.indices)
+    upper = u < v
+    nodes = list(arrays.nodes)
+    g = nx.Graph()
+    g.add_nodes_from(nodes)
+    g.add_weighted_edges_from((nodes[a], nodes[b], w) for a, b, w in
+                              zip(u[upper].tolist(), v[upper].tolist(), np.asarray(arrays.weights)[upper].tolist()))
+    return g
 
 
 def weight_graph_edges(g, max_weight=100):
@@ -48,25 +144,51 @@ def weight_graph_edges(g, max_weight=100):
     :param max_weight: upper limit to edges weights
     :return: None
     """
-    for u, v in g.edges():
-        g[u][v]['weight'] = np.random.randint(0, max_weight + 1)
+    weights = np.random.randint(0, max_weight + 1, size=g.number_of_edges())
+    for (_, _, d), w in zip(g.edges(data=True), weights.tolist()):
+        d['weight'] = w
+    radius.invalidate_radius_cache(g)
 
 
-def generate_weighted_connected_graph(n, p=0.5, max_weight=100):
+def generate_weighted_connected_graph(n, p=0.5, max_weight=100, as_arrays=False):
     """
-    generates a weighted connected graph with n nodes in probability p
-    if it doesn't succeed in 1000000 tries, it raises p by 0.01
+    generates a weighted connected graph with n nodes in probability p (see generate_connected_edges)
     :param n: number of nodes in graph
     :param p: probability for edge existence
     :param max_weight: upper limit to edges weights
+    :param as_arrays: return the graph as GraphArrays (see utilities.graph_arrays), without a networkx graph,
+                      which all the csgraph based functions accept instead of the graph
     :return: a wighted connected graph g
     """
-    g = generate_connected_graph(n, p=p)
-    weight_graph_edges(g, max_weight)
+    u, v, w = generate_connected_edges(n, p, max_weight)
+    if as_arrays:
+        return edges_to_graph_arrays(n, u, v, w)
+    g = nx.Graph()
+    g.add_nodes_from(range(n))
+    g.add_weighted_edges_from(zip(u.tolist(), v.tolist(), w.tolist()))
     return g
 
 
-def generate_random_cluster(g, min_cluster_size=0, max_cluster_size=0):
+def grow_random_cluster(g, nodes, neighbours, cluster_size, rng):
+    """
+    :param g: graph
+    :param nodes: list of the nodes of g
+    :param neighbours: dictionary of node -> list of its neighbours, filled by the nodes the cluster grows through
+    :param cluster_size: number of nodes in the cluster
+    :param rng: numpy random Generator
+    :return: a random cluster of cluster_size nodes, see generate_random_cluster
+    """
+    cluster = RandomSet([nodes[random_index(rng, len(nodes))]], rng)
+    while len(cluster) < cluster_size:
+        u = cluster.pick()
+        u_neighbours = neighbours.get(u)
+        if u_neighbours is None:
+            u_neighbours = neighbours[u] = list(g.neighbors(u))
+        cluster.add(u_neighbours[random_index(rng, len(u_neighbours))])
+    return frozenset(cluster)
+
+
+def generate_random_cluster(g, min_cluster_size=0, max_cluster_size=0, rng=None):
     """
     a very simple function that generates a random cluster.
     every iteration it chooses a random node from the cluster,
@@ -74,28 +196,23 @@ def generate_random_cluster(g, min_cluster_size=0, max_cluster_size=0):
     :param g: graph
     :param min_cluster_size: minimum nodes in a cluster
     :param max_cluster_size: maximum nodes in a cluster
+    :param rng: numpy random Generator, see utilities.random_set.as_generator
     :return: a cluster, i.e. a clique of nodes in g,
              in random size between min_cluster_size and max_cluster_size
     """
     n = nx.number_of_nodes(g)
-    cluster = set()
     if n == 0 or min_cluster_size > max_cluster_size:
-        return frozenset(cluster)
+        return frozenset()
     if not min_cluster_size:
         min_cluster_size = 1
     if not max_cluster_size:
         max_cluster_size = n
-    cluster_size = np.random.randint(min_cluster_size, max_cluster_size + 1)
-    u = np.random.choice(list(g.nodes()))
-    cluster.add(u)
-    while len(cluster) < cluster_size:
-        u = np.random.choice(list(cluster))
-        v = np.random.choice(list(g.neighbors(u)))
-        cluster.add(v)
-    return frozenset(cluster)
+    rng = as_generator(rng)
+    cluster_size = rng.integers(min_cluster_size, max_cluster_size + 1)
+    return grow_random_cluster(g, list(g.nodes()), {}, cluster_size, rng)
 
 
-def generate_cover(g, cover_size, min_cluster_size=0, max_cluster_size=0):
+def generate_cover(g, cover_size, min_cluster_size=0, max_cluster_size=0, rng=None):
     """
     generates a requested clusters cover that covers all nodes in g.
     each iteration it adds a cluster to the cover, until there is full nodes coverage.
@@ -104,22 +221,34 @@ def generate_cover(g, cover_size, min_cluster_size=0, max_cluster_size=0):
     :param cover_size: size of requested cover
     :param min_cluster_size: minimum nodes in a cluster
     :param max_cluster_size: maximum nodes in a cluster
-    :return: a cover with at least cover_size clusters.
-            e.g. a set of tuples, each tuple represents a cluster of nodes
+    :param rng: numpy random Generator, see utilities.random_set.as_generator
+    :return: a cover with at least cover_size clusters, or an empty cover of an empty graph.
+            e.g. a set of tuples, each tuple represents a cluster of nodes.
+            raises ValueError if min_cluster_size is larger than max_cluster_size (by default the number of nodes)
     """
-    nodes = set(g.nodes())
+    uncovered = set(g.nodes())
     n = nx.number_of_nodes(g)
     clusters = set()
     if min_cluster_size and max_cluster_size:
         # too many restrictions may cause infinite loop trying to find impossible number of clusters in certain size
         cover_size = 1
+    if n == 0:
+        return clusters
     min_cluster_size = min_cluster_size if min_cluster_size != 0 else 1
     max_cluster_size = max_cluster_size if max_cluster_size != 0 else n
+    if min_cluster_size > max_cluster_size:
+        raise ValueError('min_cluster_size {} is larger than max_cluster_size {}'.format(min_cluster_size,
+                                                                                     max_cluster_size))
+    rng = as_generator(rng)
+    nodes = list(g.nodes())
+    neighbours = {}
     i = 0
-    while i < cover_size or nodes != frozenset.union(*list(clusters)):
-        fs = generate_random_cluster(g, min_cluster_size, max_cluster_size)
+    while i < cover_size or uncovered:
+        cluster_size = rng.integers(min_cluster_size, max_cluster_size + 1)
+        fs = grow_random_cluster(g, nodes, neighbours, cluster_size, rng)
         if fs not in clusters:
             clusters.add(fs)
+            uncovered -= fs
             i += 1
     return clusters
 
@@ -146,7 +275,7 @@ def calculate_node_radius(g, v):
     return max(easiest_paths_weights.values())
 
 
-def calculate_graph_radius(g):
+def calculate_graph_radius(g, approx=None):
     """
     calculates the radius of graph g by the formula:
     Rad(g) = min(Rad(v, g) | for every v in g)
@@ -156,15 +285,21 @@ def calculate_graph_radius(g):
     by approximating the weight of the paths between the nodes in the cluster.
 
     :param g: graph
-    :return: radius of g
+    :param approx: number of Dijkstra runs, to bound the radius with instead of calculating it exactly
+                   (see utilities.radius.matrix_radius_bounds). a single run already bounds it within a factor of 2
+    :return: radius of g, or with approx, lower and upper bounds of it
     """
+    if approx and radius.csgraph is not None:
+        return radius.cluster_radius_bounds(g, list(g.nodes()), approx)
     nodes_radii = {}
     for v in g.nodes():
         nodes_radii[v] = calculate_node_radius(g, v)
-    return min(nodes_radii.values())
+    graph_radius = min(nodes_radii.values())
+    return (graph_radius, graph_radius) if approx else graph_radius
 
 
-def calculate_collection_radius(g, collection):
+def calculate_collection_radius(g, collection, method='csgraph', stats=None, cache=None, workers=1, approx=None,
+                                intervals=None, bounds=None):
     """
     calculates the radius of collection in graph g by the formula:
     Rad(g) = max(Rad(g(cluster)) | for every cluster in g),
@@ -181,17 +316,55 @@ def calculate_collection_radius(g, collection):
     While technically, the bigger the size of a cluster,
     the heavier the paths between the nodes in it.
 
-    :param g: graph
+    :param g: graph, or for 'csgraph' and 'bounded' also its GraphArrays, e.g. a stored graph (see utilities.storage)
     :param collection: a collection of clusters in g
            (usually the collection sent is a node coverage of g)
-    :return: radius of collection
+    :param method: 'csgraph' computes the radii over g CSR arrays (see utilities.radius),
+                   'bounded' does the same, but prunes Dijkstra runs using eccentricity bounds,
+                   'networkx' computes them with networkx Dijkstra on every cluster induced graph.
+                   'csgraph' and 'bounded' fall back to 'networkx' if scipy is not available.
+    :param stats: optional dictionary, for 'csgraph' and 'bounded' the number of Dijkstra runs,
+                  and the number of runs saved compared to running from every node, are added to it
+    :param cache: optional RadiusCache of g (see utilities.radius), or True for the cache kept for g,
+                  clusters radii are looked up in it before they are calculated, and stored in it after.
+                  the cache kept for a networkx graph is dropped whenever its nodes, edges or weights change
+    :param workers: for 'csgraph' and 'bounded', number of worker processes the clusters radii are calculated on,
+                    sharing g CSR arrays through shared memory (see utilities.radius.collection_radius)
+    :param approx: for 'csgraph' and 'bounded', number of Dijkstra runs to bound every cluster's radius with,
+                   instead of calculating it exactly. only the clusters whose bounds overlap at the maximum are
+                   calculated exactly (see utilities.radius.approx_collection_radius), and workers is ignored.
+                   for 'networkx' the radii are exact, and their bounds are equal
+    :param intervals: optional dictionary, the bounds (lower, upper) of every cluster's radius are stored in it,
+                      which are equal for the radii that were calculated exactly
+    :param bounds: optional dictionary of cluster -> (lower, upper) known bounds of clusters radii,
+                   e.g. the radii bounds max_cover records in a ClusterRadii (see algorithm.cover_radii).
+                   for 'csgraph' and 'bounded', only the clusters whose bounds compete for the maximum are calculated,
+                   the radius is still exact without approx (see utilities.radius.approx_collection_radius)
+    :return: radius of collection, or with approx, lower and upper bounds of it
     """
+    if method in ('csgraph', 'bounded') and radius.csgraph is not None:
+        if approx or bounds is not None:
+            collection_bounds = radius.approx_collection_radius(g, collection, approx or radius.APPROX_SOURCES,
+                                                                stats=stats, cache=cache, intervals=intervals,
+                                                                bounds=bounds, exact=not approx)
+            return collection_bounds if approx else collection_bounds[1]
+        return radius.collection_radius(g, collection, bounded=method == 'bounded', stats=stats, cache=cache,
+                                        workers=workers, intervals=intervals)
+    if cache is True:
+        cache = radius.radius_cache(g)
     clusters_radii = {}
     for cluster in collection:
-        induced_graph = cluster_induced_graph(g, cluster)
-        induced_graph_radius = calculate_graph_radius(induced_graph)
+        induced_graph_radius = cache.get(cluster) if cache is not None else None
+        if induced_graph_radius is None:
+            induced_graph = cluster_induced_graph(g, cluster)
+            induced_graph_radius = calculate_graph_radius(induced_graph)
+            if cache is not None:
+                cache.put(cluster, induced_graph_radius)
         clusters_radii[cluster] = induced_graph_radius
-    return max(clusters_radii.values())
+        if intervals is not None:
+            intervals[cluster] = induced_graph_radius, induced_graph_radius
+    collection_radius = max(clusters_radii.values())
+    return (collection_radius, collection_radius) if approx else collection_radius
 
 
 def calculate_node_degree_in_collection(collection, v):
@@ -210,6 +383,17 @@ def calculate_node_degree_in_collection(collection, v):
     return counter
 
 
+def calculate_nodes_degrees_in_collection(collection):
+    """
+    calculates the degree of every node in collection (see calculate_node_degree_in_collection),
+    by counting the nodes occurrences in a single pass over the collection.
+
+    :param collection: collection of clusters
+    :return: Counter of node -> degree of node in collection
+    """
+    return Counter(v for cluster in collection for v in cluster)
+
+
 def calculate_collection_degree(collection):
     """
     calculates the degree of collection by the formula:
@@ -226,16 +410,140 @@ def calculate_collection_degree(collection):
     While technically, the more sparse the collection is,
     the smaller the amount of nodes they share.
 
-    :param collection: collection of clusters
+    :param collection: collection of clusters, or ClusterArrays of a stored cover (see utilities.storage)
     :return: degree of collection
     """
-    nodes_abundances = {}
-    for v in frozenset.union(*list(collection)):
-        nodes_abundances[v] = calculate_node_degree_in_collection(collection, v)
-    return max(nodes_abundances.values())
+    if isinstance(collection, ClusterArrays):
+        return int(collection.nodes_degrees().max())
+    return max(calculate_nodes_degrees_in_collection(collection).values())
+
 
+def calculate_collections_degrees(g, clusters, collections_ids):
+    """
+    calculates the degrees of many collections at once (see calculate_collection_degree),
+    by a single sparse product of a collection x cluster selection matrix and the cluster x node incidence matrix,
+    whose entries are the nodes degrees in every collection.
+
+    :param g: graph, or its GraphArrays, of the clusters
+    :param clusters: list of different clusters
+    :param collections_ids: list of the indices in clusters of the clusters of every collection
+    :return: list of the degree of every collection
+    """
+    if radius.sp is None:
+        return [calculate_collection_degree([clusters[i] for i in ids]) for ids in collections_ids]
+    arrays = graph_arrays(g)
+    incidence = radius.sp.csr_matrix(clusters_incidence(arrays, clusters), shape=(len(clusters), len(arrays)))
+    selection = radius.sp.csr_matrix(collections_selection(collections_ids),
+                                     shape=(len(collections_ids), len(clusters)))
+    nodes_degrees = selection @ incidence
+    return [int(degree) for degree in nodes_degrees.max(axis=1).toarray().ravel()]
+
+
+def clusters_incidence(arrays, clusters):
+    """
+    :param arrays: GraphArrays of the clusters graph
+    :param clusters: list of clusters
+    :return: CSR (data, indices, indptr) of the cluster x node incidence matrix of clusters
+    """
+    indptr = np.zeros(len(clusters) + 1, dtype=np.int64)
+    np.cumsum([len(cluster) for cluster in clusters], out=indptr[1:])
+    indices = np.concatenate([arrays.ids(cluster) for cluster in clusters]) if clusters else np.zeros(0, np.int64)
+    return np.ones(len(indices), dtype=np.int64), indices, indptr
 
-def get_collection_data(g, collection):
-    collection_radius = calculate_collection_radius(g, collection)
+
+def collections_selection(collections_ids):
+    """
+    :param collections_ids: list of the clusters indices of every collection
+    :return: CSR (data, indices, indptr) of the collection x cluster selection matrix
+    """
+    indptr = np.zeros(len(collections_ids) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids in collections_ids], out=indptr[1:])
+    indices = np.fromiter((i for ids in collections_ids for i in ids), dtype=np.int64, count=indptr[-1])
+    return np.ones(len(indices), dtype=np.int64), indices, indptr
+
+
+def calculate_collection_degree_distribution(collection):
+    """
+    calculates the degree of collection (see calculate_collection_degree),
+    together with the distribution of its nodes degrees.
+
+    :param collection: collection of clusters
+    :return: degree of collection,
+             histogram of the nodes degrees, i.e. histogram[d] is the number of nodes of degree d,
+             and a list of the nodes of maximum degree
+    """
+    nodes_degrees = calculate_nodes_degrees_in_collection(collection)
+    histogram = np.bincount(np.fromiter(nodes_degrees.values(), dtype=np.int64, count=len(nodes_degrees)))
+    collection_degree = len(histogram) - 1
+    max_degree_nodes = [v for v, degree in nodes_degrees.items() if degree == collection_degree]
+    return collection_degree, histogram, max_degree_nodes
+
+
+def get_collection_data(g, collection, method='csgraph', cache=None, workers=1, stats=None, approx=None,
+                        intervals=None, bounds=None):
+    """
+    :param g: graph, or its GraphArrays, see calculate_collection_radius
+    :param collection: a collection of clusters in g
+    :param method: radius calculation method, see calculate_collection_radius
+    :param cache: optional radius cache, see calculate_collection_radius
+    :param workers: number of worker processes of the radius calculation, see calculate_collection_radius
+    :param stats: optional dictionary, the seconds spent calculating the radius and the degree are added to it,
+                  as 'radius time' and 'degree time', together with the radius calculation stats
+    :param approx: bound the radius instead of calculating it exactly, see calculate_collection_radius
+    :param intervals: optional dictionary of the clusters radii bounds, see calculate_collection_radius
+    :param bounds: optional known bounds of the clusters radii, see calculate_collection_radius
+    :return: radius and degree of collection, with approx the radius is its (lower, upper) bounds
+    """
+    start = perf_counter()
+    collection_radius = calculate_collection_radius(g, collection, method, stats=stats, cache=cache, workers=workers,
+                                                    approx=approx, intervals=intervals, bounds=bounds)
+    radius_end = perf_counter()
     collection_degree = calculate_collection_degree(collection)
+    if stats is not None:
+        stats['radius time'] = stats.get('radius time', 0) + radius_end - start
+        stats['degree time'] = stats.get('degree time', 0) + perf_counter() - radius_end
     return collection_radius, collection_degree
+
+
+def get_collections_data(g, collections, method='csgraph', cache=None, workers=1, stats=None, approx=None,
+                         bounds=None):
+    """
+    get_collection_data of many collections of clusters in g at once, e.g. the covers sampled for g,
+    or the coarsening covers max_cover constructs for a cover.
+    a cluster that belongs to several collections is measured once,
+    and the degrees of all collections are calculated together (see calculate_collections_degrees).
+
+    :param g: graph, or its GraphArrays, see calculate_collection_radius
+    :param collections: list of collections of clusters in g
+    :param method: radius calculation method, see calculate_collection_radius
+    :param cache: optional radius cache, see calculate_collection_radius
+    :param workers: number of worker processes of the radius calculation, see calculate_collection_radius
+    :param stats: optional dictionary, see get_collection_data
+    :param approx: bound the radii instead of calculating them exactly, see calculate_collection_radius
+    :param bounds: optional known bounds of the clusters radii, see calculate_collection_radius
+    :return: list of the radius and degree of every collection, see get_collection_data
+    """
+    start = perf_counter()
+    cluster_ids = {}
+    collections_ids = [[cluster_ids.setdefault(cluster, len(cluster_ids)) for cluster in collection]
+                       for collection in collections]
+    clusters = list(cluster_ids)
+    if approx or bounds is not None:
+        # only the clusters that compete for the maximum of a collection are measured,
+        # and the cache keeps them for the other collections
+        if cache is None:
+            cache = radius.RadiusCache()
+        radii = [calculate_collection_radius(g, [clusters[i] for i in ids], method, stats=stats, cache=cache,
+                                             workers=workers, approx=approx, bounds=bounds)
+                 for ids in collections_ids]
+    else:
+        intervals = {}
+        calculate_collection_radius(g, clusters, method, stats=stats, cache=cache, workers=workers,
+                                    intervals=intervals)
+        radii = [max(intervals[clusters[i]][1] for i in ids) for ids in collections_ids]
+    radius_end = perf_counter()
+    degrees = calculate_collections_degrees(g, clusters, collections_ids)
+    if stats is not None:
+        stats['radius time'] = stats.get('radius time', 0) + radius_end - start
+        stats['degree time'] = stats.get('degree time', 0) + perf_counter() - radius_end
+    return list(zip(radii, degrees))